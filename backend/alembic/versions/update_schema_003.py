@@ -0,0 +1,20 @@
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'update_schema_003'
+down_revision: Union[str, None] = 'update_schema_002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column('pages', sa.Column('etag', sa.String(), nullable=True))
+    op.add_column('pages', sa.Column('last_modified', sa.String(), nullable=True))
+    op.add_column('pages', sa.Column('content_hash', sa.String(length=32), nullable=True))
+    op.add_column('pages', sa.Column('links', sa.JSON(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('pages', 'links')
+    op.drop_column('pages', 'content_hash')
+    op.drop_column('pages', 'last_modified')
+    op.drop_column('pages', 'etag')
@@ -0,0 +1,30 @@
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = 'update_schema_004'
+down_revision: Union[str, None] = 'update_schema_003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Fold duplicate (project_id, url) pages into the most recently audited one
+    # so the unique index can be built without losing audit history.
+    op.execute("""
+        CREATE TEMPORARY TABLE page_duplicates ON COMMIT DROP AS
+        SELECT id, keep_id FROM (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY project_id, url
+                ORDER BY last_audited DESC NULLS LAST, created_at DESC NULLS LAST
+            ) AS keep_id
+            FROM pages
+        ) ranked
+        WHERE id <> keep_id
+    """)
+    op.execute("UPDATE audits SET page_id = d.keep_id FROM page_duplicates d WHERE audits.page_id = d.id")
+    op.execute("UPDATE content_suggestions SET page_id = d.keep_id FROM page_duplicates d WHERE content_suggestions.page_id = d.id")
+    op.execute("DELETE FROM pages USING page_duplicates d WHERE pages.id = d.id")
+
+    op.create_index('uq_pages_project_url', 'pages', ['project_id', 'url'], unique=True)
+
+def downgrade() -> None:
+    op.drop_index('uq_pages_project_url')
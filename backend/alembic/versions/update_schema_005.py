@@ -0,0 +1,20 @@
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = 'update_schema_005'
+down_revision: Union[str, None] = 'update_schema_004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # pages.project_id is already covered by uq_pages_project_url (project_id, url)
+    op.create_index('idx_audit_page_created', 'audits', ['page_id', 'created_at'])
+    op.create_index('idx_keyword_project', 'keywords', ['project_id'])
+    op.create_index('idx_competitor_project', 'competitors', ['project_id'])
+    op.create_index('idx_content_suggestion_page', 'content_suggestions', ['page_id'])
+
+def downgrade() -> None:
+    op.drop_index('idx_content_suggestion_page')
+    op.drop_index('idx_competitor_project')
+    op.drop_index('idx_keyword_project')
+    op.drop_index('idx_audit_page_created')
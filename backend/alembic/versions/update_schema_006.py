@@ -0,0 +1,16 @@
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'update_schema_006'
+down_revision: Union[str, None] = 'update_schema_005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column('pages', sa.Column('simhash', sa.String(length=16), nullable=True))
+    op.add_column('pages', sa.Column('word_count', sa.Integer(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('pages', 'word_count')
+    op.drop_column('pages', 'simhash')
@@ -0,0 +1,18 @@
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'update_schema_007'
+down_revision: Union[str, None] = 'update_schema_006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column('competitors', sa.Column('overall_score', sa.Integer(), nullable=True))
+    op.add_column('competitors', sa.Column('category_scores', sa.JSON(), nullable=True))
+    op.add_column('competitors', sa.Column('benchmarked_at', sa.DateTime(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('competitors', 'benchmarked_at')
+    op.drop_column('competitors', 'category_scores')
+    op.drop_column('competitors', 'overall_score')
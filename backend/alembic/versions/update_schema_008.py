@@ -0,0 +1,36 @@
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'update_schema_008'
+down_revision: Union[str, None] = 'update_schema_007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table(
+        'page_terms',
+        sa.Column('page_id', sa.UUID(), sa.ForeignKey('pages.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('term', sa.Text(), primary_key=True),
+        sa.Column('project_id', sa.UUID(), sa.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('tf', sa.Float(), nullable=False),
+        sa.Column('fields', sa.SmallInteger(), nullable=False),
+    )
+    op.create_index('idx_page_term_rank', 'page_terms',
+                    ['project_id', 'term', sa.text('fields DESC'), sa.text('tf DESC')],
+                    postgresql_include=['page_id'])
+    op.create_table(
+        'project_terms',
+        sa.Column('project_id', sa.UUID(), sa.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('term', sa.Text(), primary_key=True),
+        sa.Column('df', sa.Integer(), nullable=False),
+    )
+    op.create_index('idx_keyword_search', 'keywords', [sa.text("to_tsvector('simple', keyword)")],
+                    postgresql_using='gin')
+
+def downgrade() -> None:
+    op.drop_index('idx_keyword_search')
+    op.drop_table('project_terms')
+    op.drop_index('idx_page_term_rank')
+    op.drop_table('page_terms')
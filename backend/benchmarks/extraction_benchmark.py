@@ -0,0 +1,324 @@
+"""Per-page extraction benchmark: multi-pass legacy extractor vs PageExtractor.
+
+Run from backend/:
+
+    python -m benchmarks.extraction_benchmark [--iterations N] [--fixtures DIR]
+
+Every fixture is first checked to produce a byte-identical data dict with both
+extractors, then each one is timed on the same HTML.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from controller.audit.extractor import PageExtractor
+from serialization import encode_json, to_builtins
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class LegacyExtractor:
+    # Verbatim copy of the multi-pass extraction SEOAudit used before
+    # PageExtractor, kept as the reference for correctness and speed.
+    def __init__(self, domain):
+        self.domain = domain
+
+    def is_valid_internal_url(self, url):
+        if not url or not url.startswith(('http://', 'https://')):
+            return False
+        parsed_url = urlparse(url)
+        return parsed_url.netloc == self.domain
+
+    def extract_seo_data(self, html, page_url):
+        if not html:
+            return None
+        soup = BeautifulSoup(html, "html.parser")
+        data = {
+            "page_url": page_url,
+            "content_hash": hashlib.md5(html.encode()).hexdigest(),
+            "page_size_bytes": len(html),
+        }
+        
+        data["title"] = soup.title.string.strip() if soup.title else None
+        data["title_length"] = len(data["title"]) if data["title"] else 0
+        
+        meta_description = soup.find("meta", attrs={"name": "description"})
+        data["meta_description"] = meta_description.get("content", "").strip() if meta_description else None
+        data["meta_description_length"] = len(data["meta_description"]) if data["meta_description"] else 0
+        
+        data["meta_robots"] = soup.find("meta", attrs={"name": "robots"}).get("content", "").strip() if soup.find("meta", attrs={"name": "robots"}) else None
+        data["meta_keywords"] = soup.find("meta", attrs={"name": "keywords"}).get("content", "").strip() if soup.find("meta", attrs={"name": "keywords"}) else None
+        data["meta_viewport"] = soup.find("meta", attrs={"name": "viewport"}).get("content", "").strip() if soup.find("meta", attrs={"name": "viewport"}) else None
+        data["meta_charset"] = soup.find("meta", attrs={"charset": True}).get("charset", "").strip() if soup.find("meta", attrs={"charset": True}) else None
+        data["meta_og_tags"] = self._extract_og_tags(soup)
+        data["meta_twitter_tags"] = self._extract_twitter_tags(soup)
+
+        canonical = soup.find("link", rel="canonical")
+        data["canonical_url"] = canonical["href"].strip() if canonical and canonical.has_attr("href") else None
+        data["canonical_matches_url"] = (data["canonical_url"] == page_url) if data["canonical_url"] else False
+
+        headings = {}
+        for i in range(1, 7):
+            tag = f"h{i}"
+            headings[tag] = [{"text": h.get_text(strip=True), "length": len(h.get_text(strip=True))} for h in soup.find_all(tag)]
+        data["headings"] = headings
+        
+        data["paragraphs"] = [p.get_text(strip=True) for p in soup.find_all("p")]
+        data["word_count"] = self._calculate_word_count(soup)
+        data["text_html_ratio"] = self._calculate_text_html_ratio(soup, html)
+        data["keywords_density"] = self._extract_keyword_density(soup)
+
+        data["strong_tags"] = [s.get_text(strip=True) for s in soup.find_all("strong")]
+        data["em_tags"] = [e.get_text(strip=True) for e in soup.find_all("em")]
+        data["b_tags"] = [b.get_text(strip=True) for b in soup.find_all("b")]
+        data["i_tags"] = [i.get_text(strip=True) for i in soup.find_all("i")]
+
+        images = []
+        for img in soup.find_all("img"):
+            image_data = {
+                "src": urljoin(page_url, img.get("src")) if img.get("src") else None,
+                "alt": img.get("alt", "").strip(),
+                "alt_length": len(img.get("alt", "").strip()) if img.get("alt") else 0,
+                "title": img.get("title", "").strip(),
+                "width": img.get("width"),
+                "height": img.get("height"),
+                "lazy_loaded": img.has_attr("loading") and img["loading"] == "lazy"
+            }
+            images.append(image_data)
+        data["images"] = images
+        data["images_with_alt"] = sum(1 for img in images if img["alt"])
+        data["images_without_alt"] = sum(1 for img in images if not img["alt"] and img["src"])
+        data["total_images"] = len(images)
+
+        internal_links = []
+        external_links = []
+        
+        for a in soup.find_all("a", href=True):
+            href = a.get("href", "").strip()
+            if not href or href.startswith('#'):
+                continue
+                
+            full_url = urljoin(page_url, href)
+            parsed_url = urlparse(full_url)
+            
+            link_data = {
+                "href": full_url,
+                "text": a.get_text(strip=True),
+                "text_length": len(a.get_text(strip=True)),
+                "title": a.get("title", "").strip(),
+                "nofollow": "nofollow" in a.get("rel", ""),
+                "has_text": bool(a.get_text(strip=True)),
+            }
+            
+            if parsed_url.netloc == self.domain:
+                internal_links.append(link_data)
+            else:
+                external_links.append(link_data)
+                
+        data["internal_links"] = internal_links
+        data["external_links"] = external_links
+        data["total_links"] = len(internal_links) + len(external_links)
+
+        structured_data = []
+        for script in soup.find_all("script", type="application/ld+json"):
+            try:
+                if script.string:
+                    json_content = json.loads(script.string)
+                    structured_data.append(json_content)
+            except:
+                continue
+        data["structured_data"] = structured_data
+        data["has_structured_data"] = len(structured_data) > 0
+
+        data["videos"] = [{"src": urljoin(page_url, video.get("src"))} for video in soup.find_all("video") if video.get("src")]
+        data["audios"] = [{"src": urljoin(page_url, audio.get("src"))} for audio in soup.find_all("audio") if audio.get("src")]
+
+        data["script_sources"] = [urljoin(page_url, script.get("src")) for script in soup.find_all("script") if script.get("src")]
+        data["style_links"] = [urljoin(page_url, link.get("href")) for link in soup.find_all("link", rel="stylesheet") if link.get("href")]
+        data["inline_styles"] = len(soup.find_all("style"))
+        data["inline_scripts"] = sum(1 for s in soup.find_all("script") if not s.get("src") and s.string)
+
+        favicon = soup.find("link", rel=lambda x: x and "icon" in x.lower())
+        data["favicon"] = urljoin(page_url, favicon["href"]) if favicon and favicon.has_attr("href") else None
+
+        html_tag = soup.find("html")
+        data["language"] = html_tag.get("lang", "").strip() if html_tag and html_tag.has_attr("lang") else None
+
+        data["has_viewport_meta"] = bool(data["meta_viewport"])
+        data["has_mobile_friendly_design"] = self._check_mobile_friendly(soup)
+
+        data["resource_hints"] = self._extract_resource_hints(soup, page_url)
+        data["has_https"] = page_url.startswith("https://")
+        data["hreflang_tags"] = self._extract_hreflang_tags(soup)
+        data["has_doctype"] = bool(soup.find("doctype") or soup.find("!DOCTYPE"))
+        
+        return data
+
+    def _extract_og_tags(self, soup):
+        og_tags = {}
+        for tag in soup.find_all("meta", property=re.compile(r"^og:")):
+            name = tag.get("property", "").strip()
+            content = tag.get("content", "").strip()
+            if name and content:
+                og_tags[name] = content
+        return og_tags
+
+    def _extract_twitter_tags(self, soup):
+        twitter_tags = {}
+        for tag in soup.find_all("meta", attrs={"name": re.compile(r"^twitter:")}):
+            name = tag.get("name", "").strip()
+            content = tag.get("content", "").strip()
+            if name and content:
+                twitter_tags[name] = content
+        return twitter_tags
+
+    def _calculate_word_count(self, soup):
+        text = soup.body.get_text(" ", strip=True) if soup.body else ""
+        for script in soup.find_all(["script", "style"]):
+            script.extract()
+        cleaned_text = re.sub(r'\s+', ' ', text).strip()
+        return len(cleaned_text.split())
+
+    def _calculate_text_html_ratio(self, soup, html):
+        for script in soup.find_all(["script", "style"]):
+            script.extract()
+        text = soup.get_text(" ", strip=True)
+        if not html:
+            return 0
+        text_length = len(text)
+        html_length = len(html)
+        return round((text_length / html_length) * 100, 2) if html_length > 0 else 0
+
+    def _extract_keyword_density(self, soup):
+        for script in soup.find_all(["script", "style"]):
+            script.extract()
+        text = soup.get_text(" ", strip=True)
+        text = re.sub(r'[^\w\s]', '', text.lower())
+        words = text.split()
+        stop_words = {'a', 'an', 'the', 'and', 'or', 'but', 'is', 'are', 'was', 'were', 
+                     'have', 'has', 'had', 'be', 'been', 'being', 'to', 'of', 'for', 
+                     'with', 'by', 'on', 'at', 'in', 'this', 'that', 'these', 'those'}
+        filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
+        word_count = Counter(filtered_words)
+        total_words = len(filtered_words)
+        densities = {}
+        if total_words > 0:
+            for word, count in word_count.most_common(20):
+                densities[word] = {
+                    "count": count,
+                    "density": round((count / total_words) * 100, 2)
+                }
+        return densities
+    
+    def _check_mobile_friendly(self, soup):
+        viewport = soup.find("meta", attrs={"name": "viewport"})
+        has_viewport = viewport and "width=device-width" in viewport.get("content", "")
+        style_tags = soup.find_all("style")
+        has_media_queries = any("@media" in style.string for style in style_tags if style.string)
+        return has_viewport or has_media_queries
+
+    def _extract_resource_hints(self, soup, base_url):
+        hints = {
+            "preload": [],
+            "prefetch": [],
+            "preconnect": [],
+            "dns-prefetch": []
+        }
+        for link in soup.find_all("link", rel=True):
+            rel = link.get("rel", [""])[0] if isinstance(link.get("rel"), list) else link.get("rel", "")
+            if rel in hints and link.get("href"):
+                hints[rel].append(urljoin(base_url, link.get("href")))
+        return hints
+        
+    def _extract_hreflang_tags(self, soup):
+        hreflang_tags = []
+        for link in soup.find_all("link", rel="alternate", hreflang=True):
+            if link.get("href"):
+                hreflang_tags.append({
+                    "hreflang": link.get("hreflang"),
+                    "href": link.get("href")
+                })
+        return hreflang_tags
+    def extract_links(self, html, base_url):
+        if not html:
+            return []
+        soup = BeautifulSoup(html, "html.parser")
+        links = []
+        for a in soup.find_all("a", href=True):
+            href = a.get("href", "").strip()
+            if not href or href.startswith('#'):
+                continue
+            full_url = urljoin(base_url, href)
+            if self.is_valid_internal_url(full_url):
+                links.append(full_url)
+        return links
+
+
+def fixture_url(name):
+    return f"https://www.example.com/{os.path.splitext(name)[0]}/"
+
+
+def time_per_page(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def available_parsers():
+    parsers = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        parsers.append("lxml")
+    except ImportError:
+        pass
+    return parsers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    legacy = LegacyExtractor("www.example.com")
+    extractors = {name: PageExtractor("www.example.com", parser=name) for name in available_parsers()}
+
+    print(f"{'fixture':<24}{'size':>9}{'legacy ms':>12}" + "".join(f"{name + ' ms':>16}{'speedup':>9}" for name in extractors))
+    for name in sorted(os.listdir(args.fixtures)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(args.fixtures, name), encoding="utf-8") as f:
+            html = f.read()
+        url = fixture_url(name)
+
+        expected = encode_json(legacy.extract_seo_data(html, url))
+        actual = to_builtins(extractors["html.parser"].extract(html, url))
+        # Added after the legacy extractor, nothing to compare them with
+        for field in ("simhash", "template_blocks", "content_word_count"):
+            actual.pop(field)
+        actual = encode_json(actual)
+        if actual != expected:
+            raise SystemExit(f"{name}: PageExtractor output differs from the legacy extractor")
+
+        def run_legacy():
+            legacy.extract_seo_data(html, url)
+            legacy.extract_links(html, url)
+
+        legacy_ms = time_per_page(run_legacy, args.iterations)
+        row = f"{name:<24}{len(html) // 1024:>7}KB{legacy_ms:>12.2f}"
+        for extractor in extractors.values():
+            ms = time_per_page(lambda: extractor.extract(html, url), args.iterations)
+            row += f"{ms:>16.2f}{legacy_ms / ms:>8.2f}x"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
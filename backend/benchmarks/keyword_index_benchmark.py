@@ -0,0 +1,111 @@
+"""Keyword index benchmark: indexing cost and query latency on a large project.
+
+Run from backend/ against the database in DATABASE_URL (migrated to head):
+
+    python -m benchmarks.keyword_index_benchmark [--pages N] [--keywords N]
+
+A throwaway user and project get --pages synthetic pages (a Zipf-distributed
+vocabulary, so some terms are on most pages and most are rare) written with
+persist_audit_run, which indexes them, and --keywords tracked keywords.
+Everything is removed afterwards.
+"""
+import argparse
+import random
+import statistics
+import time
+from uuid import uuid4
+
+from sqlalchemy import delete, func, select
+
+from controller.audit.keyword_index import keyword_cannibalization, pages_for_keyword, search_keywords
+from controller.audit.persistence import persist_audit_run
+from db.session import SessionLocal, engine
+from models import Keyword, PageTerm, Project, User
+
+VOCABULARY = [f"term{i:05d}" for i in range(20000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+def synthetic_page(rng, url):
+    words = rng.choices(VOCABULARY, WEIGHTS, k=400)
+    counts = {}
+    for word in words:
+        counts[word] = counts.get(word, 0) + 1
+    top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:20]
+    return {
+        "page_url": url,
+        "title": " ".join(rng.choices(VOCABULARY[:2000], k=4)),
+        "content_hash": uuid4().hex,
+        "headings": {"h1": [{"text": " ".join(rng.choices(VOCABULARY[:2000], k=3))}]},
+        "keywords_density": {word: {"count": count, "density": round(count / len(words) * 100, 2)} for word, count in top},
+    }
+
+
+def synthetic_result(rng, pages):
+    scorecard = {"total_score": 60}
+    detailed = {}
+    for i in range(pages):
+        url = f"https://bench.example.com/page-{i}"
+        detailed[url] = {"data": synthetic_page(rng, url), "scorecard": scorecard,
+                         "cache": {"etag": None, "last_modified": None, "links": [], "unchanged": False}}
+    return {"summary": {"top_issues": []}, "detailed_results": detailed}
+
+
+def latency(label, fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<44}{statistics.median(samples):>9.1f}ms{max(samples):>9.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100000)
+    parser.add_argument("--keywords", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    user = User(id=uuid4(), email=f"bench-{uuid4().hex[:8]}@example.com", password_hash="x")
+    project = Project(id=uuid4(), user_id=user.id, name="keyword bench", domain="bench.example.com")
+    db.add_all([user, project])
+    db.add_all(
+        Keyword(project_id=project.id, keyword=" ".join(rng.choices(VOCABULARY[:300], k=rng.choice((1, 2)))),
+                relevance_score=rng.random())
+        for _ in range(args.keywords)
+    )
+    db.commit()
+
+    try:
+        result = synthetic_result(rng, args.pages)
+        start = time.perf_counter()
+        persist_audit_run(db, project.id, result)
+        elapsed = time.perf_counter() - start
+        rows = db.scalar(select(func.count()).select_from(PageTerm).where(PageTerm.project_id == project.id))
+        print(f"{args.pages} pages persisted and indexed in {elapsed:.1f}s ({rows} page_terms rows)")
+        # What autovacuum would do next: fresh statistics and an up to date visibility map
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for table in ("pages", "page_terms", "project_terms"):
+                conn.exec_driver_sql(f"VACUUM ANALYZE {table}")
+
+        pages_for_keyword(db, project.id, VOCABULARY[0])
+        print(f"{'query':<44}{'median':>11}{'max':>11}")
+        latency("pages_for_keyword (common term)", lambda: pages_for_keyword(db, project.id, VOCABULARY[0]), 20)
+        latency("pages_for_keyword (mid-frequency term)", lambda: pages_for_keyword(db, project.id, VOCABULARY[150]), 20)
+        latency("pages_for_keyword (two words)", lambda: pages_for_keyword(db, project.id, f"{VOCABULARY[3]} {VOCABULARY[40]}"), 20)
+        latency("pages_for_keyword (targeting only)",
+                lambda: pages_for_keyword(db, project.id, VOCABULARY[150], targeting_only=True), 20)
+        latency(f"keyword_cannibalization ({args.keywords} keywords)", lambda: keyword_cannibalization(db, project.id), 5)
+        latency("search_keywords", lambda: search_keywords(db, project.id, VOCABULARY[10]), 20)
+    finally:
+        db.rollback()
+        db.execute(delete(User).where(User.id == user.id))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Corpus keyword benchmark: site-wide TF-IDF cost, memory and boilerplate filtering.
+
+Run from backend/:
+
+    python -m benchmarks.keywords_benchmark [--pages N ...] [--chunk-size N]
+
+Every synthetic page is a site template (menu, footer and sidebar text shared
+by all pages) around a Zipf-distributed article. For each site size the
+benchmark times term counting, CorpusKeywords.add and finalize, and records
+the peak memory finalize allocates. It also reports how many of each page's
+top keywords are template words, for the page's own keyword density top 20
+(what scoring uses) and for the TF-IDF keywords.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from controller.audit.extractor import tokenize
+from controller.audit.keywords import CorpusKeywords, term_counts
+
+TEMPLATE = [
+    "Home Products Pricing Solutions Customers Resources Blog Careers Contact Login",
+    "Subscribe to our newsletter for product updates and customer stories",
+    "Popular posts: scaling customer support, pricing pages that convert, remote onboarding",
+    "Acme Software Ltd registered office London company number newsletter privacy cookies terms",
+]
+VOCABULARY = [f"topic{i:05d}" for i in range(30000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+TEMPLATE_WORDS = set(tokenize(" ".join(TEMPLATE)))
+
+
+def synthetic_pages(rng, pages):
+    for i in range(pages):
+        paragraphs = [" ".join(rng.choices(VOCABULARY, WEIGHTS, k=80)) for _ in range(5)]
+        yield f"https://bench.example.com/page-{i}", TEMPLATE + paragraphs
+
+
+def density_top(texts, top=20):
+    counts = {}
+    for word in tokenize(" ".join(texts)):
+        counts[word] = counts.get(word, 0) + 1
+    return [word for word, _ in sorted(counts.items(), key=lambda item: item[1], reverse=True)[:top]]
+
+
+def run(pages, chunk_size, seed):
+    rng = random.Random(seed)
+    corpus = list(synthetic_pages(rng, pages))
+    sample = dict(corpus[:200])
+    engine = CorpusKeywords(chunk_size=chunk_size)
+    keywords = {}
+
+    def on_page(url, page_keywords):
+        if url in sample:
+            keywords[url] = page_keywords
+
+    try:
+        start = time.perf_counter()
+        counted = [(url, term_counts(texts)) for url, texts in corpus]
+        counting = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for url, counts in counted:
+            engine.add(url, counts)
+        adding = time.perf_counter() - start
+        del counted
+
+        start = time.perf_counter()
+        site = engine.finalize(on_page=on_page)
+        scoring = time.perf_counter() - start
+
+        # Traced separately: tracemalloc slows the scoring pass down several times
+        tracemalloc.start()
+        engine.finalize(on_page=on_page)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        engine.close()
+
+    density_template = sum(word in TEMPLATE_WORDS for texts in sample.values() for word in density_top(texts))
+    tfidf_template = sum(
+        any(word in TEMPLATE_WORDS for word in keyword["term"].split())
+        for url in sample for keyword in keywords[url]
+    )
+    return {
+        "counting": counting, "adding": adding, "scoring": scoring, "peak_mb": peak / 2 ** 20,
+        "boilerplate": len(site["boilerplate_terms"]),
+        "density_template": density_template / (len(sample) * 20),
+        "tfidf_template": tfidf_template / max(1, sum(len(page_keywords) for page_keywords in keywords.values())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[5000, 10000, 20000, 40000])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'pages':>7}{'count':>9}{'add':>9}{'finalize':>10}{'us/page':>9}{'finalize MB':>13}"
+          f"{'boilerplate':>13}{'template in density top 20':>28}{'in TF-IDF top 20':>18}")
+    for pages in args.pages:
+        stats = run(pages, args.chunk_size, args.seed)
+        per_page = (stats["adding"] + stats["scoring"]) / pages * 1e6
+        print(f"{pages:>7}{stats['counting']:>8.1f}s{stats['adding']:>8.1f}s{stats['scoring']:>9.1f}s"
+              f"{per_page:>9.0f}{stats['peak_mb']:>13.1f}{stats['boilerplate']:>13}"
+              f"{stats['density_template']:>27.0%}{stats['tfidf_template']:>18.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Audit persistence benchmark: per-page ORM writes vs persist_audit_run.
+
+Run from backend/ against the database in DATABASE_URL (migrated to head):
+
+    python -m benchmarks.persistence_benchmark [--pages N]
+
+A throwaway user and projects are created for the run and removed afterwards.
+"""
+import argparse
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import delete
+
+from db.session import SessionLocal
+from controller.audit.persistence import persist_audit_run
+from models import Audit, Page, Project, User
+
+
+def synthetic_result(pages):
+    scorecard = {
+        "metadata": {"title": {"score": 7, "max_score": 10, "details": {"status": "acceptable", "recommendations": []}}},
+        "content": {"headings": {"score": 5, "max_score": 15, "details": {"recommendations": ["Add H2 tags to structure your content"]}}},
+        "total_score": 61,
+    }
+    detailed = {}
+    for i in range(pages):
+        url = f"https://bench.example.com/page-{i}"
+        detailed[url] = {
+            "data": {"page_url": url, "title": f"Page {i}", "content_hash": f"{i:032x}"},
+            "scorecard": scorecard,
+            "cache": {"etag": f'"{i}"', "last_modified": None, "links": [], "unchanged": False},
+        }
+    top_issues = [{"issue": "Add H2 tags to structure your content", "count": pages, "category": "content.headings", "importance": 7}]
+    return {"summary": {"top_issues": top_issues}, "detailed_results": detailed}
+
+
+def legacy_persist(db, project_id, result):
+    # The per-page loop audit_site.py used before persist_audit_run
+    audit_time = datetime.utcnow()
+    for url, payload in result["detailed_results"].items():
+        page = db.query(Page).filter_by(url=url, project_id=project_id).first()
+        if not page:
+            page = Page(id=uuid4(), url=url, title=payload["data"].get("title"),
+                        project_id=project_id, last_audited=audit_time)
+            db.add(page)
+            db.commit()
+            db.refresh(page)
+        else:
+            page.title = payload["data"].get("title")
+            page.last_audited = audit_time
+            db.commit()
+        db.add(Audit(id=uuid4(), page_id=page.id, audit_type="full", score=payload["scorecard"].get("total_score"),
+                     issues=payload["scorecard"], recommendations=result["summary"]["top_issues"], created_at=audit_time))
+    db.commit()
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34}{elapsed:>9.2f}s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10000)
+    args = parser.parse_args()
+
+    result = synthetic_result(args.pages)
+    db = SessionLocal()
+    user = User(id=uuid4(), email=f"bench-{uuid4().hex[:8]}@example.com", password_hash="x")
+    projects = [Project(id=uuid4(), user_id=user.id, name=f"bench {i}", domain="bench.example.com") for i in range(2)]
+    db.add(user)
+    db.add_all(projects)
+    db.commit()
+    legacy_project, bulk_project = (p.id for p in projects)
+
+    try:
+        print(f"Persisting {args.pages} pages")
+        legacy = timed("per-page ORM (insert)", lambda: legacy_persist(db, legacy_project, result))
+        bulk = timed("persist_audit_run (insert)", lambda: persist_audit_run(db, bulk_project, result))
+        timed("persist_audit_run (upsert)", lambda: persist_audit_run(db, bulk_project, result))
+        print(f"speedup: {legacy / bulk:.1f}x")
+    finally:
+        db.rollback()
+        db.execute(delete(User).where(User.id == user.id))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
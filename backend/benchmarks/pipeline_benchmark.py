@@ -0,0 +1,83 @@
+"""Extraction pool benchmark: pages/s of extract+score by worker count.
+
+Run from backend/:
+
+    python -m benchmarks.pipeline_benchmark [--pages N] [--max-workers N]
+
+The fixtures are replayed as raw response bytes through the same
+extract_and_score worker the crawl uses with extract_workers > 0, first in
+process and then with 1, 2, 4, ... worker processes up to --max-workers
+(the CPU count by default). Scaling is only near-linear up to the number of
+physical cores.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from controller.audit.audit_site import SEOAudit, _init_extract_worker, extract_and_score
+from benchmarks.extraction_benchmark import FIXTURES_DIR, fixture_url
+
+BASE_URL = "https://www.example.com/"
+
+
+def load_pages(count):
+    fixtures = []
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+                fixtures.append((fixture_url(name), f.read()))
+    return [fixtures[i % len(fixtures)] for i in range(count)]
+
+
+def worker_counts(max_workers):
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+
+def run_in_process(pages):
+    audit = SEOAudit(BASE_URL)
+    start = time.perf_counter()
+    for url, content in pages:
+        audit.analyse(url, content.decode("utf-8", errors="replace"))
+    return time.perf_counter() - start
+
+
+def run_pool(pages, workers):
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_extract_worker, initargs=(BASE_URL, "html.parser", None)) as pool:
+        def extract_all(batch, chunksize=1):
+            urls, contents = zip(*batch)
+            list(pool.map(extract_and_score, urls, contents, ["utf-8"] * len(batch), chunksize=chunksize))
+
+        # Warm up every worker so process start-up is not timed
+        extract_all(pages[:workers * 2])
+        start = time.perf_counter()
+        extract_all(pages, chunksize=4)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    baseline = run_in_process(pages)
+    print(f"{args.pages} pages, {os.cpu_count()} CPUs")
+    print(f"{'mode':<14}{'seconds':>9}{'pages/s':>10}{'speedup':>9}{'efficiency':>12}")
+    print(f"{'in-process':<14}{baseline:>9.2f}{args.pages / baseline:>10.1f}{1:>8.2f}x{'':>12}")
+    for workers in worker_counts(args.max_workers):
+        elapsed = run_pool(pages, workers)
+        speedup = baseline / elapsed
+        print(f"{f'{workers} workers':<14}{elapsed:>9.2f}{args.pages / elapsed:>10.1f}{speedup:>8.2f}x{speedup / workers:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
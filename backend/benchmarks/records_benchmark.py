@@ -0,0 +1,79 @@
+"""Page result representation benchmark: nested dicts vs msgspec records.
+
+Run from backend/:
+
+    python -m benchmarks.records_benchmark [--copies N] [--iterations N]
+
+Each fixture is extracted and scored once; the result is then held --copies
+times as records and as the equivalent plain dicts to compare retained
+memory per page, and encoded to JSON (stdlib json for dicts, msgspec for
+records) to compare encoding time.
+"""
+import argparse
+import gc
+import json
+import os
+import time
+import tracemalloc
+
+from controller.audit.audit_site import SEOAudit
+from serialization import encode_json, to_builtins
+from benchmarks.extraction_benchmark import FIXTURES_DIR, fixture_url
+
+
+def retained_kb(build, copies):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = [build() for _ in range(copies)]
+    # Parse trees are cyclic; collect them so only the retained results count
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return (after - before) / copies / 1024
+
+
+def encode_ms(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    audit = SEOAudit("https://www.example.com/")
+    print(f"{'fixture':<24}{'dict KB':>9}{'record KB':>11}{'saved':>7}{'json ms':>10}{'msgspec ms':>12}{'speedup':>9}")
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+            html = f.read()
+        url = fixture_url(name)
+
+        def build_records():
+            data, scorecard, *_ = audit.analyse(url, html)
+            return {"data": data, "scorecard": scorecard}
+
+        def build_dicts():
+            return to_builtins(build_records())
+
+        records = build_records()
+        dicts = to_builtins(records)
+        if json.loads(encode_json(records)) != json.loads(json.dumps(dicts)):
+            raise SystemExit(f"{name}: records and dicts encode differently")
+
+        dict_kb = retained_kb(build_dicts, args.copies)
+        record_kb = retained_kb(build_records, args.copies)
+        json_ms = encode_ms(lambda: json.dumps(dicts), args.iterations)
+        msgspec_ms = encode_ms(lambda: encode_json(records), args.iterations)
+        print(f"{name:<24}{dict_kb:>9.1f}{record_kb:>11.1f}{1 - record_kb / dict_kb:>7.0%}"
+              f"{json_ms:>10.3f}{msgspec_ms:>12.3f}{json_ms / msgspec_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
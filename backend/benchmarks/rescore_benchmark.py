@@ -0,0 +1,60 @@
+"""Offline re-scoring benchmark: archive size and pages/s by worker count.
+
+Run from backend/:
+
+    python -m benchmarks.rescore_benchmark [--pages N] [--max-workers N]
+
+An ExtractionArchive is filled with --pages synthetic page records (the
+scoring benchmark's fixture variants, each with its own content hash), then
+the run is re-scored with rescore_run using 1, 2, 4, ... worker processes up
+to --max-workers (the CPU count by default).
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import msgspec
+
+from controller.audit.archive import ExtractionArchive
+from controller.audit.records import PageRecord
+from controller.audit.rescore import rescore_run
+from benchmarks.pipeline_benchmark import worker_counts
+from benchmarks.scoring_benchmark import load_pages
+
+
+def build_archive(path, count):
+    archive = ExtractionArchive(path, commit_every=1000)
+    run_id = archive.start_run("https://www.example.com/", 2)
+    for i, data in enumerate(load_pages(count)):
+        url = f"https://www.example.com/page-{i}"
+        data.update(page_url=url, content_hash=f"{i:032x}")
+        archive.add(run_id, url, msgspec.convert(data, PageRecord))
+    archive.close()
+    return run_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "archive.sqlite3")
+        start = time.perf_counter()
+        run_id = build_archive(path, args.pages)
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+        print(f"{args.pages} pages archived in {elapsed:.1f}s, {size / 1024 / 1024:.1f}MB "
+              f"({size / args.pages / 1024:.1f}KB/page), {os.cpu_count()} CPUs")
+
+        print(f"{'workers':<10}{'seconds':>9}{'pages/s':>10}{'100k pages':>12}")
+        for workers in worker_counts(args.max_workers):
+            result = rescore_run(run_id, archive_path=path, workers=workers)
+            seconds = result["rescore"]["seconds"]
+            print(f"{workers:<10}{seconds:>9.2f}{args.pages / seconds:>10.0f}{100000 / args.pages * seconds:>11.0f}s")
+
+
+if __name__ == "__main__":
+    main()
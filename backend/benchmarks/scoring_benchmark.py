@@ -0,0 +1,549 @@
+"""Scorecard benchmark: hand-written calculate_scorecard vs the rule engine.
+
+Run from backend/:
+
+    python -m benchmarks.scoring_benchmark [--pages N]
+
+--pages synthetic page records are derived from the fixtures with titles,
+headings, keywords, images, links etc. varied to hit every scoring branch.
+Every record is first checked to produce a byte-identical scorecard with
+both scorers, and with the engine one page at a time (also under custom
+weights and thresholds). Then the legacy per-page loop is timed against
+the engine's per-page scorecard, batch scorecards, a scores-only pass over
+precomputed features and reweighting stored scorecards.
+"""
+import argparse
+import copy
+import os
+import random
+import string
+import time
+
+from controller.audit.extractor import PageExtractor
+from controller.audit.records import ScoreCategory
+from serialization import encode_json, to_builtins
+from controller.audit.scoring import ScoringEngine
+from benchmarks.extraction_benchmark import FIXTURES_DIR, fixture_url
+
+
+class LegacyScorer:
+    # Verbatim copy of SEOAudit.calculate_scorecard before the rule engine,
+    # kept as the reference for correctness and speed.
+    def calculate_scorecard(self, data):
+        if not data:
+            return {"total_score": 0, "categories": {}}
+            
+        scorecard = {
+            "metadata": {
+                "title": ScoreCategory(max_score=10),
+                "meta_description": ScoreCategory(max_score=10),
+                "other_meta_tags": ScoreCategory(max_score=10)
+            },
+            "content": {
+                "headings": ScoreCategory(max_score=15),
+                "content_quality": ScoreCategory(max_score=15),
+                "keyword_optimization": ScoreCategory(max_score=10)
+            },
+            "media": {
+                "images": ScoreCategory(max_score=10),
+                "videos_and_audio": ScoreCategory(max_score=5)
+            },
+            "technical": {
+                "structured_data": ScoreCategory(max_score=10),
+                "mobile_friendly": ScoreCategory(max_score=10),
+                "page_speed_indicators": ScoreCategory(max_score=10),
+                "security": ScoreCategory(max_score=5)
+            },
+            "links": {
+                "internal_links": ScoreCategory(max_score=10),
+                "external_links": ScoreCategory(max_score=5),
+                "canonical": ScoreCategory(max_score=5)
+            },
+            "international": {
+                "language": ScoreCategory(max_score=5),
+                "hreflang": ScoreCategory(max_score=5)
+            }
+        }
+        
+        title_score = scorecard["metadata"]["title"]
+        if data.get("title"):
+            title_length = data.get("title_length", 0)
+            if 30 <= title_length <= 60:
+                title_score["score"] = 10
+                title_score["details"]["status"] = "optimal"
+            elif 20 <= title_length < 30 or 60 < title_length <= 70:
+                title_score["score"] = 7
+                title_score["details"]["status"] = "acceptable"
+            else:
+                title_score["score"] = 4
+                title_score["details"]["status"] = "needs improvement"
+        else:
+            title_score["details"]["status"] = "missing"
+        title_score["details"]["length"] = data.get("title_length", 0)
+        title_score["details"]["recommendations"] = []
+        if not data.get("title"):
+            title_score["details"]["recommendations"].append("Add a title tag")
+        elif data.get("title_length", 0) < 30:
+            title_score["details"]["recommendations"].append("Title is too short, aim for 30-60 characters")
+        elif data.get("title_length", 0) > 60:
+            title_score["details"]["recommendations"].append("Title may be truncated in search results, consider shortening")
+            
+        meta_desc_score = scorecard["metadata"]["meta_description"]
+        if data.get("meta_description"):
+            desc_length = data.get("meta_description_length", 0)
+            if 120 <= desc_length <= 160:
+                meta_desc_score["score"] = 10
+                meta_desc_score["details"]["status"] = "optimal"
+            elif 80 <= desc_length < 120 or 160 < desc_length <= 200:
+                meta_desc_score["score"] = 7
+                meta_desc_score["details"]["status"] = "acceptable"
+            else:
+                meta_desc_score["score"] = 4
+                meta_desc_score["details"]["status"] = "needs improvement"
+        else:
+            meta_desc_score["details"]["status"] = "missing"
+        meta_desc_score["details"]["length"] = data.get("meta_description_length", 0)
+        meta_desc_score["details"]["recommendations"] = []
+        if not data.get("meta_description"):
+            meta_desc_score["details"]["recommendations"].append("Add a meta description")
+        elif data.get("meta_description_length", 0) < 120:
+            meta_desc_score["details"]["recommendations"].append("Meta description is too short, aim for 120-160 characters")
+        elif data.get("meta_description_length", 0) > 160:
+            meta_desc_score["details"]["recommendations"].append("Meta description may be truncated in search results")
+            
+        other_meta_score = scorecard["metadata"]["other_meta_tags"]
+        other_meta_score["score"] = 0
+        if data.get("meta_robots"): other_meta_score["score"] += 2
+        if data.get("meta_viewport"): other_meta_score["score"] += 3
+        if data.get("meta_charset"): other_meta_score["score"] += 1
+        if data.get("meta_og_tags") and len(data.get("meta_og_tags", {})) >= 3: other_meta_score["score"] += 2
+        if data.get("meta_twitter_tags") and len(data.get("meta_twitter_tags", {})) >= 2: other_meta_score["score"] += 2
+        other_meta_score["details"]["present_tags"] = []
+        other_meta_score["details"]["missing_tags"] = []
+        other_meta_score["details"]["recommendations"] = []
+        if data.get("meta_robots"):
+            other_meta_score["details"]["present_tags"].append("robots")
+        else:
+            other_meta_score["details"]["missing_tags"].append("robots")
+            other_meta_score["details"]["recommendations"].append("Add a meta robots tag")
+        if data.get("meta_viewport"):
+            other_meta_score["details"]["present_tags"].append("viewport")
+        else:
+            other_meta_score["details"]["missing_tags"].append("viewport")
+            other_meta_score["details"]["recommendations"].append("Add a viewport meta tag for mobile optimization")
+        if not data.get("meta_og_tags"):
+            other_meta_score["details"]["missing_tags"].append("Open Graph tags")
+            other_meta_score["details"]["recommendations"].append("Add Open Graph meta tags for better social sharing")
+        
+        headings_score = scorecard["content"]["headings"]
+        headings_score["details"]["counts"] = {}
+        for tag, headings in data.get("headings", {}).items():
+            headings_score["details"]["counts"][tag] = len(headings)
+        has_h1 = headings_score["details"]["counts"].get("h1", 0) > 0
+        has_single_h1 = headings_score["details"]["counts"].get("h1", 0) == 1
+        has_h2 = headings_score["details"]["counts"].get("h2", 0) > 0
+        has_structure = all(headings_score["details"]["counts"].get(f"h{i}", 0) >= 
+                           headings_score["details"]["counts"].get(f"h{i+1}", 0) 
+                           for i in range(1, 5))
+        headings_score["details"]["recommendations"] = []
+        if has_single_h1 and has_h2 and has_structure:
+            headings_score["score"] = 15
+            headings_score["details"]["status"] = "optimal"
+        elif has_h1 and has_h2:
+            headings_score["score"] = 10
+            headings_score["details"]["status"] = "good"
+            if not has_single_h1:
+                headings_score["details"]["recommendations"].append("Use exactly one H1 tag per page")
+            if not has_structure:
+                headings_score["details"]["recommendations"].append("Improve heading hierarchy structure")
+        elif has_h1 or has_h2:
+            headings_score["score"] = 5
+            headings_score["details"]["status"] = "needs improvement"
+            if not has_h1:
+                headings_score["details"]["recommendations"].append("Add an H1 tag that includes your primary keyword")
+            if not has_h2:
+                headings_score["details"]["recommendations"].append("Add H2 tags to structure your content")
+        else:
+            headings_score["score"] = 0
+            headings_score["details"]["status"] = "poor"
+            headings_score["details"]["recommendations"].append("Add proper heading structure with H1 and H2 tags")
+            
+        content_score = scorecard["content"]["content_quality"]
+        word_count = data.get("word_count", 0)
+        text_html_ratio = data.get("text_html_ratio", 0)
+        content_score["details"] = {
+            "word_count": word_count,
+            "text_html_ratio": text_html_ratio,
+            "recommendations": []
+        }
+        if word_count >= 800:
+            content_score["score"] += 8
+        elif word_count >= 500:
+            content_score["score"] += 5
+        elif word_count >= 300:
+            content_score["score"] += 3
+        else:
+            content_score["details"]["recommendations"].append("Add more content, aim for at least 500 words")
+        if text_html_ratio >= 25:
+            content_score["score"] += 7
+        elif text_html_ratio >= 15:
+            content_score["score"] += 4
+        else:
+            content_score["score"] += 2
+            content_score["details"]["recommendations"].append("Improve text to HTML ratio, aim for at least 15%")
+        content_score["score"] = min(content_score["score"], 15)
+        
+        keyword_score = scorecard["content"]["keyword_optimization"]
+        keyword_densities = data.get("keywords_density", {})
+        top_keywords = []
+        if keyword_densities:
+            top_keywords = sorted(keyword_densities.items(), key=lambda x: x[1]["density"], reverse=True)[:5]
+        keyword_score["details"] = {
+            "top_keywords": [{k: v} for k, v in top_keywords],
+            "recommendations": []
+        }
+        if top_keywords:
+            title_keywords = [kw for kw, _ in top_keywords if data.get("title") and kw.lower() in data.get("title", "").lower()]
+            h1_keywords = []
+            for h1 in data.get("headings", {}).get("h1", []):
+                h1_text = h1.get("text", "").lower()
+                h1_keywords.extend([kw for kw, _ in top_keywords if kw.lower() in h1_text])
+            optimal_density = any(1.5 <= info["density"] <= 2.5 for _, info in top_keywords[:3])
+            if title_keywords and h1_keywords and optimal_density:
+                keyword_score["score"] = 10
+            elif title_keywords or h1_keywords:
+                keyword_score["score"] = 6
+                if not title_keywords:
+                    keyword_score["details"]["recommendations"].append("Include main keywords in the page title")
+                if not h1_keywords:
+                    keyword_score["details"]["recommendations"].append("Include main keywords in the H1 heading")
+                if not optimal_density:
+                    keyword_score["details"]["recommendations"].append("Aim for keyword density between 1.5-2.5% for primary keywords")
+            else:
+                keyword_score["score"] = 3
+                keyword_score["details"]["recommendations"].append("Improve keyword usage in title, headings, and content")
+        else:
+            keyword_score["details"]["recommendations"].append("Add more focused content around target keywords")
+            
+        images_score = scorecard["media"]["images"]
+        images_count = data.get("total_images", 0)
+        images_with_alt = data.get("images_with_alt", 0)
+        images_score["details"] = {
+            "total_images": images_count,
+            "images_with_alt": images_with_alt,
+            "images_without_alt": data.get("images_without_alt", 0),
+            "alt_percentage": round((images_with_alt / images_count) * 100, 1) if images_count > 0 else 0,
+            "recommendations": []
+        }
+        if images_count > 0:
+            if images_with_alt == images_count:
+                images_score["score"] = 10
+            elif images_with_alt / images_count >= 0.8:
+                images_score["score"] = 8
+                images_score["details"]["recommendations"].append("Add alt text to all remaining images")
+            elif images_with_alt / images_count >= 0.5:
+                images_score["score"] = 5
+                images_score["details"]["recommendations"].append("Add descriptive alt text to more images")
+            else:
+                images_score["score"] = 3
+                images_score["details"]["recommendations"].append("Add alt text to images for accessibility and SEO")
+        else:
+            images_score["score"] = 5
+            images_score["details"]["recommendations"].append("Consider adding relevant images with alt text")
+            
+        media_score = scorecard["media"]["videos_and_audio"]
+        has_video = bool(data.get("videos"))
+        has_audio = bool(data.get("audios"))
+        media_score["details"] = {
+            "videos_count": len(data.get("videos", [])),
+            "audios_count": len(data.get("audios", [])),
+            "recommendations": []
+        }
+        if has_video or has_audio:
+            media_score["score"] = 5
+        else:
+            media_score["score"] = 0
+            media_score["details"]["recommendations"].append("Consider adding multimedia content for engagement")
+            
+        sd_score = scorecard["technical"]["structured_data"]
+        has_structured_data = data.get("has_structured_data", False)
+        structured_data_count = len(data.get("structured_data", []))
+        sd_score["details"] = {
+            "present": has_structured_data,
+            "count": structured_data_count,
+            "types": [self._get_schema_type(sd) for sd in data.get("structured_data", [])],
+            "recommendations": []
+        }
+        if has_structured_data:
+            sd_score["score"] = 10 if structured_data_count >= 2 else 7
+        else:
+            sd_score["score"] = 0
+            sd_score["details"]["recommendations"].append("Add structured data like Schema.org markup")
+            
+        mobile_score = scorecard["technical"]["mobile_friendly"]
+        mobile_score["details"] = {
+            "has_viewport_meta": data.get("has_viewport_meta", False),
+            "has_mobile_friendly_design": data.get("has_mobile_friendly_design", False),
+            "recommendations": []
+        }
+        if data.get("has_viewport_meta") and data.get("has_mobile_friendly_design"):
+            mobile_score["score"] = 10
+        elif data.get("has_viewport_meta"):
+            mobile_score["score"] = 7
+            mobile_score["details"]["recommendations"].append("Ensure design is fully responsive")
+        else:
+            mobile_score["score"] = 0
+            mobile_score["details"]["recommendations"].append("Add viewport meta tag and ensure mobile-friendly design")
+            
+        speed_score = scorecard["technical"]["page_speed_indicators"]
+        resource_hints = data.get("resource_hints", {})
+        has_preload = bool(resource_hints.get("preload"))
+        has_prefetch = bool(resource_hints.get("prefetch"))
+        has_preconnect = bool(resource_hints.get("preconnect"))
+        has_dns_prefetch = bool(resource_hints.get("dns-prefetch"))
+        speed_score["details"] = {
+            "resource_hints_used": [k for k, v in resource_hints.items() if v],
+            "resource_hints_missing": [k for k, v in resource_hints.items() if not v],
+            "js_resources": len(data.get("script_sources", [])),
+            "css_resources": len(data.get("style_links", [])),
+            "inline_styles": data.get("inline_styles", 0),
+            "inline_scripts": data.get("inline_scripts", 0),
+            "page_size_kb": round(data.get("page_size_bytes", 0) / 1024, 2),
+            "recommendations": []
+        }
+        resource_hint_score = 0
+        if has_preload: resource_hint_score += 2
+        if has_prefetch: resource_hint_score += 2
+        if has_preconnect or has_dns_prefetch: resource_hint_score += 2
+        page_size_kb = data.get("page_size_bytes", 0) / 1024
+        size_score = 5 if page_size_kb < 100 else (3 if page_size_kb < 200 else 1)
+        speed_score["score"] = min(resource_hint_score + size_score, 10)
+        if not has_preload and not has_prefetch:
+            speed_score["details"]["recommendations"].append("Use preload/prefetch resource hints for critical resources")
+        if not has_preconnect and not has_dns_prefetch:
+            speed_score["details"]["recommendations"].append("Use preconnect/dns-prefetch for external domains")
+        if page_size_kb >= 200:
+            speed_score["details"]["recommendations"].append("Reduce page size to improve load speed")
+
+        security_score = scorecard["technical"]["security"]
+        security_score["details"] = {
+            "has_https": data.get("has_https", False),
+            "has_content_security_policy": "Content-Security-Policy" in data.get("headers", {}),
+            "recommendations": []
+        }
+        if data.get("has_https"):
+            security_score["score"] = 5
+        else:
+            security_score["score"] = 0
+            security_score["details"]["recommendations"].append("Switch to HTTPS for secure connections")
+
+        internal_links_score = scorecard["links"]["internal_links"]
+        internal_links = data.get("internal_links", [])
+        internal_links_count = len(internal_links)
+        internal_links_with_text = sum(1 for link in internal_links if link.get("has_text"))
+        internal_links_score["details"] = {
+            "count": internal_links_count,
+            "with_descriptive_text": internal_links_with_text,
+            "recommendations": []
+        }
+        if internal_links_count >= 3:
+            if internal_links_with_text == internal_links_count:
+                internal_links_score["score"] = 10
+            elif internal_links_with_text / internal_links_count >= 0.8:
+                internal_links_score["score"] = 8
+                internal_links_score["details"]["recommendations"].append("Add descriptive text to all internal links")
+            else:
+                internal_links_score["score"] = 5
+                internal_links_score["details"]["recommendations"].append("Add descriptive anchor text to internal links")
+        else:
+            internal_links_score["score"] = 3
+            internal_links_score["details"]["recommendations"].append("Add more internal links to improve site structure")
+
+        external_links_score = scorecard["links"]["external_links"]
+        external_links = data.get("external_links", [])
+        external_links_count = len(external_links)
+        external_links_with_nofollow = sum(1 for link in external_links if link.get("nofollow"))
+        external_links_score["details"] = {
+            "count": external_links_count,
+            "with_nofollow": external_links_with_nofollow,
+            "recommendations": []
+        }
+        if external_links_count > 0:
+            if external_links_count <= 100:
+                external_links_score["score"] = 5
+            else:
+                external_links_score["score"] = 3
+                external_links_score["details"]["recommendations"].append("Too many external links may dilute page authority")
+        else:
+            external_links_score["score"] = 2
+            external_links_score["details"]["recommendations"].append("Consider adding a few high-quality external links")
+
+        canonical_score = scorecard["links"]["canonical"]
+        has_canonical = bool(data.get("canonical_url"))
+        canonical_matches = data.get("canonical_matches_url", False)
+        canonical_score["details"] = {
+            "has_canonical": has_canonical,
+            "canonical_matches_url": canonical_matches,
+            "canonical_url": data.get("canonical_url"),
+            "recommendations": []
+        }
+        if has_canonical:
+            if canonical_matches:
+                canonical_score["score"] = 5
+            else:
+                canonical_score["score"] = 3
+                canonical_score["details"]["recommendations"].append("Canonical URL does not match page URL")
+        else:
+            canonical_score["score"] = 0
+            canonical_score["details"]["recommendations"].append("Add canonical tag to prevent duplicate content issues")
+
+        language_score = scorecard["international"]["language"]
+        has_language = bool(data.get("language"))
+        language_score["details"] = {
+            "has_language_attribute": has_language,
+            "language": data.get("language"),
+            "recommendations": []
+        }
+        if has_language:
+            language_score["score"] = 5
+        else:
+            language_score["score"] = 0
+            language_score["details"]["recommendations"].append("Add lang attribute to html tag")
+
+        hreflang_score = scorecard["international"]["hreflang"]
+        has_hreflang = bool(data.get("hreflang_tags"))
+        hreflang_score["details"] = {
+            "has_hreflang": has_hreflang,
+            "hreflang_count": len(data.get("hreflang_tags", [])),
+            "recommendations": []
+        }
+        if has_hreflang:
+            hreflang_score["score"] = 5
+        else:
+            hreflang_score["score"] = 0
+            hreflang_score["details"]["recommendations"].append("Add hreflang tags if targeting multiple languages/regions")
+
+        total_max_score = sum(category["max_score"] for section in scorecard.values() for category in section.values())
+        total_score = sum(category["score"] for section in scorecard.values() for category in section.values())
+        scorecard["total_score"] = round((total_score / total_max_score) * 100) if total_max_score > 0 else 0
+        
+        return scorecard
+
+    def _get_schema_type(self, schema_data):
+        if isinstance(schema_data, dict):
+            return schema_data.get("@type", "Unknown")
+        return "Unknown"
+
+
+def text(rng, length):
+    return "".join(rng.choice(string.ascii_lowercase + " ") for _ in range(length))
+
+
+def vary(base, rng):
+    data = copy.deepcopy(base)
+    keywords = [text(rng, rng.randint(3, 8)).strip() or "kw" for _ in range(rng.randint(0, 6))]
+    data["keywords_density"] = {
+        kw: {"count": rng.randint(1, 20), "density": rng.choice([1.5, 2.5, round(rng.uniform(0.2, 3.5), 2)])}
+        for kw in keywords
+    }
+    title = rng.choice([None, "", text(rng, rng.choice([10, 25, 30, 45, 60, 65, 70, 90]))])
+    if title and keywords and rng.random() < 0.5:
+        title = f"{title} {rng.choice(keywords)}"
+    data["title"] = title
+    data["title_length"] = len(title) if title else 0
+    description = rng.choice([None, text(rng, rng.choice([50, 80, 120, 140, 160, 180, 200, 240]))])
+    data["meta_description"] = description
+    data["meta_description_length"] = len(description) if description else 0
+    for key in ("meta_robots", "meta_viewport", "meta_charset", "canonical_url", "language"):
+        data[key] = rng.choice([None, "x"])
+    data["meta_og_tags"] = {f"og:{i}": "x" for i in range(rng.randint(0, 4))}
+    data["meta_twitter_tags"] = {f"twitter:{i}": "x" for i in range(rng.randint(0, 3))}
+    data["headings"] = {
+        f"h{level}": [
+            {"text": rng.choice(keywords) if keywords and rng.random() < 0.4 else text(rng, 12), "length": 12}
+            for _ in range(rng.randint(0, 3))
+        ]
+        for level in range(1, 7)
+    }
+    data["word_count"] = rng.choice([0, 299, 300, 500, 799, 800, rng.randint(0, 1500)])
+    data["text_html_ratio"] = rng.choice([0, 15, 25, round(rng.uniform(0, 40), 2)])
+    total_images = rng.randint(0, 10)
+    data["total_images"] = total_images
+    data["images_with_alt"] = rng.randint(0, total_images)
+    data["images_without_alt"] = total_images - data["images_with_alt"]
+    data["videos"] = ["v"] * rng.randint(0, 2)
+    data["audios"] = ["a"] * rng.randint(0, 1)
+    data["structured_data"] = [rng.choice([{"@type": "Article"}, {}, "raw"]) for _ in range(rng.randint(0, 3))]
+    data["has_structured_data"] = bool(data["structured_data"])
+    data["has_viewport_meta"] = rng.random() < 0.7
+    data["has_mobile_friendly_design"] = rng.random() < 0.6
+    data["resource_hints"] = {hint: ["x"] * rng.randint(0, 1) for hint in data["resource_hints"]}
+    data["page_size_bytes"] = rng.choice([102400, 204800, rng.randint(1000, 300000)])
+    data["has_https"] = rng.random() < 0.8
+    data["internal_links"] = [{"has_text": rng.random() < 0.85} for _ in range(rng.randint(0, 8))]
+    data["external_links"] = [{"nofollow": rng.random() < 0.3} for _ in range(rng.choice([0, 3, 100, 101]))]
+    data["canonical_matches_url"] = rng.random() < 0.6
+    data["hreflang_tags"] = ["x"] * rng.randint(0, 2)
+    return data
+
+
+def load_pages(count):
+    bases = []
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+                url = fixture_url(name)
+                bases.append(to_builtins(PageExtractor("www.example.com").extract(f.read(), url)))
+    rng = random.Random(0)
+    return bases + [vary(bases[i % len(bases)], rng) for i in range(count - len(bases))]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=5000)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    legacy = LegacyScorer()
+    engine = ScoringEngine()
+
+    expected, legacy_s = timed(lambda: [legacy.calculate_scorecard(data) for data in pages])
+    scorecards, batch_s = timed(lambda: engine.scorecards(pages))
+    for data, old, new in zip(pages, expected, scorecards):
+        if encode_json(old) != encode_json(new):
+            raise SystemExit(f"{data['page_url']}: scorecards differ\n{encode_json(old)}\n{encode_json(new)}")
+
+    single, single_s = timed(lambda: [engine.scorecard(data) for data in pages])
+    custom = ScoringEngine(weights={"content.keyword_optimization": 20, "media.videos_and_audio": 0},
+                           thresholds={"metadata.title": {"optimal": (40, 55)}})
+    for data, batch, one, custom_batch in zip(pages, scorecards, single, custom.scorecards(pages)):
+        if encode_json(one) != encode_json(batch) or encode_json(custom.scorecard(data)) != encode_json(custom_batch):
+            raise SystemExit(f"{data['page_url']}: per-page scorecard differs from the batch one")
+
+    features, features_s = timed(lambda: engine.features_frame(pages))
+    reweighted = ScoringEngine(weights={"content.keyword_optimization": 20, "media.videos_and_audio": 0})
+    _, frame_s = timed(lambda: reweighted.score_frame(features))
+    stored = {f"{data['page_url']}#{i}": to_builtins(card) for i, (data, card) in enumerate(zip(pages, expected))}
+    _, reweight_s = timed(lambda: reweighted.reweight(stored))
+
+    print(f"{len(pages)} pages, scorecards identical (legacy, batch and per page)")
+    print(f"{'mode':<34}{'ms':>10}{'us/page':>10}")
+    for mode, seconds in [
+        ("legacy calculate_scorecard", legacy_s),
+        ("engine scorecard (per page)", single_s),
+        ("engine scorecards (batch)", batch_s),
+        ("engine features_frame", features_s),
+        ("score_frame, new weights", frame_s),
+        ("reweight stored scorecards", reweight_s),
+    ]:
+        print(f"{mode:<34}{seconds * 1000:>10.1f}{seconds / len(pages) * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Template detection benchmark: extraction time per page with and without learned page chrome.
+
+Run from backend/:
+
+    python -m benchmarks.templates_benchmark [--pages N] [--parser NAME ...]
+
+Three synthetic sites are extracted page by page, in crawl order:
+
+- fixture: the docs_page.html fixture with its article paragraphs shuffled
+  and the active menu item moved on every page (chrome is under a third of the HTML)
+- cms: a CMS-style page with a mega menu, sidebar widgets and a large footer
+  with unclosed <p> tags around a short article (chrome is most of the HTML)
+- cards: a listing page whose shared cards are wrapped in links, and whose
+  shared promo box is wrapped in a link only after the templates are learned
+
+All sites are run with every parser available (html.parser and lxml when it
+is installed). Every page's data from the TemplateCache extractor is first
+checked to be identical to the plain extractor's with the same parser, apart
+from the template fields. Times are the medians over the pages extracted
+after the templates were learned.
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import time
+
+from benchmarks.extraction_benchmark import available_parsers
+from controller.audit.extractor import PageExtractor
+from serialization import to_builtins
+from controller.audit.templates import TemplateCache
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "docs_page.html")
+TEMPLATE_FIELDS = ("template_blocks", "content_word_count")
+WORDS = ("audit crawl index ranking schema canonical snippet backlink query intent content heading mobile "
+         "performance accessibility analytics domain authority conversion structure meta link").split()
+SECTIONS = ("blog", "docs", "pricing", "about", "careers", "contact", "shop", "support")
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+
+
+def fixture_site(rng, pages):
+    html = open(FIXTURE, encoding="utf-8").read()
+    main_start, main_end = html.index("<main>"), html.index("</main>")
+    paragraphs = re.findall(r"<p>.*?</p>", html[main_start:main_end], re.S)
+    active = 'class="active"'
+    for i in range(pages):
+        body = rng.sample(paragraphs, k=max(1, len(paragraphs) * 3 // 4))
+        page = html[:main_start] + "<main><article><h1>Page %d</h1>%s</article>" % (i, "".join(body)) + html[main_end:]
+        # Move the active menu item, as a CMS marks the current section
+        page = page.replace(active, 'class=""', 1).replace(
+            f'href="/{rng.choice(SECTIONS)}/" class=""', f'href="/{rng.choice(SECTIONS)}/" {active}', 1)
+        yield f"https://docs.example.com/page-{i}", page
+
+
+def cms_page(rng, i, menu, footer, sidebar):
+    article = "".join(f"<p>{sentence(rng, 40)} <strong>{sentence(rng, 3)}</strong></p>" for _ in range(6))
+    return (
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\"><title>Article %d</title>"
+        "<meta name=\"description\" content=\"%s\"><link rel=\"canonical\" href=\"https://cms.example.com/a/%d\">"
+        "</head><body><header class=\"masthead\"><div class=\"brand\"><a href=\"/\"><img src=\"/logo.png\" alt=\"Logo\">"
+        "</a></div>%s</header><div class=\"layout\"><main><h1>%s</h1>%s</main>%s</div>%s</body></html>"
+        % (i, sentence(rng), i, menu, sentence(rng, 6), article, sidebar, footer)
+    )
+
+
+def cms_site(rng, pages):
+    menu = "<nav class=\"mega-menu\"><ul>%s</ul></nav>" % "".join(
+        "<li><a href=\"/%s/\">%s</a><div class=\"panel\"><ul>%s</ul></div></li>" % (
+            section, section.title(),
+            "".join(f"<li><a href=\"/{section}/{j}\" title=\"{sentence(rng, 3)}\">{sentence(rng, 3)}</a></li>"
+                    for j in range(25)))
+        for section in SECTIONS
+    )
+    sidebar = "<aside class=\"sidebar\">%s</aside>" % "".join(
+        "<div class=\"widget\"><h3>%s</h3><ul>%s</ul></div>" % (
+            sentence(rng, 2), "".join(f"<li><a href=\"/popular/{w}-{j}\">{sentence(rng, 6)}</a></li>" for j in range(10)))
+        for w in range(4)
+    )
+    # Unclosed <p>s: html.parser nests them, lxml closes each at the next block
+    footer = "<footer class=\"site-footer\">%s<p>%s<p>%s</footer>" % (
+        "".join("<div class=\"col\"><h4>%s</h4><p>%s<ul>%s</ul></div>" % (
+            sentence(rng, 1), sentence(rng, 8),
+            "".join(f"<li><a href=\"/f/{c}/{j}\">{sentence(rng, 2)}</a></li>" for j in range(15)))
+            for c in range(6)),
+        sentence(rng, 30), sentence(rng, 10),
+    )
+    for i in range(pages):
+        yield f"https://cms.example.com/a/{i}", cms_page(rng, i, menu, footer, sidebar)
+
+
+def card(rng, i):
+    return (f"<div class=\"card\"><img src=\"/img/{i}.png\" alt=\"{sentence(rng, 2)}\"><h3>{sentence(rng, 4)}</h3>"
+            f"<div class=\"card-body\">{sentence(rng, 30)}</div></div>")
+
+
+def cards_site(rng, pages, learn_pages):
+    menu = "<nav class=\"menu\"><ul>%s</ul></nav>" % "".join(
+        f"<li><a href=\"/{section}/\">{section.title()} {sentence(rng, 2)}</a></li>" for section in SECTIONS)
+    cards = [card(rng, i) for i in range(4)]
+    promo = f"<div class=\"promo\"><h4>{sentence(rng, 3)}</h4><div>{sentence(rng, 40)}</div></div>"
+    for i in range(pages):
+        listing = "".join(f"<a href=\"/item/{j}\">{cards[j]}</a>" for j in range(len(cards)))
+        # Cut out as a template, then found inside a link once the templates are learned
+        box = promo if i < learn_pages else f"<a href=\"/offer\">{promo}</a>"
+        yield f"https://shop.example.com/list/{i}", (
+            "<!DOCTYPE html><html><head><title>List %d</title></head><body><header>%s</header>"
+            "<main><h1>%s</h1><p>%s</p>%s</main>%s</body></html>" % (i, menu, sentence(rng, 5), sentence(rng, 20),
+                                                                      listing, box))
+
+
+def comparable(data):
+    data = to_builtins(data)
+    for field in TEMPLATE_FIELDS:
+        data.pop(field)
+    return data
+
+
+def per_page(extractor, pages):
+    samples = []
+    for url, html in pages:
+        start = time.perf_counter()
+        extractor.extract(html, url)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(name, pages, parser):
+    domain = pages[0][0].split("/")[2]
+    plain = PageExtractor(domain, parser=parser)
+    templates = TemplateCache()
+    learning = PageExtractor(domain, parser=parser, templates=templates)
+
+    content_words = words = 0
+    for url, html in pages:
+        expected, actual = plain.extract(html, url), learning.extract(html, url)
+        if comparable(actual) != comparable(expected):
+            raise SystemExit(f"{name}: {url} differs from the plain extractor with {parser}")
+        if templates.learned:
+            words += actual["word_count"]
+            content_words += actual["content_word_count"]
+
+    later = pages[templates.learn_pages:]
+    chrome = 1 - len(templates.apply(later[0][1])[0]) / len(later[0][1])
+    plain_ms = per_page(plain, later)
+    template_ms = per_page(learning, later)
+    print(f"{name:<9}{parser:<13}{len(templates.blocks):>8}{chrome:>8.0%}{plain_ms:>10.2f}ms"
+          f"{template_ms:>10.2f}ms{plain_ms / template_ms:>9.2f}x{words / len(later):>10.0f}"
+          f"{content_words / len(later):>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--parser", nargs="+", default=available_parsers())
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sites = {"fixture": list(fixture_site(rng, args.pages)), "cms": list(cms_site(rng, args.pages)),
+             "cards": list(cards_site(rng, args.pages, TemplateCache().learn_pages))}
+    print(f"{'site':<9}{'parser':<13}{'blocks':>8}{'chrome':>8}{'plain':>12}{'templates':>12}{'speedup':>10}"
+          f"{'words':>10}{'content':>10}")
+    for name, pages in sites.items():
+        for parser_name in args.parser:
+            run(name, pages, parser_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import msgspec
+import zstandard
+
+from controller.audit.records import PageRecord
+
+AUDIT_ARCHIVE_PATH = os.getenv("AUDIT_ARCHIVE_PATH", "audit_archive.sqlite3")
+ARCHIVE_ZSTD_LEVEL = int(os.getenv("ARCHIVE_ZSTD_LEVEL", "3"))
+# Retention: the newest N runs of each site, none older than D days; 0 turns either limit off
+AUDIT_ARCHIVE_KEEP_RUNS = int(os.getenv("AUDIT_ARCHIVE_KEEP_RUNS", "10"))
+AUDIT_ARCHIVE_MAX_AGE_DAYS = int(os.getenv("AUDIT_ARCHIVE_MAX_AGE_DAYS", "90"))
+
+
+class ExtractionArchive:
+    """Raw page extractions kept after scoring, so audits can be re-scored offline.
+
+    Each PageRecord is msgpack-encoded, zstd-compressed and stored once per
+    ``content_hash``: unchanged pages in later runs, and identical HTML
+    served at several URLs, share one payload (as extracted from the first
+    URL it was seen at). Every audit run gets a manifest of (url,
+    content_hash) rows in crawl order, which is what ``rescore`` replays.
+
+    ``prune`` drops runs past the retention limits, and the payloads no
+    remaining run points at; SQLite reuses the freed pages for later runs.
+    """
+
+    def __init__(self, path=AUDIT_ARCHIVE_PATH, commit_every=100, level=ARCHIVE_ZSTD_LEVEL,
+                 keep_runs=AUDIT_ARCHIVE_KEEP_RUNS, max_age_days=AUDIT_ARCHIVE_MAX_AGE_DAYS):
+        self.path = path
+        self.commit_every = commit_every
+        self.level = level
+        self.keep_runs = keep_runs
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pending = 0
+        self._decoder = msgspec.msgpack.Decoder(PageRecord)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                content_hash TEXT PRIMARY KEY,
+                payload BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                id TEXT PRIMARY KEY,
+                base_url TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS run_pages (
+                run_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                PRIMARY KEY (run_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS runs_site ON runs (base_url, created_at);
+            CREATE INDEX IF NOT EXISTS run_pages_hash ON run_pages (content_hash);
+        """)
+        self._conn.commit()
+        self._seq = {}
+
+    def _compressor(self):
+        # zstd contexts are not thread-safe; crawl threads each get their own
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+        return compressor
+
+    def encode(self, record):
+        return self._compressor().compress(msgspec.msgpack.encode(record))
+
+    def decode(self, payload):
+        return self._decoder.decode(zstandard.ZstdDecompressor().decompress(payload))
+
+    def start_run(self, base_url, depth):
+        run_id = str(uuid4())
+        with self._lock:
+            self._conn.execute("INSERT INTO runs (id, base_url, depth, created_at) VALUES (?, ?, ?, ?)",
+                               (run_id, base_url, depth, datetime.utcnow().isoformat()))
+            self._conn.commit()
+            self._seq[run_id] = 0
+        return run_id
+
+    def add(self, run_id, url, data):
+        """Record ``url`` in the run; fresh extractions are archived as well.
+
+        Pages reused from a previous audit only carry their content_hash, so
+        they point at the payload an earlier run archived.
+        """
+        content_hash = data.get("content_hash")
+        if not content_hash:
+            return
+        payload = self.encode(data) if isinstance(data, PageRecord) else None
+        with self._lock:
+            if payload is not None:
+                self._conn.execute("INSERT OR IGNORE INTO extractions (content_hash, payload) VALUES (?, ?)",
+                                   (content_hash, payload))
+            self._seq[run_id] += 1
+            self._conn.execute("INSERT INTO run_pages (run_id, seq, url, content_hash) VALUES (?, ?, ?, ?)",
+                               (run_id, self._seq[run_id], url, content_hash))
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._conn.commit()
+                self._pending = 0
+
+    def get(self, content_hash):
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM extractions WHERE content_hash = ?",
+                                     (content_hash,)).fetchone()
+        return self.decode(row[0]) if row else None
+
+    def get_many(self, content_hashes):
+        """{content_hash: PageRecord} for the hashes that are archived."""
+        hashes = list(dict.fromkeys(content_hashes))
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(hashes), 900):
+            batch = hashes[start:start + 900]
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT content_hash, payload FROM extractions WHERE content_hash IN ({placeholders})", batch
+                ).fetchall()
+            for content_hash, payload in rows:
+                found[content_hash] = self.decode(payload)
+        return found
+
+    def run(self, run_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.id, r.base_url, r.depth, r.created_at, COUNT(p.seq) FROM runs r "
+                "LEFT JOIN run_pages p ON p.run_id = r.id WHERE r.id = ? GROUP BY r.id", (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("run_id", "base_url", "depth", "created_at", "pages"), row))
+
+    def runs(self, limit=50):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.id, r.base_url, r.depth, r.created_at, COUNT(p.seq) FROM runs r "
+                "LEFT JOIN run_pages p ON p.run_id = r.id GROUP BY r.id ORDER BY r.created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(zip(("run_id", "base_url", "depth", "created_at", "pages"), row)) for row in rows]
+
+    def run_pages(self, run_id, chunk_size=500):
+        """(url, content_hash) rows of a run in crawl order, ``chunk_size`` at a time."""
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT seq, url, content_hash FROM run_pages WHERE run_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                    (run_id, last_seq, chunk_size),
+                ).fetchall()
+            if not rows:
+                return
+            yield [(url, content_hash) for _, url, content_hash in rows]
+            last_seq = rows[-1][0]
+
+    def prune(self):
+        """Delete runs past the retention limits and payloads no longer used; returns the runs deleted."""
+        with self._lock:
+            expired = set()
+            if self.max_age_days > 0:
+                cutoff = (datetime.utcnow() - timedelta(days=self.max_age_days)).isoformat()
+                expired.update(run_id for (run_id,) in self._conn.execute(
+                    "SELECT id FROM runs WHERE created_at < ?", (cutoff,)))
+            if self.keep_runs > 0:
+                expired.update(run_id for (run_id,) in self._conn.execute(
+                    "SELECT id FROM (SELECT id, ROW_NUMBER() OVER "
+                    "(PARTITION BY base_url ORDER BY created_at DESC) AS newest FROM runs) WHERE newest > ?",
+                    (self.keep_runs,)))
+            # Never the runs this archive is still writing
+            expired -= set(self._seq)
+            if not expired:
+                return 0
+            for run_id in expired:
+                self._conn.execute("DELETE FROM run_pages WHERE run_id = ?", (run_id,))
+                self._conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+            self._conn.execute("DELETE FROM extractions WHERE content_hash NOT IN "
+                               "(SELECT content_hash FROM run_pages)")
+            self._conn.commit()
+            self._pending = 0
+        return len(expired)
+
+    def flush(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+_archive = None
+
+
+def get_archive() -> ExtractionArchive:
+    global _archive
+    if _archive is None:
+        _archive = ExtractionArchive()
+    return _archive
+
+
+def shutdown_archive():
+    global _archive
+    if _archive is not None:
+        _archive.close()
+        _archive = None
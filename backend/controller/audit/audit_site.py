@@ -1,48 +1,124 @@
-import requests
-from bs4 import BeautifulSoup
-import json
-from urllib.parse import urljoin, urlparse
-import re
+import httpx
+import asyncio
+import logging
+from urllib.parse import urlparse
 import concurrent.futures
+import multiprocessing
+import threading
+import queue
 import time
-from collections import Counter
 import hashlib
-from datetime import datetime
 from db.session import SessionLocal
-from models.audit import Audit
-from models.page import Page
-from models.project import Project
-from uuid import uuid4
+from controller.audit.extractor import PageExtractor
+from controller.audit.keywords import CorpusKeywords, term_counts
+from controller.audit.templates import TemplateCache
+from controller.audit.http_pool import HTTPPool
+from controller.audit.scheduler import THROTTLE_STATUSES, backoff_delay
+from controller.audit.discovery import (
+    ROBOTS_AGENT, START_PRIORITY, LINK_PRIORITY, robots_cache, sitemap_urls_for,
+    collect_sitemap_entries, acollect_sitemap_entries, prioritise
+)
+from controller.audit.incremental import conditional_headers, load_previous_pages
+from controller.audit.result_store import DiskResultStore
+from controller.audit.summary import SummaryAggregator
+from controller.audit.persistence import persist_audit_run
+from controller.audit.urls import URLCanonicalizer, FingerprintSet
+from serialization import encode_json
+from controller.audit.scoring import ScoringEngine
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Queued behind every URL, one per crawl thread, to stop them once the frontier is drained
+STOP_PRIORITY = (float("inf"), 0)
+
+logger = logging.getLogger(__name__)
 
 class SEOAudit:
-    def __init__(self, url, user_agent=None, depth=0, max_pages=1):
-        self.base_url = url
-        self.domain = urlparse(url).netloc
-        self.scheme = urlparse(url).scheme
+    def __init__(self, url, user_agent=None, depth=0, max_pages=1, concurrency=10, parser="html.parser",
+                 max_per_host=6, http_pool=None, previous_pages=None, progress_callback=None,
+                 low_memory=False, results_path=None, respect_robots=True, use_sitemaps=True,
+                 strip_params=None, extract_workers=0, scoring=None, archive=None, keywords=None):
+        self.canonicalize = URLCanonicalizer(scheme=urlparse(url).scheme.lower(), strip_params=strip_params)
+        self.base_url = self.canonicalize(url)
+        self.domain = urlparse(self.base_url).netloc
+        self.scheme = urlparse(self.base_url).scheme
         self.depth = depth
         self.max_pages = max_pages
+        self.concurrency = max(1, concurrency)
         self.pages_audited = 0
-        self.visited_urls = set()
+        self._lock = threading.Lock()
+        # Set by stop(); the crawl then drains its frontier without fetching anything more
+        self._stopped = threading.Event()
+        # Fingerprints of canonical URLs, so utm_ variants, fragments etc. are only fetched once
+        self.visited_urls = FingerprintSet(capacity=min(max_pages, 1 << 20))
         self.user_agent = user_agent or "Mozilla/5.0 (compatible; SEOAuditBot/1.0; +https://example.com/bot)"
         self.headers = {
             "User-Agent": self.user_agent,
             "Accept": "text/html,application/xhtml+xml,application/xml",
             "Accept-Language": "en-US,en;q=0.9",
         }
-        self.all_results = {}
+        # In low-memory mode page results go straight to disk as they are scored
+        self.all_results = DiskResultStore(results_path) if low_memory else {}
+        self.summary = SummaryAggregator(self.base_url, self.depth, keep_pages=not low_memory)
+        self.previous_pages = previous_pages or {}
+        self.progress_callback = progress_callback
+        self._stream_queue = None
+        # Page chrome learned from the first pages is not parsed again on later ones
+        self.extractor = PageExtractor(self.domain, parser=parser, templates=TemplateCache())
+        self.scoring = scoring or ScoringEngine()
+        # Raw extractions are archived per run so the audit can be re-scored offline
+        self.archive = archive
+        self.archive_run_id = archive.start_run(self.base_url, self.depth) if archive else None
+        # Document frequencies across every page crawled, for site-wide TF-IDF keywords
+        self.keywords = keywords if keywords is not None else CorpusKeywords()
+        self.parser = parser
+        self.strip_params = strip_params
+        self.extract_workers = extract_workers
+        self._extract_pool = None
+        self._owns_http = http_pool is None
+        self.http = http_pool or HTTPPool(self.headers, max_connections=self.concurrency, max_per_host=max_per_host)
+        self.respect_robots = respect_robots
+        self.use_sitemaps = use_sitemaps
+        self.robots = None
+        self.seeds = []
+        self.discovery = {"robots_txt": False, "crawl_delay": None, "sitemap_urls": 0, "disallowed": 0}
+        self._frontier_seq = 0
 
     def fetch_html(self, url, retry=2):
-        attempt = 0
-        while attempt <= retry:
+        response = self.fetch_page(url, retry)
+        if response is None or response.status_code == 304:
+            return None
+        return response.text
+
+    def fetch_page(self, url, retry=2):
+        for attempt in range(retry + 1):
+            try:
+                response = self.http.get(url, headers=conditional_headers(self.previous_pages.get(url)))
+            except httpx.HTTPError:
+                response = None
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                return response if response.status_code < 400 else None
+            if attempt < retry:
+                time.sleep(self._retry_delay(response, attempt))
+        return None
+
+    async def fetch_page_async(self, url, retry=2):
+        for attempt in range(retry + 1):
             try:
-                response = requests.get(url, headers=self.headers, timeout=15)
-                response.raise_for_status()
-                return response.text
-            except requests.RequestException:
-                attempt += 1
-                if attempt > retry:
-                    return None
-                time.sleep(1)
+                response = await self.http.aget(url, headers=conditional_headers(self.previous_pages.get(url)),
+                                                tenant=self.domain)
+            except httpx.HTTPError:
+                response = None
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                return response if response.status_code < 400 else None
+            if attempt < retry:
+                await asyncio.sleep(self._retry_delay(response, attempt))
+        return None
+
+    def _retry_delay(self, response, attempt):
+        # 429/503 already hold the whole host back in the scheduler; other failures back off here
+        if response is not None and response.status_code in THROTTLE_STATUSES:
+            return 0
+        return backoff_delay(attempt)
 
     def is_valid_internal_url(self, url):
         if not url or not url.startswith(('http://', 'https://')):
@@ -50,822 +126,469 @@ class SEOAudit:
         parsed_url = urlparse(url)
         return parsed_url.netloc == self.domain
 
-    def extract_seo_data(self, html, page_url):
-        if not html:
-            return None
-        soup = BeautifulSoup(html, "html.parser")
-        data = {
-            "page_url": page_url,
-            "content_hash": hashlib.md5(html.encode()).hexdigest(),
-            "page_size_bytes": len(html),
-        }
-        
-        data["title"] = soup.title.string.strip() if soup.title else None
-        data["title_length"] = len(data["title"]) if data["title"] else 0
-        
-        meta_description = soup.find("meta", attrs={"name": "description"})
-        data["meta_description"] = meta_description.get("content", "").strip() if meta_description else None
-        data["meta_description_length"] = len(data["meta_description"]) if data["meta_description"] else 0
-        
-        data["meta_robots"] = soup.find("meta", attrs={"name": "robots"}).get("content", "").strip() if soup.find("meta", attrs={"name": "robots"}) else None
-        data["meta_keywords"] = soup.find("meta", attrs={"name": "keywords"}).get("content", "").strip() if soup.find("meta", attrs={"name": "keywords"}) else None
-        data["meta_viewport"] = soup.find("meta", attrs={"name": "viewport"}).get("content", "").strip() if soup.find("meta", attrs={"name": "viewport"}) else None
-        data["meta_charset"] = soup.find("meta", attrs={"charset": True}).get("charset", "").strip() if soup.find("meta", attrs={"charset": True}) else None
-        data["meta_og_tags"] = self._extract_og_tags(soup)
-        data["meta_twitter_tags"] = self._extract_twitter_tags(soup)
-
-        canonical = soup.find("link", rel="canonical")
-        data["canonical_url"] = canonical["href"].strip() if canonical and canonical.has_attr("href") else None
-        data["canonical_matches_url"] = (data["canonical_url"] == page_url) if data["canonical_url"] else False
-
-        headings = {}
-        for i in range(1, 7):
-            tag = f"h{i}"
-            headings[tag] = [{"text": h.get_text(strip=True), "length": len(h.get_text(strip=True))} for h in soup.find_all(tag)]
-        data["headings"] = headings
-        
-        data["paragraphs"] = [p.get_text(strip=True) for p in soup.find_all("p")]
-        data["word_count"] = self._calculate_word_count(soup)
-        data["text_html_ratio"] = self._calculate_text_html_ratio(soup, html)
-        data["keywords_density"] = self._extract_keyword_density(soup)
-
-        data["strong_tags"] = [s.get_text(strip=True) for s in soup.find_all("strong")]
-        data["em_tags"] = [e.get_text(strip=True) for e in soup.find_all("em")]
-        data["b_tags"] = [b.get_text(strip=True) for b in soup.find_all("b")]
-        data["i_tags"] = [i.get_text(strip=True) for i in soup.find_all("i")]
-
-        images = []
-        for img in soup.find_all("img"):
-            image_data = {
-                "src": urljoin(page_url, img.get("src")) if img.get("src") else None,
-                "alt": img.get("alt", "").strip(),
-                "alt_length": len(img.get("alt", "").strip()) if img.get("alt") else 0,
-                "title": img.get("title", "").strip(),
-                "width": img.get("width"),
-                "height": img.get("height"),
-                "lazy_loaded": img.has_attr("loading") and img["loading"] == "lazy"
-            }
-            images.append(image_data)
-        data["images"] = images
-        data["images_with_alt"] = sum(1 for img in images if img["alt"])
-        data["images_without_alt"] = sum(1 for img in images if not img["alt"] and img["src"])
-        data["total_images"] = len(images)
-
-        internal_links = []
-        external_links = []
-        
-        for a in soup.find_all("a", href=True):
-            href = a.get("href", "").strip()
-            if not href or href.startswith('#'):
-                continue
-                
-            full_url = urljoin(page_url, href)
-            parsed_url = urlparse(full_url)
-            
-            link_data = {
-                "href": full_url,
-                "text": a.get_text(strip=True),
-                "text_length": len(a.get_text(strip=True)),
-                "title": a.get("title", "").strip(),
-                "nofollow": "nofollow" in a.get("rel", ""),
-                "has_text": bool(a.get_text(strip=True)),
-            }
-            
-            if parsed_url.netloc == self.domain:
-                internal_links.append(link_data)
-            else:
-                external_links.append(link_data)
-                
-        data["internal_links"] = internal_links
-        data["external_links"] = external_links
-        data["total_links"] = len(internal_links) + len(external_links)
-
-        structured_data = []
-        for script in soup.find_all("script", type="application/ld+json"):
-            try:
-                if script.string:
-                    json_content = json.loads(script.string)
-                    structured_data.append(json_content)
-            except:
-                continue
-        data["structured_data"] = structured_data
-        data["has_structured_data"] = len(structured_data) > 0
-
-        data["videos"] = [{"src": urljoin(page_url, video.get("src"))} for video in soup.find_all("video") if video.get("src")]
-        data["audios"] = [{"src": urljoin(page_url, audio.get("src"))} for audio in soup.find_all("audio") if audio.get("src")]
-
-        data["script_sources"] = [urljoin(page_url, script.get("src")) for script in soup.find_all("script") if script.get("src")]
-        data["style_links"] = [urljoin(page_url, link.get("href")) for link in soup.find_all("link", rel="stylesheet") if link.get("href")]
-        data["inline_styles"] = len(soup.find_all("style"))
-        data["inline_scripts"] = sum(1 for s in soup.find_all("script") if not s.get("src") and s.string)
-
-        favicon = soup.find("link", rel=lambda x: x and "icon" in x.lower())
-        data["favicon"] = urljoin(page_url, favicon["href"]) if favicon and favicon.has_attr("href") else None
-
-        html_tag = soup.find("html")
-        data["language"] = html_tag.get("lang", "").strip() if html_tag and html_tag.has_attr("lang") else None
-
-        data["has_viewport_meta"] = bool(data["meta_viewport"])
-        data["has_mobile_friendly_design"] = self._check_mobile_friendly(soup)
-
-        data["resource_hints"] = self._extract_resource_hints(soup, page_url)
-        data["has_https"] = page_url.startswith("https://")
-        data["hreflang_tags"] = self._extract_hreflang_tags(soup)
-        data["has_doctype"] = bool(soup.find("doctype") or soup.find("!DOCTYPE"))
-        
-        return data
-
-    def _extract_og_tags(self, soup):
-        og_tags = {}
-        for tag in soup.find_all("meta", property=re.compile(r"^og:")):
-            name = tag.get("property", "").strip()
-            content = tag.get("content", "").strip()
-            if name and content:
-                og_tags[name] = content
-        return og_tags
-
-    def _extract_twitter_tags(self, soup):
-        twitter_tags = {}
-        for tag in soup.find_all("meta", attrs={"name": re.compile(r"^twitter:")}):
-            name = tag.get("name", "").strip()
-            content = tag.get("content", "").strip()
-            if name and content:
-                twitter_tags[name] = content
-        return twitter_tags
-
-    def _calculate_word_count(self, soup):
-        text = soup.body.get_text(" ", strip=True) if soup.body else ""
-        for script in soup.find_all(["script", "style"]):
-            script.extract()
-        cleaned_text = re.sub(r'\s+', ' ', text).strip()
-        return len(cleaned_text.split())
-
-    def _calculate_text_html_ratio(self, soup, html):
-        for script in soup.find_all(["script", "style"]):
-            script.extract()
-        text = soup.get_text(" ", strip=True)
-        if not html:
-            return 0
-        text_length = len(text)
-        html_length = len(html)
-        return round((text_length / html_length) * 100, 2) if html_length > 0 else 0
-
-    def _extract_keyword_density(self, soup):
-        for script in soup.find_all(["script", "style"]):
-            script.extract()
-        text = soup.get_text(" ", strip=True)
-        text = re.sub(r'[^\w\s]', '', text.lower())
-        words = text.split()
-        stop_words = {'a', 'an', 'the', 'and', 'or', 'but', 'is', 'are', 'was', 'were', 
-                     'have', 'has', 'had', 'be', 'been', 'being', 'to', 'of', 'for', 
-                     'with', 'by', 'on', 'at', 'in', 'this', 'that', 'these', 'those'}
-        filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
-        word_count = Counter(filtered_words)
-        total_words = len(filtered_words)
-        densities = {}
-        if total_words > 0:
-            for word, count in word_count.most_common(20):
-                densities[word] = {
-                    "count": count,
-                    "density": round((count / total_words) * 100, 2)
-                }
-        return densities
-    
-    def _check_mobile_friendly(self, soup):
-        viewport = soup.find("meta", attrs={"name": "viewport"})
-        has_viewport = viewport and "width=device-width" in viewport.get("content", "")
-        style_tags = soup.find_all("style")
-        has_media_queries = any("@media" in style.string for style in style_tags if style.string)
-        return has_viewport or has_media_queries
-
-    def _extract_resource_hints(self, soup, base_url):
-        hints = {
-            "preload": [],
-            "prefetch": [],
-            "preconnect": [],
-            "dns-prefetch": []
-        }
-        for link in soup.find_all("link", rel=True):
-            rel = link.get("rel", [""])[0] if isinstance(link.get("rel"), list) else link.get("rel", "")
-            if rel in hints and link.get("href"):
-                hints[rel].append(urljoin(base_url, link.get("href")))
-        return hints
-        
-    def _extract_hreflang_tags(self, soup):
-        hreflang_tags = []
-        for link in soup.find_all("link", rel="alternate", hreflang=True):
-            if link.get("href"):
-                hreflang_tags.append({
-                    "hreflang": link.get("hreflang"),
-                    "href": link.get("href")
-                })
-        return hreflang_tags
+    def is_allowed(self, url):
+        if self.robots is None or url == self.base_url:
+            return True
+        if self.robots.can_fetch(ROBOTS_AGENT, url):
+            return True
+        self.discovery["disallowed"] += 1
+        return False
+
+    def _apply_robots(self, robots):
+        self.robots = robots
+        self.discovery["robots_txt"] = robots.mtime() > 0 and not robots.allow_all
+        delay = robots.crawl_delay(ROBOTS_AGENT)
+        if delay:
+            self.discovery["crawl_delay"] = float(delay)
+            self.http.set_crawl_delay(self.domain, delay)
+
+    def _apply_sitemap_entries(self, entries):
+        self.discovery["sitemap_urls"] = len(entries)
+        canonical = {}
+        for url, lastmod in entries.items():
+            canonical.setdefault(self.canonicalize(url), lastmod)
+        # The whole sitemap is ranked, but only as many URLs as the page budget allows are kept
+        self.seeds = [
+            (priority, url) for priority, url in prioritise(canonical, self.previous_pages)
+            if url != self.base_url and self.is_valid_internal_url(url) and self.is_allowed(url)
+        ][:self.max_pages - 1]
+
+    def _wants_sitemaps(self):
+        # A single-page audit has no budget left for anything the sitemap lists
+        return self.use_sitemaps and self.max_pages > 1
+
+    def discover(self):
+        if self.respect_robots or self.use_sitemaps:
+            robots = robots_cache.get(self.http, self.base_url)
+            if self.respect_robots:
+                self._apply_robots(robots)
+            if self._wants_sitemaps():
+                self._apply_sitemap_entries(
+                    collect_sitemap_entries(self.http, sitemap_urls_for(robots, self.base_url))
+                )
 
-    def calculate_scorecard(self, data):
+    async def discover_async(self):
+        if self.respect_robots or self.use_sitemaps:
+            robots = await robots_cache.aget(self.http, self.base_url)
+            if self.respect_robots:
+                self._apply_robots(robots)
+            if self._wants_sitemaps():
+                self._apply_sitemap_entries(
+                    await acollect_sitemap_entries(self.http, sitemap_urls_for(robots, self.base_url))
+                )
+
+    def extract_seo_data(self, html, page_url, fetched_url=None):
+        return self.extractor.extract(html, page_url, fetched_url)
+
+    def internal_links_from(self, data):
         if not data:
-            return {"total_score": 0, "categories": {}}
-            
-        scorecard = {
-            "metadata": {
-                "title": {"score": 0, "max_score": 10, "details": {}},
-                "meta_description": {"score": 0, "max_score": 10, "details": {}},
-                "other_meta_tags": {"score": 0, "max_score": 10, "details": {}}
-            },
-            "content": {
-                "headings": {"score": 0, "max_score": 15, "details": {}},
-                "content_quality": {"score": 0, "max_score": 15, "details": {}},
-                "keyword_optimization": {"score": 0, "max_score": 10, "details": {}}
-            },
-            "media": {
-                "images": {"score": 0, "max_score": 10, "details": {}},
-                "videos_and_audio": {"score": 0, "max_score": 5, "details": {}}
-            },
-            "technical": {
-                "structured_data": {"score": 0, "max_score": 10, "details": {}},
-                "mobile_friendly": {"score": 0, "max_score": 10, "details": {}},
-                "page_speed_indicators": {"score": 0, "max_score": 10, "details": {}},
-                "security": {"score": 0, "max_score": 5, "details": {}}
-            },
-            "links": {
-                "internal_links": {"score": 0, "max_score": 10, "details": {}},
-                "external_links": {"score": 0, "max_score": 5, "details": {}},
-                "canonical": {"score": 0, "max_score": 5, "details": {}}
-            },
-            "international": {
-                "language": {"score": 0, "max_score": 5, "details": {}},
-                "hreflang": {"score": 0, "max_score": 5, "details": {}}
-            }
-        }
-        
-        title_score = scorecard["metadata"]["title"]
-        if data.get("title"):
-            title_length = data.get("title_length", 0)
-            if 30 <= title_length <= 60:
-                title_score["score"] = 10
-                title_score["details"]["status"] = "optimal"
-            elif 20 <= title_length < 30 or 60 < title_length <= 70:
-                title_score["score"] = 7
-                title_score["details"]["status"] = "acceptable"
-            else:
-                title_score["score"] = 4
-                title_score["details"]["status"] = "needs improvement"
-        else:
-            title_score["details"]["status"] = "missing"
-        title_score["details"]["length"] = data.get("title_length", 0)
-        title_score["details"]["recommendations"] = []
-        if not data.get("title"):
-            title_score["details"]["recommendations"].append("Add a title tag")
-        elif data.get("title_length", 0) < 30:
-            title_score["details"]["recommendations"].append("Title is too short, aim for 30-60 characters")
-        elif data.get("title_length", 0) > 60:
-            title_score["details"]["recommendations"].append("Title may be truncated in search results, consider shortening")
-            
-        meta_desc_score = scorecard["metadata"]["meta_description"]
-        if data.get("meta_description"):
-            desc_length = data.get("meta_description_length", 0)
-            if 120 <= desc_length <= 160:
-                meta_desc_score["score"] = 10
-                meta_desc_score["details"]["status"] = "optimal"
-            elif 80 <= desc_length < 120 or 160 < desc_length <= 200:
-                meta_desc_score["score"] = 7
-                meta_desc_score["details"]["status"] = "acceptable"
-            else:
-                meta_desc_score["score"] = 4
-                meta_desc_score["details"]["status"] = "needs improvement"
-        else:
-            meta_desc_score["details"]["status"] = "missing"
-        meta_desc_score["details"]["length"] = data.get("meta_description_length", 0)
-        meta_desc_score["details"]["recommendations"] = []
-        if not data.get("meta_description"):
-            meta_desc_score["details"]["recommendations"].append("Add a meta description")
-        elif data.get("meta_description_length", 0) < 120:
-            meta_desc_score["details"]["recommendations"].append("Meta description is too short, aim for 120-160 characters")
-        elif data.get("meta_description_length", 0) > 160:
-            meta_desc_score["details"]["recommendations"].append("Meta description may be truncated in search results")
-            
-        other_meta_score = scorecard["metadata"]["other_meta_tags"]
-        other_meta_score["score"] = 0
-        if data.get("meta_robots"): other_meta_score["score"] += 2
-        if data.get("meta_viewport"): other_meta_score["score"] += 3
-        if data.get("meta_charset"): other_meta_score["score"] += 1
-        if data.get("meta_og_tags") and len(data.get("meta_og_tags", {})) >= 3: other_meta_score["score"] += 2
-        if data.get("meta_twitter_tags") and len(data.get("meta_twitter_tags", {})) >= 2: other_meta_score["score"] += 2
-        other_meta_score["details"]["present_tags"] = []
-        other_meta_score["details"]["missing_tags"] = []
-        other_meta_score["details"]["recommendations"] = []
-        if data.get("meta_robots"):
-            other_meta_score["details"]["present_tags"].append("robots")
-        else:
-            other_meta_score["details"]["missing_tags"].append("robots")
-            other_meta_score["details"]["recommendations"].append("Add a meta robots tag")
-        if data.get("meta_viewport"):
-            other_meta_score["details"]["present_tags"].append("viewport")
-        else:
-            other_meta_score["details"]["missing_tags"].append("viewport")
-            other_meta_score["details"]["recommendations"].append("Add a viewport meta tag for mobile optimization")
-        if not data.get("meta_og_tags"):
-            other_meta_score["details"]["missing_tags"].append("Open Graph tags")
-            other_meta_score["details"]["recommendations"].append("Add Open Graph meta tags for better social sharing")
-        
-        headings_score = scorecard["content"]["headings"]
-        headings_score["details"]["counts"] = {}
-        for tag, headings in data.get("headings", {}).items():
-            headings_score["details"]["counts"][tag] = len(headings)
-        has_h1 = headings_score["details"]["counts"].get("h1", 0) > 0
-        has_single_h1 = headings_score["details"]["counts"].get("h1", 0) == 1
-        has_h2 = headings_score["details"]["counts"].get("h2", 0) > 0
-        has_structure = all(headings_score["details"]["counts"].get(f"h{i}", 0) >= 
-                           headings_score["details"]["counts"].get(f"h{i+1}", 0) 
-                           for i in range(1, 5))
-        headings_score["details"]["recommendations"] = []
-        if has_single_h1 and has_h2 and has_structure:
-            headings_score["score"] = 15
-            headings_score["details"]["status"] = "optimal"
-        elif has_h1 and has_h2:
-            headings_score["score"] = 10
-            headings_score["details"]["status"] = "good"
-            if not has_single_h1:
-                headings_score["details"]["recommendations"].append("Use exactly one H1 tag per page")
-            if not has_structure:
-                headings_score["details"]["recommendations"].append("Improve heading hierarchy structure")
-        elif has_h1 or has_h2:
-            headings_score["score"] = 5
-            headings_score["details"]["status"] = "needs improvement"
-            if not has_h1:
-                headings_score["details"]["recommendations"].append("Add an H1 tag that includes your primary keyword")
-            if not has_h2:
-                headings_score["details"]["recommendations"].append("Add H2 tags to structure your content")
-        else:
-            headings_score["score"] = 0
-            headings_score["details"]["status"] = "poor"
-            headings_score["details"]["recommendations"].append("Add proper heading structure with H1 and H2 tags")
-            
-        content_score = scorecard["content"]["content_quality"]
-        word_count = data.get("word_count", 0)
-        text_html_ratio = data.get("text_html_ratio", 0)
-        content_score["details"] = {
-            "word_count": word_count,
-            "text_html_ratio": text_html_ratio,
-            "recommendations": []
-        }
-        if word_count >= 800:
-            content_score["score"] += 8
-        elif word_count >= 500:
-            content_score["score"] += 5
-        elif word_count >= 300:
-            content_score["score"] += 3
-        else:
-            content_score["details"]["recommendations"].append("Add more content, aim for at least 500 words")
-        if text_html_ratio >= 25:
-            content_score["score"] += 7
-        elif text_html_ratio >= 15:
-            content_score["score"] += 4
-        else:
-            content_score["score"] += 2
-            content_score["details"]["recommendations"].append("Improve text to HTML ratio, aim for at least 15%")
-        content_score["score"] = min(content_score["score"], 15)
-        
-        keyword_score = scorecard["content"]["keyword_optimization"]
-        keyword_densities = data.get("keywords_density", {})
-        top_keywords = []
-        if keyword_densities:
-            top_keywords = sorted(keyword_densities.items(), key=lambda x: x[1]["density"], reverse=True)[:5]
-        keyword_score["details"] = {
-            "top_keywords": [{k: v} for k, v in top_keywords],
-            "recommendations": []
-        }
-        if top_keywords:
-            title_keywords = [kw for kw, _ in top_keywords if data.get("title") and kw.lower() in data.get("title", "").lower()]
-            h1_keywords = []
-            for h1 in data.get("headings", {}).get("h1", []):
-                h1_text = h1.get("text", "").lower()
-                h1_keywords.extend([kw for kw, _ in top_keywords if kw.lower() in h1_text])
-            optimal_density = any(1.5 <= info["density"] <= 2.5 for _, info in top_keywords[:3])
-            if title_keywords and h1_keywords and optimal_density:
-                keyword_score["score"] = 10
-            elif title_keywords or h1_keywords:
-                keyword_score["score"] = 6
-                if not title_keywords:
-                    keyword_score["details"]["recommendations"].append("Include main keywords in the page title")
-                if not h1_keywords:
-                    keyword_score["details"]["recommendations"].append("Include main keywords in the H1 heading")
-                if not optimal_density:
-                    keyword_score["details"]["recommendations"].append("Aim for keyword density between 1.5-2.5% for primary keywords")
-            else:
-                keyword_score["score"] = 3
-                keyword_score["details"]["recommendations"].append("Improve keyword usage in title, headings, and content")
-        else:
-            keyword_score["details"]["recommendations"].append("Add more focused content around target keywords")
-            
-        images_score = scorecard["media"]["images"]
-        images_count = data.get("total_images", 0)
-        images_with_alt = data.get("images_with_alt", 0)
-        images_score["details"] = {
-            "total_images": images_count,
-            "images_with_alt": images_with_alt,
-            "images_without_alt": data.get("images_without_alt", 0),
-            "alt_percentage": round((images_with_alt / images_count) * 100, 1) if images_count > 0 else 0,
-            "recommendations": []
-        }
-        if images_count > 0:
-            if images_with_alt == images_count:
-                images_score["score"] = 10
-            elif images_with_alt / images_count >= 0.8:
-                images_score["score"] = 8
-                images_score["details"]["recommendations"].append("Add alt text to all remaining images")
-            elif images_with_alt / images_count >= 0.5:
-                images_score["score"] = 5
-                images_score["details"]["recommendations"].append("Add descriptive alt text to more images")
-            else:
-                images_score["score"] = 3
-                images_score["details"]["recommendations"].append("Add alt text to images for accessibility and SEO")
-        else:
-            images_score["score"] = 5
-            images_score["details"]["recommendations"].append("Consider adding relevant images with alt text")
-            
-        media_score = scorecard["media"]["videos_and_audio"]
-        has_video = bool(data.get("videos"))
-        has_audio = bool(data.get("audios"))
-        media_score["details"] = {
-            "videos_count": len(data.get("videos", [])),
-            "audios_count": len(data.get("audios", [])),
-            "recommendations": []
-        }
-        if has_video or has_audio:
-            media_score["score"] = 5
-        else:
-            media_score["score"] = 0
-            media_score["details"]["recommendations"].append("Consider adding multimedia content for engagement")
-            
-        sd_score = scorecard["technical"]["structured_data"]
-        has_structured_data = data.get("has_structured_data", False)
-        structured_data_count = len(data.get("structured_data", []))
-        sd_score["details"] = {
-            "present": has_structured_data,
-            "count": structured_data_count,
-            "types": [self._get_schema_type(sd) for sd in data.get("structured_data", [])],
-            "recommendations": []
-        }
-        if has_structured_data:
-            sd_score["score"] = 10 if structured_data_count >= 2 else 7
-        else:
-            sd_score["score"] = 0
-            sd_score["details"]["recommendations"].append("Add structured data like Schema.org markup")
-            
-        mobile_score = scorecard["technical"]["mobile_friendly"]
-        mobile_score["details"] = {
-            "has_viewport_meta": data.get("has_viewport_meta", False),
-            "has_mobile_friendly_design": data.get("has_mobile_friendly_design", False),
-            "recommendations": []
-        }
-        if data.get("has_viewport_meta") and data.get("has_mobile_friendly_design"):
-            mobile_score["score"] = 10
-        elif data.get("has_viewport_meta"):
-            mobile_score["score"] = 7
-            mobile_score["details"]["recommendations"].append("Ensure design is fully responsive")
-        else:
-            mobile_score["score"] = 0
-            mobile_score["details"]["recommendations"].append("Add viewport meta tag and ensure mobile-friendly design")
-            
-        speed_score = scorecard["technical"]["page_speed_indicators"]
-        resource_hints = data.get("resource_hints", {})
-        has_preload = bool(resource_hints.get("preload"))
-        has_prefetch = bool(resource_hints.get("prefetch"))
-        has_preconnect = bool(resource_hints.get("preconnect"))
-        has_dns_prefetch = bool(resource_hints.get("dns-prefetch"))
-        speed_score["details"] = {
-            "resource_hints_used": [k for k, v in resource_hints.items() if v],
-            "resource_hints_missing": [k for k, v in resource_hints.items() if not v],
-            "js_resources": len(data.get("script_sources", [])),
-            "css_resources": len(data.get("style_links", [])),
-            "inline_styles": data.get("inline_styles", 0),
-            "inline_scripts": data.get("inline_scripts", 0),
-            "page_size_kb": round(data.get("page_size_bytes", 0) / 1024, 2),
-            "recommendations": []
-        }
-        resource_hint_score = 0
-        if has_preload: resource_hint_score += 2
-        if has_prefetch: resource_hint_score += 2
-        if has_preconnect or has_dns_prefetch: resource_hint_score += 2
-        page_size_kb = data.get("page_size_bytes", 0) / 1024
-        size_score = 5 if page_size_kb < 100 else (3 if page_size_kb < 200 else 1)
-        speed_score["score"] = min(resource_hint_score + size_score, 10)
-        if not has_preload and not has_prefetch:
-            speed_score["details"]["recommendations"].append("Use preload/prefetch resource hints for critical resources")
-        if not has_preconnect and not has_dns_prefetch:
-            speed_score["details"]["recommendations"].append("Use preconnect/dns-prefetch for external domains")
-        if page_size_kb >= 200:
-            speed_score["details"]["recommendations"].append("Reduce page size to improve load speed")
-
-        security_score = scorecard["technical"]["security"]
-        security_score["details"] = {
-            "has_https": data.get("has_https", False),
-            "has_content_security_policy": "Content-Security-Policy" in data.get("headers", {}),
-            "recommendations": []
-        }
-        if data.get("has_https"):
-            security_score["score"] = 5
-        else:
-            security_score["score"] = 0
-            security_score["details"]["recommendations"].append("Switch to HTTPS for secure connections")
-
-        internal_links_score = scorecard["links"]["internal_links"]
-        internal_links = data.get("internal_links", [])
-        internal_links_count = len(internal_links)
-        internal_links_with_text = sum(1 for link in internal_links if link.get("has_text"))
-        internal_links_score["details"] = {
-            "count": internal_links_count,
-            "with_descriptive_text": internal_links_with_text,
-            "recommendations": []
-        }
-        if internal_links_count >= 3:
-            if internal_links_with_text == internal_links_count:
-                internal_links_score["score"] = 10
-            elif internal_links_with_text / internal_links_count >= 0.8:
-                internal_links_score["score"] = 8
-                internal_links_score["details"]["recommendations"].append("Add descriptive text to all internal links")
-            else:
-                internal_links_score["score"] = 5
-                internal_links_score["details"]["recommendations"].append("Add descriptive anchor text to internal links")
-        else:
-            internal_links_score["score"] = 3
-            internal_links_score["details"]["recommendations"].append("Add more internal links to improve site structure")
-
-        external_links_score = scorecard["links"]["external_links"]
-        external_links = data.get("external_links", [])
-        external_links_count = len(external_links)
-        external_links_with_nofollow = sum(1 for link in external_links if link.get("nofollow"))
-        external_links_score["details"] = {
-            "count": external_links_count,
-            "with_nofollow": external_links_with_nofollow,
-            "recommendations": []
-        }
-        if external_links_count > 0:
-            if external_links_count <= 100:
-                external_links_score["score"] = 5
-            else:
-                external_links_score["score"] = 3
-                external_links_score["details"]["recommendations"].append("Too many external links may dilute page authority")
-        else:
-            external_links_score["score"] = 2
-            external_links_score["details"]["recommendations"].append("Consider adding a few high-quality external links")
-
-        canonical_score = scorecard["links"]["canonical"]
-        has_canonical = bool(data.get("canonical_url"))
-        canonical_matches = data.get("canonical_matches_url", False)
-        canonical_score["details"] = {
-            "has_canonical": has_canonical,
-            "canonical_matches_url": canonical_matches,
-            "canonical_url": data.get("canonical_url"),
-            "recommendations": []
-        }
-        if has_canonical:
-            if canonical_matches:
-                canonical_score["score"] = 5
-            else:
-                canonical_score["score"] = 3
-                canonical_score["details"]["recommendations"].append("Canonical URL does not match page URL")
-        else:
-            canonical_score["score"] = 0
-            canonical_score["details"]["recommendations"].append("Add canonical tag to prevent duplicate content issues")
-
-        language_score = scorecard["international"]["language"]
-        has_language = bool(data.get("language"))
-        language_score["details"] = {
-            "has_language_attribute": has_language,
-            "language": data.get("language"),
-            "recommendations": []
-        }
-        if has_language:
-            language_score["score"] = 5
-        else:
-            language_score["score"] = 0
-            language_score["details"]["recommendations"].append("Add lang attribute to html tag")
-
-        hreflang_score = scorecard["international"]["hreflang"]
-        has_hreflang = bool(data.get("hreflang_tags"))
-        hreflang_score["details"] = {
-            "has_hreflang": has_hreflang,
-            "hreflang_count": len(data.get("hreflang_tags", [])),
-            "recommendations": []
-        }
-        if has_hreflang:
-            hreflang_score["score"] = 5
-        else:
-            hreflang_score["score"] = 0
-            hreflang_score["details"]["recommendations"].append("Add hreflang tags if targeting multiple languages/regions")
-
-        total_max_score = sum(category["max_score"] for section in scorecard.values() for category in section.values())
-        total_score = sum(category["score"] for section in scorecard.values() for category in section.values())
-        scorecard["total_score"] = round((total_score / total_max_score) * 100) if total_max_score > 0 else 0
-        
-        return scorecard
-
-    def _get_schema_type(self, schema_data):
-        if isinstance(schema_data, dict):
-            return schema_data.get("@type", "Unknown")
-        return "Unknown"
-
-    def extract_links(self, html, base_url):
-        if not html:
             return []
-        soup = BeautifulSoup(html, "html.parser")
-        links = []
-        for a in soup.find_all("a", href=True):
-            href = a.get("href", "").strip()
-            if not href or href.startswith('#'):
-                continue
-            full_url = urljoin(base_url, href)
-            if self.is_valid_internal_url(full_url):
-                links.append(full_url)
-        return links
-
-    def crawl_page(self, url, current_depth=0):
+        links = dict.fromkeys(
+            self.canonicalize(link["href"]) for link in data["internal_links"]
+            if link["href"] and link["href"].startswith(("http://", "https://"))
+        )
+        return [link for link in links if self.is_valid_internal_url(link)]
+
+    def calculate_scorecard(self, data):
+        return self.scoring.scorecard(data)
+
+    def crawl(self):
+        # The frontier crawl_async uses, shared by a fixed set of threads, so both modes
+        # crawl the same pages for a given max_pages: the start URL, then sitemap URLs
+        # ordered by how recently they changed, ahead of links found on the way.
+        frontier = queue.PriorityQueue()
+        self._enqueue(frontier, self.base_url, 0, START_PRIORITY)
+        for priority, url in self.seeds:
+            self._enqueue(frontier, url, 1, priority)
+
+        threads = [threading.Thread(target=self._crawl_thread, args=(frontier,), daemon=True)
+                   for _ in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        try:
+            frontier.join()
+        finally:
+            for _ in threads:
+                frontier.put((STOP_PRIORITY, 0, None, None))
+            for thread in threads:
+                thread.join()
+
+    def _crawl_thread(self, frontier):
+        while True:
+            _, _, url, current_depth = frontier.get()
+            try:
+                if url is None:
+                    return
+                if not self._stopped.is_set():
+                    self.crawl_page(frontier, url, current_depth)
+            except Exception as e:
+                self._page_failed(url, e)
+            finally:
+                frontier.task_done()
+
+    def crawl_page(self, frontier, url, current_depth=0):
+        with self._lock:
+            self.pages_audited += 1
+        response = self.fetch_page(url)
+        if response is None:
+            return
+
+        result, links = self._process_response(url, response, current_depth)
+        if result is None:
+            return
+        self.all_results[url] = result
+        self._page_done(url, result)
+
+        for link in links:
+            if len(self.visited_urls) >= self.max_pages:
+                break
+            self._enqueue(frontier, link, current_depth + 1, LINK_PRIORITY)
+
+    async def crawl_async(self):
+        # One frontier shared by a fixed set of workers. URLs are marked visited
+        # when they are queued, and no more than max_pages are ever queued, so
+        # the frontier stays bounded regardless of how many links a page has.
+        # Sitemap URLs are seeded up front, ordered by how recently they changed.
+        frontier = asyncio.PriorityQueue()
+        workers = []
+        try:
+            await self.discover_async()
+            self._enqueue(frontier, self.base_url, 0, START_PRIORITY)
+            for priority, url in self.seeds:
+                self._enqueue(frontier, url, 1, priority)
+
+            workers = [asyncio.create_task(self._crawl_worker(frontier)) for _ in range(self.concurrency)]
+            await frontier.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._close_extract_pool()
+            if self._owns_http:
+                await self.http.aclose()
+
+    async def _crawl_worker(self, frontier):
+        while True:
+            _, _, url, current_depth = await frontier.get()
+            try:
+                if not self._stopped.is_set():
+                    await self._crawl_url_async(frontier, url, current_depth)
+            except Exception as e:
+                self._page_failed(url, e)
+            finally:
+                frontier.task_done()
+
+    async def _crawl_url_async(self, frontier, url, current_depth):
         self.pages_audited += 1
-        if url in self.visited_urls or self.pages_audited > self.max_pages:
+        response = await self.fetch_page_async(url)
+        if response is None:
             return
 
-        self.visited_urls.add(url)
-        html = self.fetch_html(url)
-        if not html:
+        result, links = await self._process_response_async(url, response, current_depth)
+        if result is None:
             return
+        self.all_results[url] = result
+        self._page_done(url, result)
+
+        for link in links:
+            if len(self.visited_urls) >= self.max_pages:
+                break
+            self._enqueue(frontier, link, current_depth + 1, LINK_PRIORITY)
+
+    def _enqueue(self, frontier, url, depth, priority):
+        # Locked for the threaded crawl, whose threads all add links to the frontier
+        with self._lock:
+            if self._stopped.is_set() or url in self.visited_urls or len(self.visited_urls) >= self.max_pages or not self.is_allowed(url):
+                return
+            self.visited_urls.add(url)
+            self._frontier_seq += 1
+            frontier.put_nowait((priority, self._frontier_seq, url, depth))
+
+    def stop(self):
+        """Stop crawling: pages already being fetched finish, nothing new is fetched or queued."""
+        self._stopped.set()
+
+    def _page_failed(self, url, error):
+        # The page stays in the results, as an error row instead of a scored page
+        logger.warning("Audit of %s failed", url, exc_info=error)
+        self.all_results[url] = {"error": str(error)}
+        self.summary.add_failure(url)
+        if self.progress_callback:
+            self.progress_callback(len(self.all_results))
+
+    def _page_done(self, url, result):
+        self.summary.add(url, result)
+        if self.archive is not None:
+            self.archive.add(self.archive_run_id, url, result["data"])
+        if self.progress_callback:
+            self.progress_callback(len(self.all_results))
+        if self._stream_queue is not None:
+            self._stream_queue.put_nowait((url, result))
+
+    async def stream_async(self):
+        # Yields a page event as soon as each page is scored, while the crawl
+        # keeps running in the background.
+        results = asyncio.Queue()
+        self._stream_queue = results
+        crawl = asyncio.create_task(self.crawl_async())
+        crawl.add_done_callback(lambda _: results.put_nowait(None))
+        try:
+            while True:
+                item = await results.get()
+                if item is None:
+                    break
+                url, result = item
+                yield self.page_event(url, result)
+            await crawl
+        finally:
+            self._stream_queue = None
+            if not crawl.done():
+                crawl.cancel()
+                await asyncio.gather(crawl, return_exceptions=True)
+
+    def stream(self):
+        # Synchronous view of stream_async; the crawl runs on its own event loop thread
+        events = queue.Queue()
+
+        async def pump():
+            async for event in self.stream_async():
+                events.put(event)
+
+        def produce():
+            try:
+                asyncio.run(pump())
+            except Exception as e:
+                events.put(e)
+            finally:
+                events.put(None)
+
+        threading.Thread(target=produce, daemon=True).start()
+        try:
+            while True:
+                event = events.get()
+                if event is None:
+                    return
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+        finally:
+            # The consumer may stop iterating early; don't leave the thread crawling up to max_pages
+            self.stop()
+
+    def page_event(self, url, result):
+        scorecard = result["scorecard"]
+        return {
+            "url": url,
+            "title": result["data"].get("title"),
+            "score": scorecard.get("total_score", 0),
+            "unchanged": result.get("cache", {}).get("unchanged", False),
+            "pages_done": len(self.all_results),
+            "max_pages": self.max_pages,
+            "scorecard": scorecard
+        }
 
-        data = self.extract_seo_data(html, url)
-        scorecard = self.calculate_scorecard(data)
-        self.all_results[url] = {
+    def analyse(self, url, html, fetched_url=None):
+        data, text = self.extractor.extract_with_text(html, url, fetched_url)
+        return data, self.calculate_scorecard(data), self.internal_links_from(data), term_counts(text)
+
+    def _extract_executor(self):
+        if self._extract_pool is None and self.extract_workers > 0:
+            self._extract_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.extract_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_extract_worker,
+                initargs=(self.base_url, self.parser, self.strip_params,
+                          self.scoring.weights, self.scoring.thresholds),
+            )
+        return self._extract_pool
+
+    def _close_extract_pool(self):
+        if self._extract_pool is not None:
+            self._extract_pool.shutdown(cancel_futures=True)
+            self._extract_pool = None
+
+    def _prepare_response(self, url, response, current_depth):
+        # Everything that does not need a parse: 304s, empty bodies and unchanged
+        # content. Returns the cache info plus a finished (result, links) if any.
+        follow_links = current_depth < self.depth
+        cache = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "unchanged": False,
+        }
+        previous = self.previous_pages.get(url)
+
+        if response.status_code == 304:
+            if not previous:
+                return cache, (None, [])
+            return cache, (self._reuse_previous(url, previous, cache), previous["links"] if follow_links else [])
+
+        if not response.content:
+            return cache, (None, [])
+        if previous and previous.get("content_hash") == hashlib.md5(response.text.encode()).hexdigest():
+            return cache, (self._reuse_previous(url, previous, cache), previous["links"] if follow_links else [])
+        return cache, None
+
+    def _scored_result(self, url, analysed, cache, current_depth):
+        data, scorecard, links, terms = analysed
+        self.keywords.add(url, terms)
+        cache["links"] = links
+        result = {
             "data": data,
-            "scorecard": scorecard
+            "scorecard": scorecard,
+            "cache": cache
         }
-        
-        if current_depth < self.depth:
-            links = self.extract_links(html, url)
-            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-                futures = [
-                    executor.submit(self.crawl_page, link, current_depth + 1)
-                    for link in links if link not in self.visited_urls
-                ]
-                concurrent.futures.wait(futures)
-
-    def generate_summary(self):
-        summary = {
-            "audit_info": {
-                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "base_url": self.base_url,
-                "pages_audited": len(self.all_results),
-                "max_depth": self.depth
-            },
-            "overall_score": {
-                "score": 0,
-                "max_score": 100
+        return result, links if current_depth < self.depth else []
+
+    def _process_response(self, url, response, current_depth):
+        cache, done = self._prepare_response(url, response, current_depth)
+        if done is not None:
+            return done
+        pool = self._extract_executor()
+        if pool is None:
+            analysed = self.analyse(url, response.text, str(response.url))
+        else:
+            analysed = pool.submit(extract_and_score, url, response.content, response.encoding,
+                                   str(response.url)).result()
+        return self._scored_result(url, analysed, cache, current_depth)
+
+    async def _process_response_async(self, url, response, current_depth):
+        pool = self._extract_executor()
+        if pool is None:
+            # Parsing and scoring are CPU-bound, keep them off the event loop
+            return await asyncio.to_thread(self._process_response, url, response, current_depth)
+
+        cache, done = self._prepare_response(url, response, current_depth)
+        if done is not None:
+            return done
+        analysed = await asyncio.wrap_future(pool.submit(extract_and_score, url, response.content, response.encoding,
+                                                         str(response.url)))
+        return self._scored_result(url, analysed, cache, current_depth)
+
+    def _reuse_previous(self, url, previous, cache):
+        cache["unchanged"] = True
+        cache["etag"] = cache["etag"] or previous.get("etag")
+        cache["last_modified"] = cache["last_modified"] or previous.get("last_modified")
+        cache["links"] = previous["links"]
+        return {
+            "data": {
+                "page_url": url,
+                "title": previous.get("title"),
+                "content_hash": previous.get("content_hash"),
+                "simhash": previous.get("simhash"),
+                "word_count": previous.get("word_count"),
             },
-            "category_scores": {},
-            "top_issues": [],
-            "pages": {}
+            "scorecard": previous["scorecard"],
+            "cache": cache
         }
-        
-        if not self.all_results:
-            return summary
-            
-        total_score = 0
-        category_counter = {}
-        all_recommendations = []
-        
-        for url, result in self.all_results.items():
-            page_scorecard = result.get("scorecard", {})
-            page_score = page_scorecard.get("total_score", 0)
-            summary["pages"][url] = {
-                "score": page_score,
-                "title": result.get("data", {}).get("title", "Unknown Page")
-            }
-            total_score += page_score
-            
-            for section_name, section in page_scorecard.items():
-                if section_name == "total_score":
-                    continue
-                    
-                for category_name, category in section.items():
-                    key = f"{section_name}.{category_name}"
-                    if key not in category_counter:
-                        category_counter[key] = {
-                            "total_score": 0,
-                            "count": 0,
-                            "max_score": category.get("max_score", 0),
-                            "section": section_name,
-                            "category": category_name
-                        }
-                    
-                    category_counter[key]["total_score"] += category.get("score", 0)
-                    category_counter[key]["count"] += 1
-                    
-                    recommendations = category.get("details", {}).get("recommendations", [])
-                    if recommendations:
-                        all_recommendations.extend([(r, key, category.get("score", 0), category.get("max_score", 0)) for r in recommendations])
-        
-        num_pages = len(self.all_results) or 1
-        summary["overall_score"]["score"] = round(total_score / num_pages)
-        
-        for key, data in category_counter.items():
-            if data["count"] > 0:
-                avg_score = data["total_score"] / data["count"]
-                percentage = round((avg_score / data["max_score"]) * 100) if data["max_score"] > 0 else 0
-                
-                if data["section"] not in summary["category_scores"]:
-                    summary["category_scores"][data["section"]] = {}
-                    
-                summary["category_scores"][data["section"]][data["category"]] = {
-                    "score": percentage,
-                    "avg_points": round(avg_score, 1),
-                    "max_points": data["max_score"]
-                }
-        
-        recommendation_counter = {}
-        for rec, key, score, max_score in all_recommendations:
-            if rec not in recommendation_counter:
-                recommendation_counter[rec] = {
-                    "count": 0,
-                    "category": key,
-                    "importance": (max_score - score) / max_score if max_score > 0 else 0
-                }
-            recommendation_counter[rec]["count"] += 1
-        
-        sorted_recommendations = sorted(
-            [(rec, data) for rec, data in recommendation_counter.items()],
-            key=lambda x: (x[1]["importance"], x[1]["count"]),
-            reverse=True
-        )
-        
-        summary["top_issues"] = [
-            {
-                "issue": rec,
-                "count": data["count"],
-                "category": data["category"],
-                "importance": round(data["importance"] * 10)
-            }
-            for rec, data in sorted_recommendations[:10]
-        ]
-        
-        return summary
+
+    def generate_summary(self, final=False):
+        # Progress summaries are counters only; the final one lists the pages and duplicate
+        # clusters, and reads a low-memory crawl's pages back from disk
+        return self.summary.snapshot(self.all_results if final else None, final=final)
 
     def run(self):
-        self.crawl_page(self.base_url)
-        return {
-            "summary": self.generate_summary(),
-            "detailed_results": self.all_results
+        try:
+            self.discover()
+            self.crawl()
+        finally:
+            self._close_extract_pool()
+            if self._owns_http:
+                self.http.close()
+        return self._report()
+
+    async def run_async(self):
+        await self.crawl_async()
+        return self._report()
+
+    def close(self):
+        # A low-memory crawl's report reads its pages from the store, so it is only closed
+        # (and a temporary one deleted) once the report has been used
+        if isinstance(self.all_results, DiskResultStore):
+            self.all_results.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _set_page_keywords(self, url, keywords):
+        result = self.all_results.get(url)
+        if result is not None and "error" not in result:
+            result["keywords"] = keywords
+            # Stored again so a DiskResultStore writes the updated row
+            self.all_results[url] = result
+
+    def _report(self):
+        try:
+            keywords = self.keywords.finalize(on_page=self._set_page_keywords)
+        finally:
+            self.keywords.close()
+        if isinstance(self.all_results, DiskResultStore):
+            self.all_results.flush()
+        if self.archive is not None:
+            self.archive.flush()
+        report = {
+            "summary": self.generate_summary(final=True),
+            "detailed_results": self.all_results,
+            "http_stats": {**self.http.stats.snapshot(), "hosts": self.http.scheduler.snapshot()},
+            "discovery": self.discovery,
+            "keywords": keywords
         }
+        if self.archive_run_id:
+            report["archive_run_id"] = self.archive_run_id
+        return report
 
 
-def run_seo_audit(url, depth=0, max_pages=1):
-    audit = SEOAudit(url, depth=depth, max_pages=max_pages)
-    return audit.run()
+_worker_audit = None
 
 
-if __name__ == "__main__":
-    result = run_seo_audit("https://w3school.com", depth=2, max_pages=3)
-    with open('./audit/result.json', 'w') as f:
-        json.dump(result, f)
-    
-    print(json.dumps(result, indent=2))
+def _init_extract_worker(base_url, parser, strip_params, score_weights=None, score_thresholds=None):
+    # Each extraction worker keeps one SEOAudit for its extractor, scorer and URL rules.
+    # Rules hold lambdas, so workers rebuild the engine from its weights and thresholds.
+    global _worker_audit
+    scoring = ScoringEngine(weights=score_weights, thresholds=score_thresholds)
+    _worker_audit = SEOAudit(base_url, parser=parser, strip_params=strip_params, scoring=scoring)
+
+
+def extract_and_score(url, content, encoding, fetched_url=None):
+    # HTML crosses the process boundary as the raw response bytes and is decoded
+    # here the same way httpx's Response.text does it
+    html = content.decode(encoding or "utf-8", errors="replace")
+    return _worker_audit.analyse(url, html, fetched_url)
 
+
+def run_seo_audit(url, depth=0, max_pages=1, use_async=False, concurrency=10, previous_pages=None, low_memory=False,
+                  extract_workers=0, archive=None, consume=None):
+    """The audit report, or what ``consume`` returns for it.
+
+    A low-memory report reads its pages from a temporary file that is
+    deleted when this returns, so it has to be used in ``consume``.
+    """
+    if low_memory and consume is None:
+        raise ValueError("A low-memory audit's results are deleted once it finishes; pass consume to use them")
+    with SEOAudit(url, depth=depth, max_pages=max_pages, concurrency=concurrency,
+                  previous_pages=previous_pages, low_memory=low_memory, extract_workers=extract_workers,
+                  archive=archive) as audit:
+        report = asyncio.run(audit.run_async()) if use_async else audit.run()
+        return consume(report) if consume is not None else report
+
+
+if __name__ == "__main__":
     project_id = "REPLACE_WITH_ACTUAL_PROJECT_UUID"
     db = SessionLocal()
-    audit_time = datetime.utcnow()
 
-    try:
-        for url, payload in result["detailed_results"].items():
-            page_title = payload["data"].get("title")
-            page_score = payload["scorecard"].get("total_score")
-
-            # 1. Upsert Page
-            page = db.query(Page).filter_by(url=url, project_id=project_id).first()
-            if not page:
-                page = Page(
-                    id=uuid4(),
-                    url=url,
-                    title=page_title,
-                    project_id=project_id,
-                    last_audited=audit_time
-                )
-                db.add(page)
-                db.commit()
-                db.refresh(page)
-            else:
-                page.title = page_title
-                page.last_audited = audit_time
-                db.commit()
-
-            # 2. Create Audit entry
-            audit = Audit(
-                id=uuid4(),
-                page_id=page.id,
-                audit_type="full",
-                score=page_score,
-                issues=payload["scorecard"],
-                recommendations=result["summary"]["top_issues"],
-                created_at=audit_time
-            )
-            db.add(audit)
-
-        db.commit()
+    # Pages already audited for this project are only re-scored if they changed
+    previous_pages = load_previous_pages(db, project_id)
+    result = run_seo_audit("https://w3school.com", depth=2, max_pages=3, previous_pages=previous_pages)
+    with open('./audit/result.json', 'wb') as f:
+        f.write(encode_json(result))
+    
+    print(encode_json(result, indent=2).decode())
 
+    try:
+        pages_written = persist_audit_run(db, project_id, result)
+        print(f"Persisted {pages_written} pages")
     finally:
         db.close()
@@ -1,34 +1,236 @@
-import requests
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlparse
+
+import httpx
 from bs4 import BeautifulSoup
 
-def get_backlinks_from_openlinkprofiler(domain):
-    url = f"https://www.openlinkprofiler.org/r/{domain}"
-    headers = {
-        "User-Agent": "Mozilla/5.0"
-    }
+from controller.audit.http_pool import HTTPPool
+from serialization import decode_json, encode_json
+from controller.audit.scheduler import THROTTLE_STATUSES, backoff_delay
+
+BACKLINKS_BASE_URL = os.getenv("BACKLINKS_BASE_URL", "https://www.openlinkprofiler.org")
+BACKLINKS_CACHE_PATH = os.getenv("BACKLINKS_CACHE_PATH", "backlinks_cache.sqlite3")
+BACKLINKS_CACHE_TTL = int(os.getenv("BACKLINKS_CACHE_TTL", str(7 * 24 * 3600)))
+# Domains looked up at once; every request still goes through the upstream host's rate limit
+BACKLINKS_CONCURRENCY = int(os.getenv("BACKLINKS_CONCURRENCY", "4"))
+BACKLINKS_RATE = float(os.getenv("BACKLINKS_RATE", "2"))
+BACKLINKS_MAX_PAGES = int(os.getenv("BACKLINKS_MAX_PAGES", "5"))
+BACKLINKS_RETRIES = 3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+USER_AGENT = "Mozilla/5.0"
+
+
+def normalize_domain(value):
+    """``https://www.Example.com/about`` -> ``example.com``, the key lookups are cached under."""
+    value = value.strip()
+    netloc = urlparse(value if "//" in value else f"//{value}").netloc.lower()
+    return netloc[4:] if netloc.startswith("www.") else netloc
 
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, 'html.parser')
 
+def parse_backlinks(html, page_url):
+    """Backlink rows on one result page, and the URL of the next page (None on the last)."""
+    soup = BeautifulSoup(html, "html.parser")
     links = []
-    rows = soup.select("table#linklist tbody tr")
+    for row in soup.select("table#linklist tbody tr"):
+        source = row.select_one("td:nth-child(2) a[href]")
+        anchor = row.select_one("td:nth-child(3)")
+        date = row.select_one("td:nth-child(5)")
+        if source is None or anchor is None or date is None:
+            continue
+        links.append({
+            "source_url": source["href"],
+            "anchor_text": anchor.get_text(strip=True),
+            "link_date": date.get_text(strip=True),
+        })
+    next_link = soup.select_one("a[rel~=next][href]")
+    return links, urljoin(page_url, next_link["href"]) if next_link else None
+
+
+class BacklinkCache:
+    """Backlink lookups kept in a local SQLite file, keyed by normalized domain.
+
+    Entries are shared by every project and competitor that points at the
+    same domain. They are never deleted on expiry: a stale entry is still
+    served when the upstream cannot be reached.
+    """
+
+    def __init__(self, path=BACKLINKS_CACHE_PATH, ttl=BACKLINKS_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS backlinks (
+                domain TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL,
+                payload BLOB NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, domain, max_age=None):
+        """The cached entry for ``domain`` if it is younger than ``max_age`` seconds (the TTL by default)."""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            row = self._conn.execute("SELECT fetched_at, payload FROM backlinks WHERE domain = ?",
+                                     (domain,)).fetchone()
+        if row is None or time.time() - row[0] > max_age:
+            return None
+        return decode_json(zlib.decompress(row[1]))
+
+    def get_many(self, domains):
+        """{domain: (fetched_at, entry)} for every one of ``domains`` in the cache, whatever its age."""
+        domains = list(domains)
+        rows = []
+        with self._lock:
+            # Chunked to stay under SQLite's limit on bound parameters
+            for start in range(0, len(domains), 500):
+                chunk = domains[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                rows += self._conn.execute(
+                    f"SELECT domain, fetched_at, payload FROM backlinks WHERE domain IN ({placeholders})", chunk,
+                ).fetchall()
+        return {domain: (fetched_at, decode_json(zlib.decompress(payload))) for domain, fetched_at, payload in rows}
+
+    def put(self, domain, entry):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO backlinks (domain, fetched_at, payload) VALUES (?, ?, ?)",
+                               (domain, time.time(), zlib.compress(encode_json(entry))))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class BacklinkService:
+    """Looks up backlinks for many domains at once, through the cache.
+
+    Misses are fetched concurrently (``concurrency`` domains at a time) over
+    one HTTPPool, whose scheduler rate limits the upstream host and backs
+    off on 429/503. Each domain follows the result pages' ``rel=next`` link
+    up to ``max_pages`` pages, and every page request is retried on
+    throttling, server errors and connection failures.
+    """
 
-    for row in rows:
+    def __init__(self, base_url=BACKLINKS_BASE_URL, cache=None, concurrency=BACKLINKS_CONCURRENCY,
+                 rate=BACKLINKS_RATE, max_pages=BACKLINKS_MAX_PAGES, retries=BACKLINKS_RETRIES):
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache if cache is not None else BacklinkCache()
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.max_pages = max(1, max_pages)
+        self.retries = retries
+
+    def lookup_url(self, domain):
+        return f"{self.base_url}/r/{domain}"
+
+    async def _fetch_page(self, http, url):
+        for attempt in range(self.retries + 1):
+            try:
+                response = await http.aget(url)
+            except httpx.HTTPError:
+                if attempt == self.retries:
+                    raise
+                response = None
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                return response
+            if attempt == self.retries:
+                response.raise_for_status()
+            # 429/503 already hold the upstream back in the scheduler
+            if response is None or response.status_code not in THROTTLE_STATUSES:
+                await asyncio.sleep(backoff_delay(attempt))
+
+    async def _fetch_domain(self, http, domain):
+        links = []
+        seen = set()
+        url = self.lookup_url(domain)
+        pages = 0
+        while url and pages < self.max_pages:
+            response = await self._fetch_page(http, url)
+            page_links, url = parse_backlinks(response.text, str(response.url))
+            pages += 1
+            for link in page_links:
+                if link["source_url"] not in seen:
+                    seen.add(link["source_url"])
+                    links.append(link)
+        return {
+            "domain": domain,
+            "backlinks": links,
+            "total": len(links),
+            "pages": pages,
+            "complete": url is None,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    async def _lookup(self, http, semaphore, domain, cached, max_age):
+        if cached is not None and time.time() - cached[0] <= max_age:
+            return {**cached[1], "cached": True, "error": None}
         try:
-            source = row.select_one("td:nth-child(2) a")['href']
-            anchor = row.select_one("td:nth-child(3)").get_text(strip=True)
-            date = row.select_one("td:nth-child(5)").get_text(strip=True)
-            links.append({
-                "source_url": source,
-                "anchor_text": anchor,
-                "link_date": date
-            })
-        except:
-            continue
+            async with semaphore:
+                entry = await self._fetch_domain(http, domain)
+        except httpx.HTTPError as e:
+            if cached is not None:
+                return {**cached[1], "cached": True, "error": str(e)}
+            return {"domain": domain, "backlinks": [], "total": None, "pages": 0, "complete": False,
+                    "fetched_at": None, "cached": False, "error": str(e)}
+        await asyncio.to_thread(self.cache.put, domain, entry)
+        return {**entry, "cached": False, "error": None}
+
+    async def afetch_many(self, domains, max_age=None):
+        """{domain: result} for every distinct normalized domain; ``max_age=0`` bypasses the cache.
+
+        A failed lookup falls back to the last cached entry when there is
+        one, and carries the failure in ``error`` either way.
+        """
+        domains = list(dict.fromkeys(normalize_domain(domain) for domain in domains if domain))
+        max_age = self.cache.ttl if max_age is None else max_age
+        # One query for every domain, off the event loop; stale entries are kept as fallbacks
+        cached = await asyncio.to_thread(self.cache.get_many, domains)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        http = HTTPPool(headers={"User-Agent": USER_AGENT}, max_connections=self.concurrency,
+                        max_per_host=self.concurrency, rate_per_host=self.rate)
+        try:
+            results = await asyncio.gather(*(self._lookup(http, semaphore, domain, cached.get(domain), max_age)
+                                             for domain in domains))
+        finally:
+            await http.aclose()
+        return dict(zip(domains, results))
+
+    async def afetch(self, domain, max_age=None):
+        results = await self.afetch_many([domain], max_age)
+        return next(iter(results.values()))
+
+    def fetch_many(self, domains, max_age=None):
+        return asyncio.run(self.afetch_many(domains, max_age))
+
+    def fetch(self, domain, max_age=None):
+        return asyncio.run(self.afetch(domain, max_age))
+
+    def close(self):
+        self.cache.close()
+
+
+_service = None
+
+
+def get_backlink_service() -> BacklinkService:
+    global _service
+    if _service is None:
+        _service = BacklinkService()
+    return _service
 
-    return links
 
-# Example usage
-backlinks = get_backlinks_from_openlinkprofiler("ali.com")
-for link in backlinks[:5]:
-    print(link)
+def shutdown_backlink_service():
+    global _service
+    if _service is not None:
+        _service.close()
+        _service = None
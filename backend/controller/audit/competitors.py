@@ -0,0 +1,184 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from controller.audit.audit_site import SEOAudit
+from controller.audit.backlinks import normalize_domain
+from controller.audit.http_pool import HTTPPool
+from controller.audit.scheduler import FairShareBudget
+from models.competitor import Competitor
+
+# In-flight requests shared by every site in one benchmark
+COMPETITOR_CONCURRENCY = int(os.getenv("COMPETITOR_CONCURRENCY", "30"))
+COMPETITOR_MAX_PER_HOST = int(os.getenv("COMPETITOR_MAX_PER_HOST", "6"))
+
+
+def site_url(domain):
+    # Project.domain and competitor_url may be stored without a scheme
+    return domain if urlparse(domain).scheme else f"https://{domain}"
+
+
+def _flat_scores(summary):
+    return {
+        f"{section}.{category}": scores["score"]
+        for section, categories in summary.get("category_scores", {}).items()
+        for category, scores in categories.items()
+    }
+
+
+class CompetitorBenchmark:
+    """Audits a site and its competitors concurrently and compares their scores.
+
+    Every site gets its own SEOAudit, all running on one event loop over one
+    HTTPPool. The pool's FairShareBudget caps in-flight requests across all
+    of them and splits that cap evenly between the sites still crawling,
+    while the pool's scheduler keeps each host within its own politeness
+    limits. A benchmark therefore takes about as long as its slowest site.
+    With a BacklinkService, every site's backlinks are looked up alongside
+    the crawls.
+    """
+
+    def __init__(self, url, competitor_urls, depth=1, max_pages=20, concurrency=COMPETITOR_CONCURRENCY,
+                 max_per_host=COMPETITOR_MAX_PER_HOST, extract_workers=0, progress_callback=None, backlinks=None):
+        self.url = site_url(url)
+        self.competitor_urls = list(dict.fromkeys(site_url(u) for u in competitor_urls if site_url(u) != self.url))
+        self.depth = depth
+        self.max_pages = max_pages
+        self.concurrency = max(1, concurrency)
+        self.max_per_host = max_per_host
+        self.extract_workers = extract_workers
+        self.progress_callback = progress_callback
+        self.backlinks = backlinks
+        self._pages_done = {}
+
+    def _progress(self, url):
+        def report(pages_done):
+            self._pages_done[url] = pages_done
+            if self.progress_callback:
+                self.progress_callback(sum(self._pages_done.values()))
+        return report
+
+    async def _audit_site(self, url, audit, budget):
+        start = time.perf_counter()
+        try:
+            report = await audit.run_async()
+            summary = report["summary"]
+            if not summary["audit_info"]["pages_audited"]:
+                raise RuntimeError("no pages could be audited")
+            return {
+                "url": url,
+                "overall_score": summary["overall_score"]["score"],
+                "category_scores": _flat_scores(summary),
+                "pages_audited": summary["audit_info"]["pages_audited"],
+                "top_issues": summary["top_issues"],
+                "seconds": round(time.perf_counter() - start, 2),
+                "error": None,
+            }
+        except Exception as e:
+            return {"url": url, "overall_score": None, "category_scores": {}, "pages_audited": 0,
+                    "top_issues": [], "seconds": round(time.perf_counter() - start, 2), "error": str(e)}
+        finally:
+            await budget.finish(audit.domain)
+
+    async def run_async(self):
+        start = time.perf_counter()
+        budget = FairShareBudget(self.concurrency)
+        http = HTTPPool(max_connections=self.concurrency, max_per_host=self.max_per_host, budget=budget)
+        audits = {}
+        for url in [self.url, *self.competitor_urls]:
+            audits[url] = SEOAudit(url, depth=self.depth, max_pages=self.max_pages, max_per_host=self.max_per_host,
+                                   concurrency=min(self.concurrency, self.max_per_host * 2),
+                                   extract_workers=self.extract_workers, progress_callback=self._progress(url),
+                                   http_pool=http)
+            budget.register(audits[url].domain)
+        # Every audit builds the same default request headers
+        http.headers = audits[self.url].headers
+
+        try:
+            results, backlinks = await asyncio.gather(
+                asyncio.gather(*(self._audit_site(url, audit, budget) for url, audit in audits.items())),
+                self._backlinks(list(audits)),
+            )
+        finally:
+            await http.aclose()
+        for result in results:
+            lookup = backlinks.get(normalize_domain(result["url"]))
+            result["backlinks"] = lookup["total"] if lookup else None
+        return self._compare(results[0], results[1:], time.perf_counter() - start, http)
+
+    async def _backlinks(self, urls):
+        if self.backlinks is None:
+            return {}
+        return await self.backlinks.afetch_many(urls)
+
+    def run(self):
+        return asyncio.run(self.run_async())
+
+    @staticmethod
+    def _compare(site, competitors, elapsed, http):
+        for competitor in competitors:
+            competitor["difference"] = {
+                key: score - site["category_scores"][key]
+                for key, score in competitor["category_scores"].items() if key in site["category_scores"]
+            }
+            if competitor["overall_score"] is not None and site["overall_score"] is not None:
+                competitor["difference"]["overall"] = competitor["overall_score"] - site["overall_score"]
+
+        audited = [result for result in [site, *competitors] if result["error"] is None]
+        categories = {key for result in audited for key in result["category_scores"]}
+        leaders = {
+            key: max(audited, key=lambda result: result["category_scores"].get(key, -1))["url"]
+            for key in sorted(categories)
+        }
+        return {
+            "site": site,
+            "competitors": competitors,
+            "leaders": leaders,
+            "elapsed_seconds": round(elapsed, 2),
+            "sum_of_site_seconds": round(sum(result["seconds"] for result in [site, *competitors]), 2),
+            "http_stats": http.stats.snapshot(),
+        }
+
+
+def persist_competitor_benchmark(db: Session, project_id, benchmark: dict) -> int:
+    """Store each competitor's scores, and its difference to the project's site, on its Competitor row.
+
+    Rows are matched on competitor_url and created for competitors the
+    project did not list yet. Competitors whose audit failed are left as
+    they were. Returns the number of rows written.
+    """
+    benchmarked_at = datetime.utcnow()
+    existing = {
+        site_url(competitor.competitor_url): competitor
+        for competitor in db.execute(select(Competitor).where(Competitor.project_id == project_id)).scalars()
+    }
+    written = 0
+    try:
+        for result in benchmark["competitors"]:
+            if result["error"] is not None:
+                continue
+            competitor = existing.get(result["url"])
+            if competitor is None:
+                competitor = Competitor(project_id=project_id, competitor_url=result["url"])
+                db.add(competitor)
+            competitor.overall_score = result["overall_score"]
+            if result.get("backlinks") is not None:
+                competitor.backlinks = result["backlinks"]
+            competitor.category_scores = {
+                "scores": result["category_scores"],
+                "difference": result["difference"],
+                "site_scores": benchmark["site"]["category_scores"],
+                "pages_audited": result["pages_audited"],
+            }
+            competitor.benchmarked_at = benchmarked_at
+            written += 1
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return written
@@ -0,0 +1,290 @@
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import httpx
+
+ROBOTS_AGENT = "SEOAuditBot"
+ROBOTS_TTL = 24 * 60 * 60
+MAX_SITEMAPS = 50
+MAX_SITEMAP_URLS = 50000
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Frontier priorities, lowest first. Sitemap URLs that are new or changed since
+# the last audit go straight after the start page; sitemap URLs whose lastmod
+# is older than the last audit go last, since they will most likely be 304s.
+START_PRIORITY = (0, 0)
+LINK_PRIORITY = (2, 0)
+CHANGED = 1
+UNCHANGED = 3
+
+
+def origin_of(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class RobotsCache:
+    """robots.txt rules per origin, fetched once and kept for ``ttl`` seconds.
+
+    Follows the same conventions as ``RobotFileParser.read``: 401/403 disallow
+    the whole site, any other error status or a failed fetch allows it.
+    """
+
+    def __init__(self, ttl=ROBOTS_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _cached(self, origin):
+        with self._lock:
+            entry = self._entries.get(origin)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def _store(self, origin, response):
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        if response is None:
+            parser.allow_all = True
+        elif response.status_code in (401, 403):
+            parser.disallow_all = True
+        elif response.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(response.text.splitlines())
+        parser.modified()
+        with self._lock:
+            self._entries[origin] = (time.monotonic(), parser)
+        return parser
+
+    def get(self, http, url):
+        origin = origin_of(url)
+        parser = self._cached(origin)
+        if parser is not None:
+            return parser
+        try:
+            response = http.get(f"{origin}/robots.txt")
+        except httpx.HTTPError:
+            response = None
+        return self._store(origin, response)
+
+    async def aget(self, http, url):
+        origin = origin_of(url)
+        parser = self._cached(origin)
+        if parser is not None:
+            return parser
+        try:
+            response = await http.aget(f"{origin}/robots.txt")
+        except httpx.HTTPError:
+            response = None
+        return self._store(origin, response)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+robots_cache = RobotsCache()
+
+
+def parse_lastmod(value):
+    if not value:
+        return None
+    value = value.strip()
+    # W3C datetimes mark UTC with a Z, which fromisoformat only accepts from Python 3.11
+    if value[-1:] in ("Z", "z"):
+        value = value[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+class SitemapParser:
+    """Incremental parser for a sitemap or sitemap index, fed its body chunk by chunk.
+
+    ``feed`` returns ``(kind, loc, lastmod)`` for each entry the chunk
+    completes: ``kind`` is ``"url"`` for a page and ``"sitemap"`` for a
+    child sitemap. Sitemaps served as .xml.gz arrive still compressed (no
+    Content-Encoding) and are inflated as they come in. Finished entries are
+    dropped from the tree, so memory stays flat however many URLs it lists.
+    At most ``max_bytes`` of XML are read; past that, or after malformed
+    XML, ``done`` is set and the rest of the body can be skipped.
+    """
+
+    def __init__(self, max_bytes=MAX_SITEMAP_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.failed = False
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._root = None
+        self._inflater = None
+        self._started = False
+
+    @property
+    def done(self):
+        return self.failed or self.size >= self.max_bytes
+
+    def feed(self, chunk):
+        if self.done or not chunk:
+            return []
+        if not self._started:
+            self._started = True
+            if chunk[:2] == b"\x1f\x8b":
+                self._inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._inflater is not None:
+            try:
+                chunk = self._inflater.decompress(chunk, self.max_bytes - self.size)
+            except zlib.error:
+                self.failed = True
+                return []
+        else:
+            chunk = chunk[:self.max_bytes - self.size]
+        self.size += len(chunk)
+        return self._parse(chunk)
+
+    def close(self):
+        """Entries left once the whole body has been fed."""
+        if self.failed:
+            return []
+        entries = self._parse(self._inflater.flush()) if self._inflater is not None and not self.done else []
+        try:
+            self._parser.close()
+        except ParseError:
+            pass
+        return entries
+
+    def _parse(self, data):
+        entries = []
+        try:
+            self._parser.feed(data)
+            for event, elem in self._parser.read_events():
+                if event == "start":
+                    if self._root is None:
+                        self._root = elem
+                    continue
+                kind = _local_name(elem.tag)
+                if kind not in ("url", "sitemap"):
+                    continue
+                loc = lastmod = None
+                for child in elem:
+                    name = _local_name(child.tag)
+                    if name == "loc":
+                        loc = (child.text or "").strip()
+                    elif name == "lastmod":
+                        lastmod = parse_lastmod(child.text)
+                self._root.clear()
+                if loc:
+                    entries.append((kind, loc, lastmod))
+        except ParseError:
+            self.failed = True
+        return entries
+
+
+class SitemapWalker:
+    """Breadth-first walk over sitemap indexes down to page URLs.
+
+    ``next_sitemap()`` hands out the sitemap to fetch next and ``feed()``
+    takes its parsed entries as they stream in; the sync and async crawls
+    only differ in how they read the body.
+    """
+
+    def __init__(self, sitemap_urls, max_urls=MAX_SITEMAP_URLS, max_sitemaps=MAX_SITEMAPS):
+        self.pending = list(dict.fromkeys(sitemap_urls))
+        self.seen = set(self.pending)
+        self.max_urls = max_urls
+        self.max_sitemaps = max_sitemaps
+        self.fetched = 0
+        self.entries = {}
+
+    def next_sitemap(self):
+        if not self.pending or self.fetched >= self.max_sitemaps or len(self.entries) >= self.max_urls:
+            return None
+        self.fetched += 1
+        return self.pending.pop(0)
+
+    def feed(self, entries):
+        """Take one sitemap's entries; False once enough URLs are known to stop reading it."""
+        for kind, loc, lastmod in entries:
+            if kind == "sitemap":
+                if loc not in self.seen:
+                    self.seen.add(loc)
+                    self.pending.append(loc)
+            elif loc not in self.entries:
+                self.entries[loc] = lastmod
+                if len(self.entries) >= self.max_urls:
+                    return False
+        return True
+
+
+def sitemap_urls_for(robots, base_url):
+    return robots.site_maps() or [f"{origin_of(base_url)}/sitemap.xml"]
+
+
+def collect_sitemap_entries(http, sitemap_urls, max_urls=MAX_SITEMAP_URLS):
+    walker = SitemapWalker(sitemap_urls, max_urls)
+    while (sitemap_url := walker.next_sitemap()) is not None:
+        try:
+            with http.stream(sitemap_url) as response:
+                if response.status_code != 200:
+                    continue
+                parser = SitemapParser()
+                for chunk in response.iter_bytes(CHUNK_SIZE):
+                    if not walker.feed(parser.feed(chunk)) or parser.done:
+                        break
+                else:
+                    walker.feed(parser.close())
+        except httpx.HTTPError:
+            continue
+    return walker.entries
+
+
+async def acollect_sitemap_entries(http, sitemap_urls, max_urls=MAX_SITEMAP_URLS):
+    walker = SitemapWalker(sitemap_urls, max_urls)
+    while (sitemap_url := walker.next_sitemap()) is not None:
+        try:
+            async with http.astream(sitemap_url) as response:
+                if response.status_code != 200:
+                    continue
+                parser = SitemapParser()
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    if not walker.feed(parser.feed(chunk)) or parser.done:
+                        break
+                else:
+                    walker.feed(parser.close())
+        except httpx.HTTPError:
+            continue
+    return walker.entries
+
+
+def prioritise(entries, previous_pages=None):
+    """Order sitemap entries for the frontier as ``[(priority, url), ...]``.
+
+    Within each class, more recently modified URLs come first and URLs
+    without a lastmod come after those that have one.
+    """
+    previous_pages = previous_pages or {}
+    ranked = []
+    for url, lastmod in entries.items():
+        recency = -lastmod.timestamp() if lastmod else 0
+        last_audited = (previous_pages.get(url) or {}).get("last_audited")
+        # last_audited is stored as naive UTC
+        if lastmod and last_audited and lastmod <= last_audited.replace(tzinfo=timezone.utc):
+            ranked.append(((UNCHANGED, recency), url))
+        else:
+            ranked.append(((CHANGED, recency), url))
+    ranked.sort()
+    return ranked
@@ -0,0 +1,232 @@
+import heapq
+import re
+import threading
+from array import array
+from collections import Counter
+
+import numpy as np
+
+from controller.audit.urls import fingerprint
+
+SHINGLE_SIZE = 2
+HASH_BITS = 64
+# Pages within this many differing SimHash bits count as near-duplicates
+MAX_DISTANCE = 4
+THIN_CONTENT_WORDS = 300
+TOP_CLUSTERS = 20
+MAX_LISTED_URLS = 20
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def simhash(text, shingle_size=SHINGLE_SIZE):
+    """64-bit SimHash of a text over overlapping word shingles.
+
+    Each distinct shingle is hashed once and votes on every bit with its
+    frequency as weight; the vote is done as one matrix product in NumPy.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if not words:
+        return 0
+    span = min(shingle_size, len(words))
+    shingles = Counter(" ".join(words[i:i + span]) for i in range(len(words) - span + 1))
+
+    hashes = np.fromiter((fingerprint(s) for s in shingles), dtype="<u8", count=len(shingles))
+    weights = np.fromiter(shingles.values(), dtype=np.int64, count=len(shingles))
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = weights @ (bits.astype(np.int64) * 2 - 1)
+    return int.from_bytes(np.packbits(votes > 0, bitorder="little").tobytes(), "little")
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def band_slices(max_distance):
+    # max_distance + 1 bands: two hashes within max_distance bits must agree on
+    # at least one band (pigeonhole), so band buckets yield every candidate pair
+    bands = max_distance + 1
+    width, extra = divmod(HASH_BITS, bands)
+    return [(band * width + min(band, extra), (1 << (width + (band < extra))) - 1) for band in range(bands)]
+
+
+class DuplicateIndex:
+    """Online near-duplicate clustering of crawled pages by SimHash.
+
+    Pages with the same hash share one entry. Every distinct hash is filed
+    under each of its ``max_distance + 1`` bit bands; a new hash is only
+    compared with the hashes already in one of its band buckets, and matches
+    are merged with union-find. Inserting is close to constant time, so the whole crawl
+    costs roughly O(n) instead of comparing every pair of pages.
+
+    Everything is kept in flat arrays (the hash once per band, its parent
+    and page count: about 64 bytes per distinct hash) and only the
+    ``MAX_LISTED_URLS`` thinnest pages are kept. With ``keep_urls=False``
+    no URL is held at all; ``report`` is then given the crawl's
+    (url, simhash) pairs to name the cluster members.
+
+    The number of clusters and of pages in them are kept up to date on
+    every insert, so ``stats`` is constant time; ``report`` lists the
+    clusters and is cached until the next page is added.
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE, thin_words=THIN_CONTENT_WORDS, keep_urls=True):
+        self.max_distance = max_distance
+        self.thin_words = thin_words
+        self.keep_urls = keep_urls
+        self._lock = threading.Lock()
+        self._slices = band_slices(max_distance)
+        self._parent = array("q")
+        # Pages under each root entry, and the running totals over roots of two pages or more
+        self._sizes = array("q")
+        self.cluster_count = 0
+        self.clustered_pages = 0
+        self._version = 0
+        self._report = None
+        # Band keys are a few bits wide, so there are a bounded number of buckets whatever the
+        # size of the crawl; each bucket is a flat array of hashes. The first band's buckets
+        # also hold each hash's entry, which is how a hash is found again
+        self._bands = [{} for _ in self._slices]
+        self._entries = {}
+        self._urls = {}
+        self.thin_count = 0
+        # Max-heap of the thinnest pages as (-word_count, -seq, url)
+        self._thin = []
+
+    def _find(self, entry):
+        parent = self._parent
+        while parent[entry] != entry:
+            parent[entry] = parent[parent[entry]]
+            entry = parent[entry]
+        return entry
+
+    def _resize(self, root, size):
+        old = self._sizes[root]
+        self._sizes[root] = size
+        self.cluster_count += (size > 1) - (old > 1)
+        self.clustered_pages += (size if size > 1 else 0) - (old if old > 1 else 0)
+
+    def _union(self, a, b):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self._parent[root_b] = root_a
+            size = self._sizes[root_a] + self._sizes[root_b]
+            self._resize(root_b, 0)
+            self._resize(root_a, size)
+
+    def _lookup(self, hash_value):
+        shift, mask = self._slices[0]
+        key = (hash_value >> shift) & mask
+        try:
+            return self._entries[key][self._bands[0][key].index(hash_value)]
+        except (KeyError, ValueError):
+            return -1
+
+    def _insert(self, hash_value):
+        entry = len(self._parent)
+        self._parent.append(entry)
+        self._sizes.append(0)
+        for band, ((shift, mask), buckets) in enumerate(zip(self._slices, self._bands)):
+            key = (hash_value >> shift) & mask
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = array("Q")
+                if not band:
+                    self._entries[key] = array("q")
+            for other in bucket:
+                if hamming(hash_value, other) <= self.max_distance:
+                    self._union(self._lookup(other), entry)
+            bucket.append(hash_value)
+            if not band:
+                self._entries[key].append(entry)
+        return entry
+
+    def _add_thin(self, url, word_count):
+        self.thin_count += 1
+        item = (-word_count, -self.thin_count, url)
+        if len(self._thin) < MAX_LISTED_URLS:
+            heapq.heappush(self._thin, item)
+        elif item > self._thin[0]:
+            heapq.heapreplace(self._thin, item)
+
+    def add(self, url, hash_value, word_count=None):
+        with self._lock:
+            self._version += 1
+            if word_count is not None and word_count < self.thin_words:
+                self._add_thin(url, word_count)
+            if not hash_value:
+                return
+
+            entry = self._lookup(hash_value)
+            if entry < 0:
+                entry = self._insert(hash_value)
+            root = self._find(entry)
+            self._resize(root, self._sizes[root] + 1)
+            if self.keep_urls:
+                self._urls.setdefault(entry, []).append(url)
+
+    def clusters(self, pages=None):
+        """URLs of every cluster of two pages or more, largest first.
+
+        ``pages`` are the crawl's (url, simhash) pairs; they are only read
+        when the index keeps no URLs itself.
+        """
+        groups = {}
+        if self.keep_urls:
+            with self._lock:
+                for entry, urls in self._urls.items():
+                    groups.setdefault(self._find(entry), []).extend(urls)
+        else:
+            for url, hash_value in pages or ():
+                if not hash_value:
+                    continue
+                with self._lock:
+                    entry = self._lookup(hash_value)
+                    root = self._find(entry) if entry >= 0 else -1
+                    clustered = root >= 0 and self._sizes[root] > 1
+                if clustered:
+                    groups.setdefault(root, []).append(url)
+        return sorted((sorted(urls) for urls in groups.values() if len(urls) > 1), key=len, reverse=True)
+
+    def _thin_content(self):
+        thin = [(url, -words) for words, _, url in sorted(self._thin, reverse=True)]
+        return {
+            "pages": self.thin_count,
+            "threshold_words": self.thin_words,
+            "examples": [{"url": url, "word_count": words} for url, words in thin],
+        }
+
+    def stats(self):
+        """Cluster and thin-page totals without listing the clusters, in constant time."""
+        with self._lock:
+            return {
+                "duplicate_content": {
+                    "clusters": self.cluster_count,
+                    "pages": self.clustered_pages,
+                    "max_distance": self.max_distance,
+                },
+                "thin_content": self._thin_content(),
+            }
+
+    def report(self, top=TOP_CLUSTERS, pages=None):
+        with self._lock:
+            key = (self._version, top, pages is not None)
+            if self._report is not None and self._report[0] == key:
+                return self._report[1]
+        clusters = self.clusters(pages)
+        with self._lock:
+            thin_content = self._thin_content()
+        report = {
+            "duplicate_content": {
+                "clusters": len(clusters),
+                "pages": sum(len(urls) for urls in clusters),
+                "max_distance": self.max_distance,
+                "top_clusters": [
+                    {"size": len(urls), "urls": urls[:MAX_LISTED_URLS]} for urls in clusters[:top]
+                ],
+            },
+            "thin_content": thin_content,
+        }
+        with self._lock:
+            if self._version == key[0]:
+                self._report = (key, report)
+        return report
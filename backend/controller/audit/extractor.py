@@ -0,0 +1,346 @@
+from bs4 import BeautifulSoup, CData, Comment, NavigableString, Tag
+from urllib.parse import urljoin, urlparse
+from collections import Counter
+import hashlib
+import re
+from controller.audit.duplicates import simhash
+from controller.audit.records import ImageRecord, LinkRecord, PageRecord
+from controller.audit.templates import MARKER_PREFIX, TEXT_TAGS
+
+STOP_WORDS = {'a', 'an', 'the', 'and', 'or', 'but', 'is', 'are', 'was', 'were',
+              'have', 'has', 'had', 'be', 'been', 'being', 'to', 'of', 'for',
+              'with', 'by', 'on', 'at', 'in', 'this', 'that', 'these', 'those'}
+
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+COLLECTED_TAGS = HEADING_TAGS + ("title", "meta", "link", "p", "strong", "em", "b", "i",
+                                 "img", "a", "video", "audio", "html", "doctype")
+RESOURCE_HINTS = ("preload", "prefetch", "preconnect", "dns-prefetch")
+PUNCTUATION = re.compile(r'[^\w\s]')
+OG_PATTERN = re.compile(r"^og:")
+TWITTER_PATTERN = re.compile(r"^twitter:")
+
+
+def tokenize(text):
+    """Lowercased words of ``text`` without punctuation, stop words or words under three letters."""
+    text = PUNCTUATION.sub('', text.lower())
+    return [word for word in text.split() if word not in STOP_WORDS and len(word) > 2]
+
+
+class PageExtractor:
+    """Extracts the SEO data dict for a page from a single walk of the parse tree.
+
+    The tree is walked once to bucket the tags we care about and to collect the
+    visible text; every field is then derived from those buckets. Any parser
+    BeautifulSoup supports ("html.parser", "lxml", "html5lib") can be used.
+
+    With a TemplateCache, blocks of page chrome the cache has learned are cut
+    out of the HTML before parsing. Each is parsed and walked once, and its
+    tags and text are spliced into the walk of every page it is cut from, so
+    the data is the same as from parsing the whole page. A page where a block
+    was cut from inside a tag whose text is read (a link wrapping a card,
+    say) is parsed again whole, as the tag's text would miss the block's.
+    """
+
+    def __init__(self, domain, parser="html.parser", templates=None):
+        self.domain = domain
+        self.parser = parser
+        self.templates = templates
+        self._template_walks = {}
+
+    def extract(self, html, page_url, fetched_url=None):
+        return self.extract_with_text(html, page_url, fetched_url)[0]
+
+    def extract_with_text(self, html, page_url, fetched_url=None):
+        """The page's data, and the visible text nodes outside template blocks for corpus-level keyword scoring.
+
+        ``page_url`` is the crawl's canonical key for the page; the canonical
+        link is compared with ``fetched_url``, the URL the page was actually
+        served from, when there is one.
+        """
+        if not html:
+            return None, []
+        source, found = self.templates.apply(html) if self.templates is not None else (html, [])
+        soup = BeautifulSoup(source, self.parser)
+        blocks = {f"{MARKER_PREFIX}{block_id}": self._template_walk(block_id) for block_id in found}
+        tags, body_text, doc_text, spliced = self._walk(soup, blocks)
+        if spliced is None:
+            soup = BeautifulSoup(html, self.parser)
+            tags, body_text, doc_text, spliced = self._walk(soup)
+
+        data = {
+            "page_url": page_url,
+            "content_hash": hashlib.md5(html.encode()).hexdigest(),
+            "page_size_bytes": len(html),
+        }
+
+        title = tags["title"][0] if tags["title"] else None
+        data["title"] = title.string.strip() if title else None
+        data["title_length"] = len(data["title"]) if data["title"] else 0
+
+        meta = self._index_meta(tags["meta"])
+        data["meta_description"] = self._meta_content(meta["description"])
+        data["meta_description_length"] = len(data["meta_description"]) if data["meta_description"] else 0
+        data["meta_robots"] = self._meta_content(meta["robots"])
+        data["meta_keywords"] = self._meta_content(meta["keywords"])
+        data["meta_viewport"] = self._meta_content(meta["viewport"])
+        data["meta_charset"] = meta["charset"].get("charset", "").strip() if meta["charset"] is not None else None
+        data["meta_og_tags"] = meta["og"]
+        data["meta_twitter_tags"] = meta["twitter"]
+
+        link_tags = self._index_link_tags(tags["link"], page_url)
+        canonical = link_tags["canonical"]
+        data["canonical_url"] = canonical["href"].strip() if canonical is not None and canonical.has_attr("href") else None
+        data["canonical_matches_url"] = (data["canonical_url"] == (fetched_url or page_url)) if data["canonical_url"] else False
+
+        headings = {}
+        for tag in HEADING_TAGS:
+            headings[tag] = []
+            for h in tags[tag]:
+                text = h.get_text(strip=True)
+                headings[tag].append({"text": text, "length": len(text)})
+        data["headings"] = headings
+
+        data["paragraphs"] = [p.get_text(strip=True) for p in tags["p"]]
+        data["word_count"] = len(re.sub(r'\s+', ' ', " ".join(body_text)).strip().split())
+        data["simhash"] = format(simhash(" ".join(body_text)), "016x")
+        text = " ".join(doc_text)
+        data["text_html_ratio"] = round((len(text) / len(html)) * 100, 2)
+        data["keywords_density"] = self._keyword_density(text)
+        data["template_blocks"] = len(spliced)
+        data["content_word_count"] = data["word_count"] - sum(words for _, _, words in spliced)
+        main_text = []
+        start = 0
+        for block_start, block_end, _ in spliced:
+            main_text.extend(doc_text[start:block_start])
+            start = block_end
+        main_text.extend(doc_text[start:])
+
+        data["strong_tags"] = [s.get_text(strip=True) for s in tags["strong"]]
+        data["em_tags"] = [e.get_text(strip=True) for e in tags["em"]]
+        data["b_tags"] = [b.get_text(strip=True) for b in tags["b"]]
+        data["i_tags"] = [i.get_text(strip=True) for i in tags["i"]]
+
+        images = []
+        images_with_alt = 0
+        images_without_alt = 0
+        for img in tags["img"]:
+            alt = img.get("alt", "").strip()
+            image_data = ImageRecord(
+                src=urljoin(page_url, img.get("src")) if img.get("src") else None,
+                alt=alt,
+                alt_length=len(alt) if img.get("alt") else 0,
+                title=img.get("title", "").strip(),
+                width=img.get("width"),
+                height=img.get("height"),
+                lazy_loaded=img.has_attr("loading") and img["loading"] == "lazy"
+            )
+            if alt:
+                images_with_alt += 1
+            elif image_data.src:
+                images_without_alt += 1
+            images.append(image_data)
+        data["images"] = images
+        data["images_with_alt"] = images_with_alt
+        data["images_without_alt"] = images_without_alt
+        data["total_images"] = len(images)
+
+        internal_links, external_links = self._extract_links(tags["a"], page_url)
+        data["internal_links"] = internal_links
+        data["external_links"] = external_links
+        data["total_links"] = len(internal_links) + len(external_links)
+
+        # The multi-pass extractor stripped <script> and <style> from the tree
+        # before reading these fields, so they have always been empty. They are
+        # kept that way so stored audits and their scores stay comparable.
+        data["structured_data"] = []
+        data["has_structured_data"] = False
+
+        data["videos"] = [{"src": urljoin(page_url, video.get("src"))} for video in tags["video"] if video.get("src")]
+        data["audios"] = [{"src": urljoin(page_url, audio.get("src"))} for audio in tags["audio"] if audio.get("src")]
+
+        data["script_sources"] = []
+        data["style_links"] = link_tags["stylesheets"]
+        data["inline_styles"] = 0
+        data["inline_scripts"] = 0
+
+        favicon = link_tags["favicon"]
+        data["favicon"] = urljoin(page_url, favicon["href"]) if favicon is not None and favicon.has_attr("href") else None
+
+        html_tag = tags["html"][0] if tags["html"] else None
+        data["language"] = html_tag.get("lang", "").strip() if html_tag is not None and html_tag.has_attr("lang") else None
+
+        viewport = meta["viewport"]
+        data["has_viewport_meta"] = bool(data["meta_viewport"])
+        data["has_mobile_friendly_design"] = bool(viewport is not None and "width=device-width" in viewport.get("content", ""))
+
+        data["resource_hints"] = link_tags["resource_hints"]
+        data["has_https"] = page_url.startswith("https://")
+        data["hreflang_tags"] = link_tags["hreflang"]
+        data["has_doctype"] = bool(tags["doctype"])
+
+        return PageRecord(**data), main_text
+
+    def _template_walk(self, block_id):
+        walked = self._template_walks.get(block_id)
+        if walked is None:
+            # Parsed on their own with the page's parser, which fixes up a fragment the way it does the
+            # body of a page. lxml and html5lib wrap it in <html><body>, which is not part of the block.
+            soup = BeautifulSoup(self.templates.blocks[block_id], self.parser)
+            tags, body_text, doc_text, _ = self._walk(soup.body or soup, in_body=True)
+            words = sum(len(text.split()) for text in body_text)
+            walked = self._template_walks[block_id] = (tags, body_text, doc_text, words)
+        return walked
+
+    def _walk(self, soup, blocks=None, in_body=False):
+        """Collected tags, body text, document text and spliced template blocks of a parse tree.
+
+        The spliced blocks are None when one of them was cut from inside a TEXT_TAGS tag.
+        """
+        tags = {name: [] for name in COLLECTED_TAGS}
+        body_text = []
+        doc_text = []
+        # (start, end, body words) of the doc_text each template block spliced in
+        spliced = []
+        body = None
+        body_end = None
+        skip_end = None
+        in_script = False
+
+        for element in soup.descendants:
+            element_type = type(element)
+            if element_type is NavigableString or element_type is CData:
+                text = element.strip()
+                if text:
+                    if in_body:
+                        body_text.append(text)
+                    if not in_script:
+                        doc_text.append(text)
+            elif element_type is Tag:
+                name = element.name
+                bucket = tags.get(name)
+                if bucket is not None:
+                    bucket.append(element)
+                elif name == "body" and body is None:
+                    body = element
+                    body_end = element._last_descendant()
+                    in_body = True
+                elif (name == "script" or name == "style") and not in_script:
+                    skip_end = element._last_descendant()
+                    in_script = True
+            elif element_type is Comment and blocks:
+                block = blocks.get(element)
+                if block is not None:
+                    if any(parent.name in TEXT_TAGS for parent in element.parents):
+                        return tags, body_text, doc_text, None
+                    block_tags, block_body_text, block_doc_text, words = block
+                    for name, bucket in block_tags.items():
+                        if bucket:
+                            tags[name].extend(bucket)
+                    if in_body:
+                        body_text.extend(block_body_text)
+                    start = len(doc_text)
+                    if not in_script:
+                        doc_text.extend(block_doc_text)
+                    spliced.append((start, len(doc_text), words if in_body else 0))
+
+            if in_body and element is body_end:
+                in_body = False
+            if in_script and element is skip_end:
+                in_script = False
+
+        return tags, body_text, doc_text, spliced
+
+    def _index_meta(self, meta_tags):
+        named = {"description": None, "robots": None, "keywords": None, "viewport": None}
+        meta = {"charset": None, "og": {}, "twitter": {}}
+        for tag in meta_tags:
+            name = tag.get("name")
+            if name in named and named[name] is None:
+                named[name] = tag
+            if meta["charset"] is None and tag.has_attr("charset"):
+                meta["charset"] = tag
+            prop = tag.get("property")
+            if isinstance(prop, str) and OG_PATTERN.search(prop):
+                self._add_social_tag(meta["og"], prop, tag)
+            if isinstance(name, str) and TWITTER_PATTERN.search(name):
+                self._add_social_tag(meta["twitter"], name, tag)
+        meta.update(named)
+        return meta
+
+    def _add_social_tag(self, tags, name, tag):
+        name = name.strip()
+        content = tag.get("content", "").strip()
+        if name and content:
+            tags[name] = content
+
+    def _meta_content(self, tag):
+        return tag.get("content", "").strip() if tag is not None else None
+
+    def _index_link_tags(self, link_tags, page_url):
+        links = {
+            "canonical": None,
+            "favicon": None,
+            "stylesheets": [],
+            "resource_hints": {hint: [] for hint in RESOURCE_HINTS},
+            "hreflang": [],
+        }
+        for link in link_tags:
+            rel = link.get("rel")
+            if rel is None:
+                continue
+            values = rel if isinstance(rel, list) else [rel]
+            if links["canonical"] is None and "canonical" in values:
+                links["canonical"] = link
+            if links["favicon"] is None and any("icon" in value.lower() for value in values):
+                links["favicon"] = link
+            if "stylesheet" in values and link.get("href"):
+                links["stylesheets"].append(urljoin(page_url, link.get("href")))
+            hint = rel[0] if isinstance(rel, list) else rel
+            if hint in links["resource_hints"] and link.get("href"):
+                links["resource_hints"][hint].append(urljoin(page_url, link.get("href")))
+            if "alternate" in values and link.has_attr("hreflang") and link.get("href"):
+                links["hreflang"].append({
+                    "hreflang": link.get("hreflang"),
+                    "href": link.get("href")
+                })
+        return links
+
+    def _extract_links(self, anchors, page_url):
+        internal_links = []
+        external_links = []
+        for a in anchors:
+            if not a.has_attr("href"):
+                continue
+            href = a.get("href", "").strip()
+            if not href or href.startswith('#'):
+                continue
+
+            full_url = urljoin(page_url, href)
+            text = a.get_text(strip=True)
+            link_data = LinkRecord(
+                href=full_url,
+                text=text,
+                text_length=len(text),
+                title=a.get("title", "").strip(),
+                nofollow="nofollow" in a.get("rel", ""),
+                has_text=bool(text),
+            )
+
+            if urlparse(full_url).netloc == self.domain:
+                internal_links.append(link_data)
+            else:
+                external_links.append(link_data)
+        return internal_links, external_links
+
+    def _keyword_density(self, text):
+        filtered_words = tokenize(text)
+        word_count = Counter(filtered_words)
+        total_words = len(filtered_words)
+        densities = {}
+        if total_words > 0:
+            for word, count in word_count.most_common(20):
+                densities[word] = {
+                    "count": count,
+                    "density": round((count / total_words) * 100, 2)
+                }
+        return densities
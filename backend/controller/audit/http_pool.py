@@ -0,0 +1,237 @@
+import contextlib
+import importlib.util
+import threading
+import time
+from urllib.parse import urlparse
+
+import httpx
+
+from controller.audit.scheduler import DEFAULT_RATE, PolitenessScheduler
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+CONNECT_EVENT = "connection.connect_tcp.started"
+
+
+class PoolStats:
+    """Thread-safe counters for requests served by an HTTPPool.
+
+    A request that had to open a new TCP connection is a pool miss; one that
+    went out over an existing keep-alive (or HTTP/2) connection is a hit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.per_host = {}
+
+    def record(self, host, latency, opened_connection, error=False):
+        with self._lock:
+            self.requests += 1
+            if opened_connection:
+                self.misses += 1
+            else:
+                self.hits += 1
+            if error:
+                self.errors += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            host_stats = self.per_host.setdefault(host, {"requests": 0, "connections_opened": 0})
+            host_stats["requests"] += 1
+            host_stats["connections_opened"] += 1 if opened_connection else 0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "pool_hits": self.hits,
+                "pool_misses": self.misses,
+                "hit_ratio": round(self.hits / self.requests, 3) if self.requests else 0,
+                "errors": self.errors,
+                "avg_latency_ms": round(self.total_latency / self.requests * 1000, 1) if self.requests else 0,
+                "max_latency_ms": round(self.max_latency * 1000, 1),
+                "per_host": {host: dict(stats) for host, stats in self.per_host.items()},
+            }
+
+
+class HTTPPool:
+    """Shared keep-alive connection pool used for every fetch an audit makes.
+
+    Both the threaded and the asyncio crawl go through the same limits: a cap
+    on total connections, separate connect/read timeouts, and a
+    PolitenessScheduler that rate limits and backs off per host. HTTP/2 is
+    negotiated when the ``h2`` package is installed. Async requests can also
+    take a slot from a FairShareBudget, once the host's scheduler admits them.
+    """
+
+    def __init__(self, headers=None, max_connections=20, max_per_host=6,
+                 connect_timeout=5.0, read_timeout=15.0, http2=None, rate_per_host=DEFAULT_RATE,
+                 scheduler=None, budget=None):
+        self.headers = headers or {}
+        self.max_per_host = max(1, max_per_host)
+        self.http2 = HTTP2_AVAILABLE if http2 is None else (http2 and HTTP2_AVAILABLE)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.stats = PoolStats()
+        self._client = None
+        self._async_client = None
+        self._lock = threading.Lock()
+        self.scheduler = scheduler or PolitenessScheduler(rate=rate_per_host, max_concurrency=self.max_per_host)
+        self.budget = budget
+
+    def _client_kwargs(self):
+        return {
+            "headers": self.headers,
+            "limits": self.limits,
+            "timeout": self.timeout,
+            "http2": self.http2,
+            "follow_redirects": True,
+        }
+
+    def _sync_client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(**self._client_kwargs())
+            return self._client
+
+    def set_crawl_delay(self, host, seconds):
+        if seconds:
+            self.scheduler.set_rate(host, 1 / float(seconds))
+
+    def _release(self, host, latency, response):
+        if response is None:
+            self.scheduler.release(host, latency)
+        else:
+            self.scheduler.release(host, latency, response.status_code, response.headers.get("retry-after"))
+
+    def get(self, url, headers=None):
+        host = urlparse(url).netloc
+        client = self._sync_client()
+        opened = []
+
+        def trace(event_name, info):
+            if event_name == CONNECT_EVENT:
+                opened.append(True)
+
+        self.scheduler.acquire(host)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = client.get(url, headers=headers, extensions={"trace": trace})
+        except httpx.HTTPError:
+            self.stats.record(host, time.perf_counter() - start, bool(opened), error=True)
+            raise
+        finally:
+            self._release(host, time.perf_counter() - start, response)
+        self.stats.record(host, time.perf_counter() - start, bool(opened))
+        return response
+
+    async def aget(self, url, headers=None, tenant=None):
+        host = urlparse(url).netloc
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._client_kwargs())
+        opened = []
+
+        async def trace(event_name, info):
+            if event_name == CONNECT_EVENT:
+                opened.append(True)
+
+        await self.scheduler.aacquire(host)
+        if self.budget is not None:
+            tenant = tenant or host
+            try:
+                await self.budget.acquire(tenant)
+            except BaseException:
+                self.scheduler.cancel(host)
+                raise
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await self._async_client.get(url, headers=headers, extensions={"trace": trace})
+        except httpx.HTTPError:
+            self.stats.record(host, time.perf_counter() - start, bool(opened), error=True)
+            raise
+        finally:
+            self._release(host, time.perf_counter() - start, response)
+            if self.budget is not None:
+                await self.budget.release(tenant)
+        self.stats.record(host, time.perf_counter() - start, bool(opened))
+        return response
+
+    @contextlib.contextmanager
+    def stream(self, url, headers=None):
+        """Like ``get``, but the body is left for the caller to read (``response.iter_bytes()``).
+
+        The host's slot is held until the block exits, and the response is
+        closed then whether or not its body was read to the end.
+        """
+        host = urlparse(url).netloc
+        client = self._sync_client()
+        opened = []
+
+        def trace(event_name, info):
+            if event_name == CONNECT_EVENT:
+                opened.append(True)
+
+        self.scheduler.acquire(host)
+        start = time.perf_counter()
+        response = None
+        try:
+            with client.stream("GET", url, headers=headers, extensions={"trace": trace}) as response:
+                yield response
+        except httpx.HTTPError:
+            self.stats.record(host, time.perf_counter() - start, bool(opened), error=True)
+            raise
+        finally:
+            self._release(host, time.perf_counter() - start, response)
+        self.stats.record(host, time.perf_counter() - start, bool(opened))
+
+    @contextlib.asynccontextmanager
+    async def astream(self, url, headers=None, tenant=None):
+        """Async ``stream``: read the body with ``response.aiter_bytes()``."""
+        host = urlparse(url).netloc
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._client_kwargs())
+        opened = []
+
+        async def trace(event_name, info):
+            if event_name == CONNECT_EVENT:
+                opened.append(True)
+
+        await self.scheduler.aacquire(host)
+        if self.budget is not None:
+            tenant = tenant or host
+            try:
+                await self.budget.acquire(tenant)
+            except BaseException:
+                self.scheduler.cancel(host)
+                raise
+        start = time.perf_counter()
+        response = None
+        try:
+            async with self._async_client.stream("GET", url, headers=headers,
+                                                 extensions={"trace": trace}) as response:
+                yield response
+        except httpx.HTTPError:
+            self.stats.record(host, time.perf_counter() - start, bool(opened), error=True)
+            raise
+        finally:
+            self._release(host, time.perf_counter() - start, response)
+            if self.budget is not None:
+                await self.budget.release(tenant)
+        self.stats.record(host, time.perf_counter() - start, bool(opened))
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
@@ -0,0 +1,57 @@
+from datetime import timezone
+from email.utils import format_datetime
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models.audit import Audit
+from models.page import Page
+
+
+def load_previous_pages(db: Session, project_id) -> dict:
+    """Return the state an incremental re-audit needs for every known page.
+
+    Keyed by URL, each entry carries the HTTP validators and content hash from
+    the last crawl, the outgoing internal links (so a 304 page can still feed
+    the frontier) and the scorecard of the latest audit of that page.
+    """
+    latest_audits = (
+        select(Audit.page_id, Audit.issues)
+        .distinct(Audit.page_id)
+        .order_by(Audit.page_id, Audit.created_at.desc())
+        .subquery()
+    )
+    rows = db.execute(
+        select(Page, latest_audits.c.issues)
+        .outerjoin(latest_audits, latest_audits.c.page_id == Page.id)
+        .where(Page.project_id == project_id)
+    )
+
+    previous = {}
+    for page, scorecard in rows:
+        if not scorecard:
+            continue
+        previous[page.url] = {
+            "title": page.title,
+            "etag": page.etag,
+            "last_modified": page.last_modified,
+            "last_audited": page.last_audited,
+            "content_hash": page.content_hash,
+            "simhash": page.simhash,
+            "word_count": page.word_count,
+            "links": page.links or [],
+            "scorecard": scorecard,
+        }
+    return previous
+
+
+def conditional_headers(previous):
+    if not previous:
+        return None
+    headers = {}
+    if previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+    elif previous.get("last_audited"):
+        # last_audited is stored as naive UTC
+        headers["If-Modified-Since"] = format_datetime(previous["last_audited"].replace(tzinfo=timezone.utc), usegmt=True)
+    return headers or None
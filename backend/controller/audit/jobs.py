@@ -0,0 +1,351 @@
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from uuid import uuid4
+
+JOBS_DB_PATH = os.getenv("AUDIT_JOBS_DB", "audit_jobs.sqlite3")
+AUDIT_WORKERS = int(os.getenv("AUDIT_WORKERS", "2"))
+# Extra processes per running audit for parsing and scoring; 0 keeps it in the audit's process
+AUDIT_EXTRACT_WORKERS = int(os.getenv("AUDIT_EXTRACT_WORKERS", "0"))
+# Progress is written to the jobs table at most every N pages or every T seconds, whichever comes first
+JOB_PROGRESS_PAGES = int(os.getenv("JOB_PROGRESS_PAGES", "25"))
+JOB_PROGRESS_SECONDS = float(os.getenv("JOB_PROGRESS_SECONDS", "2"))
+# Every queue marks the jobs it owns alive this often; another queue takes over jobs not marked for JOB_STALE_SECONDS
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "60"))
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+@contextlib.contextmanager
+def _connect(db_path):
+    # Commits (or rolls back) and closes, unlike the connection's own context manager
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+
+def _update_job(db_path, job_id, **fields):
+    fields["updated_at"] = _now()
+    columns = ", ".join(f"{name} = ?" for name in fields)
+    with _connect(db_path) as conn:
+        conn.execute(f"UPDATE audit_jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+
+def _claim_job(db_path, job_id, owner):
+    """Mark a queued job running if ``owner`` still owns it; False when another queue took it over."""
+    now = _now()
+    with _connect(db_path) as conn:
+        claimed = conn.execute(
+            "UPDATE audit_jobs SET status = ?, started_at = ?, updated_at = ?, heartbeat_at = ? "
+            "WHERE id = ? AND status = ? AND owner = ?",
+            (RUNNING, now, now, time.time(), job_id, QUEUED, owner),
+        ).rowcount
+    return claimed == 1
+
+
+def _progress_reporter(db_path, job_id, every=JOB_PROGRESS_PAGES, interval=JOB_PROGRESS_SECONDS):
+    # Called once per page, possibly from several crawl threads; each write opens a connection
+    # and commits, so only some of the calls reach SQLite
+    lock = threading.Lock()
+    last = {"pages": 0, "at": time.monotonic()}
+
+    def report_progress(pages_done):
+        now = time.monotonic()
+        with lock:
+            if pages_done - last["pages"] < every and now - last["at"] < interval:
+                return
+            last["pages"], last["at"] = pages_done, now
+        _update_job(db_path, job_id, pages_done=pages_done, heartbeat_at=time.time())
+
+    return report_progress
+
+
+def run_audit_job(db_path, job_id, owner, params):
+    # Runs inside a worker process; everything it reports goes through SQLite
+    from controller.audit.audit_site import SEOAudit
+    from controller.audit.archive import AUDIT_ARCHIVE_PATH, ExtractionArchive
+    from serialization import encode_json
+
+    if not _claim_job(db_path, job_id, owner):
+        return
+
+    report_progress = _progress_reporter(db_path, job_id)
+
+    archive = None
+    try:
+        archive = ExtractionArchive(AUDIT_ARCHIVE_PATH) if AUDIT_ARCHIVE_PATH else None
+        audit = SEOAudit(
+            params["url"],
+            depth=params["depth"],
+            max_pages=params["max_pages"],
+            concurrency=params.get("concurrency", 10),
+            progress_callback=report_progress,
+            extract_workers=AUDIT_EXTRACT_WORKERS,
+            archive=archive,
+        )
+        result = asyncio.run(audit.run_async())
+        if archive is not None:
+            archive.prune()
+        _update_job(db_path, job_id, status=COMPLETED, pages_done=len(result["detailed_results"]),
+                    result=encode_json(result).decode(), finished_at=_now())
+    except Exception as e:
+        _update_job(db_path, job_id, status=FAILED, error=str(e), finished_at=_now())
+    finally:
+        if archive is not None:
+            archive.close()
+
+
+def run_rescore_job(db_path, job_id, owner, params):
+    from serialization import encode_json
+    from controller.audit.rescore import rescore_run
+
+    if not _claim_job(db_path, job_id, owner):
+        return
+
+    report_progress = _progress_reporter(db_path, job_id)
+
+    try:
+        result = rescore_run(params["run_id"], weights=params.get("weights"), thresholds=params.get("thresholds"),
+                             progress_callback=report_progress)
+        _update_job(db_path, job_id, status=COMPLETED, pages_done=len(result["detailed_results"]),
+                    result=encode_json(result).decode(), finished_at=_now())
+    except Exception as e:
+        _update_job(db_path, job_id, status=FAILED, error=str(e), finished_at=_now())
+
+
+def run_benchmark_job(db_path, job_id, owner, params):
+    from controller.audit.backlinks import get_backlink_service
+    from controller.audit.competitors import CompetitorBenchmark, persist_competitor_benchmark
+    from serialization import encode_json
+    from db.session import SessionLocal
+
+    if not _claim_job(db_path, job_id, owner):
+        return
+
+    report_progress = _progress_reporter(db_path, job_id)
+
+    try:
+        benchmark = CompetitorBenchmark(
+            params["url"],
+            params["competitor_urls"],
+            depth=params["depth"],
+            max_pages=params["max_pages"],
+            extract_workers=AUDIT_EXTRACT_WORKERS,
+            progress_callback=report_progress,
+            backlinks=get_backlink_service(),
+        )
+        result = benchmark.run()
+        if params.get("project_id"):
+            db = SessionLocal()
+            try:
+                persist_competitor_benchmark(db, params["project_id"], result)
+            finally:
+                db.close()
+        pages_done = sum(site["pages_audited"] for site in [result["site"], *result["competitors"]])
+        _update_job(db_path, job_id, status=COMPLETED, pages_done=pages_done,
+                    result=encode_json(result).decode(), finished_at=_now())
+    except Exception as e:
+        _update_job(db_path, job_id, status=FAILED, error=str(e), finished_at=_now())
+
+
+def _job_function(params):
+    if "run_id" in params:
+        return run_rescore_job
+    if "competitor_urls" in params:
+        return run_benchmark_job
+    return run_audit_job
+
+
+class AuditJobQueue:
+    """Runs audits in a process pool and tracks them in a local SQLite table.
+
+    Jobs survive as rows, so status and results stay queryable from any API
+    worker that points at the same database file. Each job is owned by the
+    queue that submitted it, which moves it from queued to running only if
+    it still owns it, and marks every job it owns alive every
+    ``heartbeat`` seconds. Queues check for jobs whose owner has not done so
+    for ``stale_after`` seconds, on start and then with every heartbeat: a
+    stale queued job is taken over and run, a stale running one is marked
+    failed. Several API workers can share the database without running a
+    job twice or failing each other's.
+    """
+
+    def __init__(self, db_path=JOBS_DB_PATH, max_workers=AUDIT_WORKERS, heartbeat=JOB_HEARTBEAT_SECONDS,
+                 stale_after=JOB_STALE_SECONDS):
+        self.db_path = db_path
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.heartbeat = heartbeat
+        self.stale_after = stale_after
+        # Spawned rather than forked: the API process runs threads, and forking
+        # a process with threads can leave locks held in the child
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        self._create_table()
+        self._recover()
+        self._stopped = threading.Event()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="audit-job-heartbeat",
+                                                  daemon=True)
+        self._heartbeat_thread.start()
+
+    def _create_table(self):
+        with _connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS audit_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    pages_done INTEGER NOT NULL DEFAULT 0,
+                    max_pages INTEGER NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    updated_at TEXT NOT NULL,
+                    owner TEXT,
+                    heartbeat_at REAL
+                )
+            """)
+            # Tables created before jobs had owners
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(audit_jobs)")}
+            for name, column_type in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+                if name not in columns:
+                    try:
+                        conn.execute(f"ALTER TABLE audit_jobs ADD COLUMN {name} {column_type}")
+                    except sqlite3.OperationalError:
+                        # Added by another API worker starting at the same time
+                        pass
+            conn.execute("CREATE INDEX IF NOT EXISTS audit_jobs_active ON audit_jobs (status, heartbeat_at)")
+
+    def _heartbeat_loop(self):
+        while not self._stopped.wait(self.heartbeat):
+            try:
+                with _connect(self.db_path) as conn:
+                    conn.execute("UPDATE audit_jobs SET heartbeat_at = ? WHERE owner = ? AND status IN (?, ?)",
+                                 (time.time(), self.owner, QUEUED, RUNNING))
+                self._recover()
+            except sqlite3.Error:
+                # A locked or briefly unavailable database; the next beat tries again
+                continue
+
+    def _recover(self):
+        """Take over queued jobs and fail running ones whose owner stopped marking them alive."""
+        now = time.time()
+        stale_before = now - self.stale_after
+        with _connect(self.db_path) as conn:
+            stale = conn.execute(
+                "SELECT id, status, params FROM audit_jobs WHERE status IN (?, ?) AND COALESCE(heartbeat_at, 0) < ?",
+                (QUEUED, RUNNING, stale_before),
+            ).fetchall()
+            taken = []
+            for row in stale:
+                # Still stale when updated, so a job another queue took over in the meantime is left alone
+                if row["status"] == RUNNING:
+                    conn.execute(
+                        "UPDATE audit_jobs SET status = ?, error = ?, finished_at = ?, updated_at = ? "
+                        "WHERE id = ? AND status = ? AND COALESCE(heartbeat_at, 0) < ?",
+                        (FAILED, "Interrupted: its worker stopped", _now(), _now(), row["id"], RUNNING, stale_before),
+                    )
+                elif conn.execute(
+                    "UPDATE audit_jobs SET owner = ?, heartbeat_at = ?, updated_at = ? "
+                    "WHERE id = ? AND status = ? AND COALESCE(heartbeat_at, 0) < ?",
+                    (self.owner, now, _now(), row["id"], QUEUED, stale_before),
+                ).rowcount == 1:
+                    taken.append(row)
+        for row in taken:
+            params = json.loads(row["params"])
+            self.executor.submit(_job_function(params), self.db_path, row["id"], self.owner, params)
+
+    def _enqueue(self, params, max_pages):
+        job_id = str(uuid4())
+        now = _now()
+        with _connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO audit_jobs (id, status, params, max_pages, created_at, updated_at, owner, heartbeat_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(params), max_pages, now, now, self.owner, time.time()),
+            )
+        self.executor.submit(_job_function(params), self.db_path, job_id, self.owner, params)
+        return job_id
+
+    def submit(self, url, depth, max_pages, concurrency=10):
+        params = {"url": url, "depth": depth, "max_pages": max_pages, "concurrency": concurrency}
+        return self._enqueue(params, max_pages)
+
+    def submit_benchmark(self, url, competitor_urls, depth, max_pages, project_id=None):
+        params = {"url": url, "competitor_urls": competitor_urls, "depth": depth, "max_pages": max_pages,
+                  "project_id": str(project_id) if project_id else None}
+        return self._enqueue(params, max_pages * (len(competitor_urls) + 1))
+
+    def submit_rescore(self, run, weights=None, thresholds=None):
+        # `run` is the archive's description of the run, see ExtractionArchive.run
+        params = {"run_id": run["run_id"], "url": run["base_url"], "weights": weights, "thresholds": thresholds}
+        return self._enqueue(params, run["pages"])
+
+    def status(self, job_id):
+        with _connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT id, status, params, pages_done, max_pages, error, created_at, started_at, finished_at "
+                "FROM audit_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["progress"] = round(min(job["pages_done"] / job["max_pages"], 1.0), 2) if job["max_pages"] else 0
+        if job["status"] == COMPLETED:
+            job["progress"] = 1.0
+        return job
+
+    def result(self, job_id):
+        with _connect(self.db_path) as conn:
+            row = conn.execute("SELECT result FROM audit_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or row["result"] is None:
+            return None
+        return json.loads(row["result"])
+
+    def shutdown(self):
+        self._stopped.set()
+        self._heartbeat_thread.join()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        # Jobs this queue will no longer start are left for the other queues to take over now
+        with _connect(self.db_path) as conn:
+            conn.execute("UPDATE audit_jobs SET heartbeat_at = NULL WHERE owner = ? AND status = ?",
+                         (self.owner, QUEUED))
+
+
+_job_queue = None
+
+
+def get_job_queue() -> AuditJobQueue:
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = AuditJobQueue()
+    return _job_queue
+
+
+def shutdown_job_queue():
+    global _job_queue
+    if _job_queue is not None:
+        _job_queue.shutdown()
+        _job_queue = None
@@ -0,0 +1,204 @@
+import math
+from collections import Counter
+from functools import reduce
+
+from sqlalchemy import and_, delete, func, insert, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from controller.audit.extractor import tokenize
+from models.keyword import Keyword
+from models.page import Page
+from models.page_term import PageTerm
+from models.project_term import ProjectTerm
+
+# Where a term appears on a page; higher bits rank first, so a title beats an H1 beats the body
+FIELD_TITLE = 4
+FIELD_H1 = 2
+FIELD_BODY = 1
+# A page targets a keyword when every word of it is in the page's title or an H1
+TARGET_MIN_FIELDS = FIELD_H1
+# project_terms row whose df is the number of indexed pages; tokenize never yields ""
+DOCUMENTS = ""
+MAX_QUERY_TERMS = 8
+DEFAULT_RESULTS = 50
+MAX_RESULTS = 500
+# Tracked keywords checked by keyword_cannibalization when none are given
+MAX_CANNIBALIZATION_KEYWORDS = 200
+
+
+def query_terms(keyword):
+    return list(dict.fromkeys(tokenize(keyword)))[:MAX_QUERY_TERMS]
+
+
+def page_terms(data, keywords=None):
+    """{term: (count, tf, fields)} for one page, or None when the page was not extracted again.
+
+    Body terms are the single words among the page's site-wide TF-IDF
+    ``keywords`` when the audit computed them, so navigation and footer
+    words are left out, and otherwise the keyword density top 20 with the
+    density as tf. Words of the title and H1s are added to them, with a
+    count and tf of 0 when they are not body terms.
+    """
+    densities = data.get("keywords_density")
+    if densities is None:
+        return None
+    if keywords is not None:
+        terms = {keyword["term"]: [keyword["count"], keyword["tf"], FIELD_BODY]
+                 for keyword in keywords if " " not in keyword["term"]}
+    else:
+        terms = {term: [info["count"], info["density"] / 100, FIELD_BODY] for term, info in densities.items()}
+    h1_text = " ".join(h1["text"] for h1 in (data.get("headings") or {}).get("h1", []))
+    for field, text in ((FIELD_TITLE, data.get("title") or ""), (FIELD_H1, h1_text)):
+        for term in tokenize(text):
+            terms.setdefault(term, [0, 0.0, 0])[2] |= field
+    return {term: tuple(values) for term, values in terms.items()}
+
+
+def index_pages(db: Session, project_id, pages) -> int:
+    """Replace the indexed terms of each (page_id, data, keywords) in ``pages``, in the caller's transaction.
+
+    The project's document frequencies are adjusted by the difference
+    between the terms removed and the terms added. Pages whose data was
+    reused from an earlier audit keep the terms they were indexed with.
+    Returns the number of pages indexed.
+    """
+    page_ids = []
+    rows = []
+    for page_id, data, keywords in pages:
+        terms = page_terms(data, keywords)
+        if terms is None:
+            continue
+        page_ids.append(page_id)
+        rows.extend(
+            {"page_id": page_id, "term": term, "project_id": project_id, "count": count, "tf": tf, "fields": fields}
+            for term, (count, tf, fields) in terms.items()
+        )
+    if not page_ids:
+        return 0
+
+    removed = db.execute(
+        delete(PageTerm).where(PageTerm.page_id.in_(page_ids)).returning(PageTerm.page_id, PageTerm.term)
+    ).all()
+    frequencies = Counter(row["term"] for row in rows)
+    frequencies[DOCUMENTS] += len({row["page_id"] for row in rows})
+    frequencies.subtract(term for _, term in removed)
+    frequencies[DOCUMENTS] -= len({page_id for page_id, _ in removed})
+    if rows:
+        db.execute(insert(PageTerm), rows)
+
+    changes = [
+        {"project_id": project_id, "term": term, "df": change}
+        # Sorted, so concurrent audits of one project lock rows in the same order
+        for term, change in sorted(frequencies.items()) if change
+    ]
+    if changes:
+        upsert = pg_insert(ProjectTerm)
+        db.execute(upsert.on_conflict_do_update(
+            index_elements=[ProjectTerm.project_id, ProjectTerm.term],
+            set_={"df": ProjectTerm.df + upsert.excluded.df},
+        ), changes)
+    return len(page_ids)
+
+
+def _idf(db: Session, project_id, terms):
+    """Smoothed idf (as scikit-learn computes it) of each term some indexed page uses."""
+    frequencies = dict(db.execute(
+        select(ProjectTerm.term, ProjectTerm.df)
+        .where(ProjectTerm.project_id == project_id, ProjectTerm.term.in_([DOCUMENTS, *terms]), ProjectTerm.df > 0)
+    ).all())
+    documents = frequencies.pop(DOCUMENTS, 0)
+    return {term: math.log((1 + documents) / (1 + df)) + 1 for term, df in frequencies.items()}
+
+
+def _pages_for_terms(db: Session, project_id, terms, idf, targeting_only, limit):
+    # Start from the rarest word's pages and look the others up by (page_id, term)
+    rarest, *others = sorted(terms, key=lambda term: -idf[term])
+    first = PageTerm.__table__.alias("rarest")
+    joined = [PageTerm.__table__.alias(f"term_{i}") for i in range(len(others))]
+    matches = select(first.c.page_id).where(first.c.project_id == project_id, first.c.term == rarest)
+    for alias, term in zip(joined, others):
+        matches = matches.join(alias, and_(alias.c.page_id == first.c.page_id, alias.c.term == term))
+    if targeting_only:
+        matches = matches.where(*(alias.c.fields >= TARGET_MIN_FIELDS for alias in [first, *joined]))
+
+    # The bits every word has in common, e.g. FIELD_TITLE only if all of them are in the title
+    fields = reduce(lambda bits, alias: bits.op("&")(alias.c.fields), joined, first.c.fields)
+    weight = sum((alias.c.tf * idf[term] for alias, term in zip(joined, others)), first.c.tf * idf[rarest])
+    # A single word is ranked by (fields, tf) straight off idx_page_term_rank
+    order = (fields.desc(), weight.desc()) if others else (first.c.fields.desc(), first.c.tf.desc())
+    matches = matches.add_columns(fields.label("fields"), weight.label("weight")).order_by(*order).limit(limit)
+    matches = matches.subquery()
+
+    rows = db.execute(
+        select(Page.url, Page.title, matches.c.fields, matches.c.weight)
+        .join(matches, matches.c.page_id == Page.id)
+        .order_by(matches.c.fields.desc(), matches.c.weight.desc(), Page.url)
+    ).all()
+    return [
+        {
+            "url": row.url,
+            "title": row.title,
+            "tf_idf": round(row.weight, 4),
+            "in_title": bool(row.fields & FIELD_TITLE),
+            "in_h1": bool(row.fields & FIELD_H1),
+        }
+        for row in rows
+    ]
+
+
+def pages_for_keyword(db: Session, project_id, keyword: str, targeting_only: bool = False,
+                      limit: int = DEFAULT_RESULTS) -> dict:
+    """Pages of a project that use every word of ``keyword``, best targeted first.
+
+    Pages with the words in their title come first, then those with them in
+    an H1, then by summed TF-IDF. ``targeting_only`` keeps just the pages
+    where each word is in the title or an H1.
+    """
+    terms = query_terms(keyword)
+    idf = _idf(db, project_id, terms) if terms else {}
+    items = []
+    # A word no page uses means no page has them all
+    if terms and len(idf) == len(terms):
+        items = _pages_for_terms(db, project_id, terms, idf, targeting_only, max(1, min(limit, MAX_RESULTS)))
+    return {"keyword": keyword, "terms": terms, "items": items}
+
+
+def keyword_cannibalization(db: Session, project_id, keywords=None, min_pages: int = 2,
+                            limit: int = DEFAULT_RESULTS) -> list:
+    """Keywords that ``min_pages`` or more pages target at once, most contested first.
+
+    Checks the given keywords, or the project's tracked Keyword rows
+    (most relevant first) when there are none.
+    """
+    if keywords is None:
+        keywords = db.scalars(
+            select(Keyword.keyword)
+            .where(Keyword.project_id == project_id)
+            .order_by(Keyword.relevance_score.desc().nulls_last(), Keyword.id)
+            .limit(MAX_CANNIBALIZATION_KEYWORDS)
+        ).all()
+    queries = {keyword: query_terms(keyword) for keyword in keywords}
+    idf = _idf(db, project_id, {term for terms in queries.values() for term in terms})
+    report = []
+    for keyword, terms in queries.items():
+        if not terms or any(term not in idf for term in terms):
+            continue
+        pages = _pages_for_terms(db, project_id, terms, {term: idf[term] for term in terms}, True, MAX_RESULTS)
+        if len(pages) >= min_pages:
+            report.append({"keyword": keyword, "terms": terms, "pages": len(pages), "items": pages})
+    report.sort(key=lambda entry: entry["pages"], reverse=True)
+    return report[:max(1, min(limit, MAX_RESULTS))]
+
+
+def search_keywords(db: Session, project_id, query: str, limit: int = DEFAULT_RESULTS):
+    """Tracked keywords of a project matching every word of ``query``, through the GIN index."""
+    # Spelled out like the idx_keyword_search expression so the planner uses it
+    document = func.to_tsvector(literal_column("'simple'"), Keyword.keyword)
+    tsquery = func.plainto_tsquery(literal_column("'simple'"), query)
+    return db.scalars(
+        select(Keyword)
+        .where(Keyword.project_id == project_id, document.op("@@")(tsquery))
+        .order_by(func.ts_rank(document, tsquery).desc(), Keyword.relevance_score.desc().nulls_last())
+        .limit(max(1, min(limit, MAX_RESULTS)))
+    ).all()
@@ -0,0 +1,249 @@
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+
+import numpy as np
+
+from controller.audit.extractor import PUNCTUATION
+
+KEYWORD_NGRAMS = int(os.getenv("KEYWORD_NGRAMS", "2"))
+# Terms are hashed into this many buckets, which bounds memory whatever the vocabulary
+KEYWORD_FEATURES = 2 ** int(os.getenv("KEYWORD_FEATURE_BITS", "20"))
+KEYWORD_CHUNK_SIZE = int(os.getenv("KEYWORD_CHUNK_SIZE", "1000"))
+TOP_KEYWORDS = 20
+# Terms on more than this share of pages are site chrome (navigation, footer, ...)
+BOILERPLATE_MAX_DF = 0.5
+# Below this many pages, document frequencies say too little to call anything boilerplate
+BOILERPLATE_MIN_PAGES = 10
+SITE_TERMS = 50
+
+ENGLISH_STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are aren as at be because been before being below
+between both but by can cannot could couldn did didn do does doesn doing don down during each etc even ever every
+few for from further get got had hadn has hasn have haven having he her here hers herself him himself his how
+however i if in into is isn it its itself just let like ll made make many may me might more most much must
+mustn my myself need no nor not now of off often on once one only or other our ours ourselves out over own per
+rather re same shall shan she should shouldn since so some still such than that the their theirs them
+themselves then there these they this those though through thus to too under until up upon us use used using
+very via was wasn way we well were weren what when where whether which while who whom whose why will with
+within without won would wouldn yet you your yours yourself yourselves
+""".split())
+
+
+def term_counts(texts, ngrams=KEYWORD_NGRAMS):
+    """{term: count} of the words and n-grams (up to ``ngrams`` words) in each of ``texts``.
+
+    Words are lowercased with punctuation removed; words under three letters,
+    numbers and stop words are dropped. An n-gram may contain stop words but
+    not start or end with one, and never spans two texts (text nodes), so
+    separate menu items do not run into each other.
+    """
+    counts = {}
+    for text in texts:
+        words = PUNCTUATION.sub('', text.lower()).split()
+        keep = [len(word) > 2 and word not in ENGLISH_STOP_WORDS and not word.isdigit() for word in words]
+        for i, word in enumerate(words):
+            if not keep[i]:
+                continue
+            counts[word] = counts.get(word, 0) + 1
+            for end in range(i + 1, min(i + ngrams, len(words))):
+                if keep[end]:
+                    gram = " ".join(words[i:end + 1])
+                    counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def _bucket(term, mask):
+    # crc32 rather than hash(): it is the same in every worker process
+    return zlib.crc32(term.encode()) & mask
+
+
+def _join(strings):
+    """Strings packed as (UTF-8 bytes, end offsets), so one can be read back without decoding the rest."""
+    encoded = [string.encode() for string in strings]
+    ends = np.fromiter((len(string) for string in encoded), dtype=np.int64, count=len(encoded))
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), np.cumsum(ends)
+
+
+def _string(data, ends, i):
+    return data[ends[i - 1] if i else 0:ends[i]].tobytes().decode()
+
+
+class CorpusKeywords:
+    """Site-wide TF-IDF keywords for every page of a crawl.
+
+    Pages are added one at a time as {term: count} and kept as sparse rows:
+    hashed term ids, counts and the term each id stands for. Every
+    ``chunk_size`` pages the rows are packed into a CSR chunk and written to
+    a temporary .npz file, so memory holds one chunk plus the document
+    frequency array whatever the size of the site. ``finalize`` then reads
+    the chunks back one at a time and scores them with vectorized NumPy:
+    tf * smoothed idf, with terms found on more than ``max_df`` of the pages
+    (menus, footers) dropped as boilerplate. Both passes are linear in the
+    number of (page, term) pairs.
+
+    Hashing can merge two terms into one bucket; the term reported for a
+    bucket is the first one seen on that page.
+    """
+
+    def __init__(self, ngrams=KEYWORD_NGRAMS, n_features=KEYWORD_FEATURES, chunk_size=KEYWORD_CHUNK_SIZE,
+                 top_k=TOP_KEYWORDS, max_df=BOILERPLATE_MAX_DF, min_pages=BOILERPLATE_MIN_PAGES, spill_dir=None):
+        self.ngrams = ngrams
+        self.n_features = n_features
+        self.chunk_size = chunk_size
+        self.top_k = top_k
+        self.max_df = max_df
+        self.min_pages = min_pages
+        self.spill_dir = spill_dir
+        self.pages = 0
+        self.df = np.zeros(n_features, dtype=np.int32)
+        self._mask = n_features - 1
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._chunks = []
+        self._tmpdir = None
+
+    def add(self, url, counts):
+        """Add one page's term counts (see ``term_counts``)."""
+        terms = list(counts)
+        buckets = [_bucket(term, self._mask) for term in terms]
+        if len(set(buckets)) < len(buckets):
+            # Colliding terms share a bucket: sum their counts under the first one
+            merged = {}
+            for term, bucket in zip(terms, buckets):
+                merged.setdefault(bucket, [term, 0])[1] += counts[term]
+            buckets = list(merged)
+            terms = [term for term, _ in merged.values()]
+            counts = {term: count for term, count in merged.values()}
+        ids = np.array(buckets, dtype=np.int32)
+        values = np.fromiter((counts[term] for term in terms), dtype=np.int32, count=len(terms))
+        with self._lock:
+            self.df[ids] += 1
+            self.pages += 1
+            self._buffer.append((url, ids, values, terms))
+            if len(self._buffer) >= self.chunk_size:
+                self._spill()
+
+    def _pack(self, rows):
+        lengths = np.fromiter((len(ids) for _, ids, _, _ in rows), dtype=np.int64, count=len(rows))
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        empty = np.zeros(0, dtype=np.int32)
+        urls, url_ends = _join([url for url, _, _, _ in rows])
+        terms, term_ends = _join([term for _, _, _, terms in rows for term in terms])
+        return {
+            "urls": urls,
+            "url_ends": url_ends,
+            "indptr": indptr,
+            "indices": np.concatenate([ids for _, ids, _, _ in rows] or [empty]),
+            "counts": np.concatenate([counts for _, _, counts, _ in rows] or [empty]),
+            "terms": terms,
+            "term_ends": term_ends,
+        }
+
+    def _spill(self):
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.mkdtemp(prefix="seo-keywords-", dir=self.spill_dir)
+        path = os.path.join(self._tmpdir, f"chunk-{len(self._chunks):05d}.npz")
+        np.savez(path, **self._pack(self._buffer))
+        self._chunks.append(path)
+        self._buffer = []
+
+    def _iter_chunks(self):
+        for path in self._chunks:
+            with np.load(path) as chunk:
+                yield {name: chunk[name] for name in chunk.files}
+        if self._buffer:
+            yield self._pack(self._buffer)
+
+    def idf(self):
+        # Smoothed, as scikit-learn computes it
+        return np.log((1 + self.pages) / (1 + self.df)) + 1
+
+    def boilerplate(self):
+        """Boolean mask of the buckets treated as site chrome."""
+        if self.pages < self.min_pages:
+            return np.zeros(self.n_features, dtype=bool)
+        return self.df > self.max_df * self.pages
+
+    def _score_chunk(self, chunk, idf, boilerplate):
+        indptr, indices, counts = chunk["indptr"], chunk["indices"], chunk["counts"]
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        totals = np.bincount(rows, weights=counts, minlength=len(indptr) - 1)
+        tf = counts / totals[rows]
+        weights = np.where(boilerplate[indices], 0.0, tf * idf[indices])
+        # Row by row, heaviest first; then keep each row's first top_k non-zero weights
+        order = np.lexsort((-weights, rows))
+        rank = np.arange(len(order)) - indptr[rows]
+        keep = order[(rank < self.top_k) & (weights[order] > 0)]
+        return rows, tf, weights, keep
+
+    def finalize(self, on_page=None, limit=SITE_TERMS):
+        """Score every page; ``on_page(url, keywords)`` gets each page's top keywords.
+
+        Returns the site-level view: the heaviest terms summed over all
+        pages and the terms dropped as boilerplate.
+        """
+        with self._lock:
+            idf = self.idf()
+            boilerplate = self.boilerplate()
+            site_weights = np.zeros(self.n_features)
+            for chunk in self._iter_chunks():
+                rows, tf, weights, keep = self._score_chunk(chunk, idf, boilerplate)
+                site_weights += np.bincount(chunk["indices"], weights=weights, minlength=self.n_features)
+                if on_page is None:
+                    continue
+                keywords = [[] for _ in range(len(chunk["url_ends"]))]
+                for position, row, count, page_tf, weight in zip(keep.tolist(), rows[keep].tolist(),
+                                                                 chunk["counts"][keep].tolist(),
+                                                                 tf[keep].tolist(), weights[keep].tolist()):
+                    keywords[row].append({
+                        "term": _string(chunk["terms"], chunk["term_ends"], position),
+                        "count": count,
+                        "tf": round(page_tf, 5),
+                        "tf_idf": round(weight, 5),
+                    })
+                for row, page_keywords in enumerate(keywords):
+                    on_page(_string(chunk["urls"], chunk["url_ends"], row), page_keywords)
+
+            top_site = np.argsort(-site_weights)[:limit]
+            top_site = top_site[site_weights[top_site] > 0]
+            top_boilerplate = np.flatnonzero(boilerplate)
+            top_boilerplate = top_boilerplate[np.argsort(-self.df[top_boilerplate], kind="stable")][:limit]
+            names = self._names(np.concatenate([top_site, top_boilerplate]))
+            return {
+                "pages": self.pages,
+                "site_terms": [
+                    {"term": names[bucket], "pages": int(self.df[bucket]),
+                     "tf_idf": round(float(site_weights[bucket]), 4)}
+                    for bucket in top_site.tolist()
+                ],
+                "boilerplate_terms": [
+                    {"term": names[bucket], "pages": int(self.df[bucket])} for bucket in top_boilerplate.tolist()
+                ],
+            }
+
+    def _names(self, buckets):
+        # The term each bucket stands for, from the first page that has it
+        wanted = np.unique(buckets)
+        names = {}
+        for chunk in self._iter_chunks():
+            if len(names) == len(wanted):
+                break
+            hits = np.flatnonzero(np.isin(chunk["indices"], wanted))
+            if not len(hits):
+                continue
+            buckets, first = np.unique(chunk["indices"][hits], return_index=True)
+            for bucket, position in zip(buckets.tolist(), hits[first].tolist()):
+                names.setdefault(bucket, _string(chunk["terms"], chunk["term_ends"], position))
+        return names
+
+    def close(self):
+        with self._lock:
+            if self._tmpdir is not None:
+                shutil.rmtree(self._tmpdir, ignore_errors=True)
+                self._tmpdir = None
+            self._chunks = []
+            self._buffer = []
@@ -0,0 +1,97 @@
+from datetime import datetime
+from itertools import islice
+from uuid import uuid4
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from controller.audit.keyword_index import index_pages
+from models.audit import Audit
+from models.page import Page
+
+PAGE_BATCH_SIZE = 1000
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _page_row(project_id, url, payload, audit_time):
+    cache = payload.get("cache", {})
+    return {
+        "id": uuid4(),
+        "project_id": project_id,
+        "url": url,
+        "title": payload["data"].get("title"),
+        "status": "active",
+        "last_audited": audit_time,
+        "etag": cache.get("etag"),
+        "last_modified": cache.get("last_modified"),
+        "content_hash": payload["data"].get("content_hash"),
+        "simhash": payload["data"].get("simhash"),
+        "word_count": payload["data"].get("word_count"),
+        "links": cache.get("links"),
+        "created_at": audit_time,
+    }
+
+
+def persist_audit_run(db: Session, project_id, result: dict, audit_type: str = "full",
+                      batch_size: int = PAGE_BATCH_SIZE) -> int:
+    """Write a whole audit run (pages + one Audit per page) in a single transaction.
+
+    Pages are upserted in batches with ``INSERT ... ON CONFLICT (project_id, url)
+    DO UPDATE ... RETURNING id``; the audits for each batch then go out as one
+    executemany insert, and the batch's re-extracted pages are re-indexed in
+    page_terms. Returns the number of pages written.
+    """
+    audit_time = datetime.utcnow()
+    recommendations = result["summary"]["top_issues"]
+    written = 0
+
+    # Built once and executed with a list of rows per batch, so the statement
+    # is compiled a single time and sent as multi-row VALUES by the driver.
+    upsert = pg_insert(Page)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[Page.project_id, Page.url],
+        set_={
+            "title": upsert.excluded.title,
+            "last_audited": upsert.excluded.last_audited,
+            "etag": upsert.excluded.etag,
+            "last_modified": upsert.excluded.last_modified,
+            "content_hash": upsert.excluded.content_hash,
+            "simhash": upsert.excluded.simhash,
+            "word_count": upsert.excluded.word_count,
+            "links": upsert.excluded.links,
+        },
+    ).returning(Page.url, Page.id)
+
+    try:
+        # Pages whose audit failed have no data to store
+        scored = ((url, payload) for url, payload in result["detailed_results"].items() if "error" not in payload)
+        for batch in _batched(scored, batch_size):
+            page_rows = [_page_row(project_id, url, payload, audit_time) for url, payload in batch]
+            page_ids = dict(db.execute(upsert, page_rows).all())
+            index_pages(db, project_id,
+                        ((page_ids[url], payload["data"], payload.get("keywords")) for url, payload in batch))
+
+            db.execute(insert(Audit), [
+                {
+                    "id": uuid4(),
+                    "page_id": page_ids[url],
+                    "audit_type": audit_type,
+                    "score": payload["scorecard"].get("total_score"),
+                    "issues": payload["scorecard"],
+                    "recommendations": recommendations,
+                    "created_at": audit_time,
+                }
+                for url, payload in batch
+            ])
+            written += len(batch)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return written
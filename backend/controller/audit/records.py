@@ -0,0 +1,115 @@
+from typing import Optional, Union
+
+import msgspec
+
+
+class Record(msgspec.Struct):
+    """Fixed-layout replacement for the per-page dicts an audit produces.
+
+    Struct instances store their fields in slots, so a link or image costs a
+    fraction of the memory of the equivalent dict, and msgspec encodes them
+    straight to JSON with the same keys, in the same order, as those dicts
+    had. Item access is kept so the scoring and summary code can keep
+    reading them as mappings.
+    """
+
+    def __getitem__(self, key):
+        if key not in self.__struct_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__struct_fields__
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__struct_fields__ else default
+
+    def keys(self):
+        return self.__struct_fields__
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.__struct_fields__]
+
+
+# Links and images only ever hold scalars, so they can skip the cycle collector
+class LinkRecord(Record, gc=False):
+    href: str
+    text: str
+    text_length: int
+    title: str
+    nofollow: bool
+    has_text: bool
+
+
+class ImageRecord(Record, gc=False):
+    src: Optional[str]
+    alt: str
+    alt_length: int
+    title: str
+    width: Optional[str]
+    height: Optional[str]
+    lazy_loaded: bool
+
+
+class ScoreCategory(Record):
+    score: Union[int, float] = 0
+    max_score: int = 0
+    details: dict = {}
+
+
+class PageRecord(Record):
+    page_url: str
+    content_hash: str
+    page_size_bytes: int
+    title: Optional[str]
+    title_length: int
+    meta_description: Optional[str]
+    meta_description_length: int
+    meta_robots: Optional[str]
+    meta_keywords: Optional[str]
+    meta_viewport: Optional[str]
+    meta_charset: Optional[str]
+    meta_og_tags: dict
+    meta_twitter_tags: dict
+    canonical_url: Optional[str]
+    canonical_matches_url: bool
+    headings: dict
+    paragraphs: list
+    word_count: int
+    simhash: str
+    text_html_ratio: float
+    keywords_density: dict
+    strong_tags: list
+    em_tags: list
+    b_tags: list
+    i_tags: list
+    images: list
+    images_with_alt: int
+    images_without_alt: int
+    total_images: int
+    internal_links: list
+    external_links: list
+    total_links: int
+    structured_data: list
+    has_structured_data: bool
+    videos: list
+    audios: list
+    script_sources: list
+    style_links: list
+    inline_styles: int
+    inline_scripts: int
+    favicon: Optional[str]
+    language: Optional[str]
+    has_viewport_meta: bool
+    has_mobile_friendly_design: bool
+    resource_hints: dict
+    has_https: bool
+    hreflang_tags: list
+    has_doctype: bool
+    # Template blocks (see TemplateCache) the page shares with the rest of the site, and the words outside them
+    template_blocks: int = 0
+    content_word_count: int = 0
+
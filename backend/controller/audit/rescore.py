@@ -0,0 +1,151 @@
+"""Re-score an archived audit run without fetching anything.
+
+    python -m controller.audit.rescore RUN_ID [--archive PATH] [--workers N]
+        [--weights JSON] [--thresholds JSON] [--output FILE]
+
+Pages are read back from the ExtractionArchive in chunks, scored in a
+process pool with the current rules (plus any weight/threshold overrides)
+and folded into a fresh summary in crawl order.
+"""
+import argparse
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import msgspec
+
+from controller.audit.archive import AUDIT_ARCHIVE_PATH, ExtractionArchive
+from serialization import encode_json
+from controller.audit.scoring import ScoringEngine
+from controller.audit.summary import SummaryAggregator
+
+# 0 uses every core
+RESCORE_WORKERS = int(os.getenv("RESCORE_WORKERS", "0"))
+RESCORE_CHUNK_SIZE = 500
+
+_worker_archive = None
+_worker_scoring = None
+
+
+def _init_rescore_worker(archive_path, weights, thresholds):
+    global _worker_archive, _worker_scoring
+    _worker_archive = ExtractionArchive(archive_path)
+    _worker_scoring = ScoringEngine(weights=weights, thresholds=thresholds)
+
+
+def _close_rescore_worker():
+    global _worker_archive
+    if _worker_archive is not None:
+        _worker_archive.close()
+        _worker_archive = None
+
+
+def _init_rescore_process(archive_path, weights, thresholds):
+    _init_rescore_worker(archive_path, weights, thresholds)
+    # Pool workers leave through os._exit, which skips atexit; finalizers with a priority still run
+    multiprocessing.util.Finalize(None, _close_rescore_worker, exitpriority=10)
+
+
+def rescore_chunk(rows):
+    """Score one chunk of (url, content_hash) rows; None for pages not in the archive."""
+    records = _worker_archive.get_many(content_hash for _, content_hash in rows)
+    pages = [
+        msgspec.structs.replace(records[content_hash], page_url=url) if content_hash in records else None
+        for url, content_hash in rows
+    ]
+    scorecards = _worker_scoring.scorecards(pages)
+    return [
+        (url, {
+            "page_url": url,
+            "title": data.title,
+            "content_hash": data.content_hash,
+            "simhash": data.simhash,
+            "word_count": data.word_count,
+        }, scorecard) if data is not None else (url, None, None)
+        for (url, _), data, scorecard in zip(rows, pages, scorecards)
+    ]
+
+
+def rescore_run(run_id, archive_path=AUDIT_ARCHIVE_PATH, weights=None, thresholds=None, workers=RESCORE_WORKERS,
+                chunk_size=RESCORE_CHUNK_SIZE, progress_callback=None):
+    """Rebuild an audit report (summary and per-page scorecards) from an archived run."""
+    archive = ExtractionArchive(archive_path)
+    try:
+        run = archive.run(run_id)
+        if run is None:
+            raise KeyError(f"Archived run {run_id} not found")
+        # Fail on unknown weights/thresholds before starting any workers
+        ScoringEngine(weights=weights, thresholds=thresholds)
+
+        start = time.perf_counter()
+        workers = workers or os.cpu_count() or 1
+        summary = SummaryAggregator(run["base_url"], run["depth"])
+        detailed_results = {}
+        missing = 0
+        initargs = (archive_path, weights, thresholds)
+        chunks = archive.run_pages(run_id, chunk_size)
+
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_rescore_process, initargs=initargs)
+            scored_chunks = pool.map(rescore_chunk, chunks)
+        else:
+            pool = None
+            _init_rescore_worker(*initargs)
+            scored_chunks = map(rescore_chunk, chunks)
+
+        try:
+            for scored in scored_chunks:
+                for url, data, scorecard in scored:
+                    if data is None:
+                        missing += 1
+                        continue
+                    result = {"data": data, "scorecard": scorecard}
+                    detailed_results[url] = result
+                    summary.add(url, result)
+                if progress_callback:
+                    progress_callback(len(detailed_results))
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            else:
+                _close_rescore_worker()
+    finally:
+        archive.close()
+
+    return {
+        "summary": summary.snapshot(final=True),
+        "detailed_results": detailed_results,
+        "rescore": {
+            "run_id": run_id,
+            "pages": len(detailed_results),
+            "missing": missing,
+            "workers": workers,
+            "seconds": round(time.perf_counter() - start, 2),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("run_id")
+    parser.add_argument("--archive", default=AUDIT_ARCHIVE_PATH)
+    parser.add_argument("--workers", type=int, default=RESCORE_WORKERS)
+    parser.add_argument("--weights", type=json.loads, help='e.g. \'{"content.keyword_optimization": 20}\'')
+    parser.add_argument("--thresholds", type=json.loads, help='e.g. \'{"metadata.title": {"optimal": [25, 65]}}\'')
+    parser.add_argument("--output", help="write the full report here as JSON")
+    args = parser.parse_args()
+
+    result = rescore_run(args.run_id, archive_path=args.archive, weights=args.weights,
+                         thresholds=args.thresholds, workers=args.workers)
+    if args.output:
+        with open(args.output, "wb") as f:
+            f.write(encode_json(result))
+    print(encode_json({"overall_score": result["summary"]["overall_score"], **result["rescore"]}, indent=2).decode())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import contextlib
+import os
+import sqlite3
+import tempfile
+import threading
+import zlib
+from collections.abc import Mapping
+from serialization import decode_json, encode_json
+
+
+class DiskResultStore(Mapping):
+    """Mapping that keeps per-page audit results on disk.
+
+    Used in place of the in-memory ``all_results`` dict for low-memory crawls.
+    Each result is JSON-encoded (records included), zlib-compressed and written to SQLite as soon
+    as the page is scored, so results take no memory however many pages are
+    crawled. Reads stream rows back one at a time in crawl order; as a
+    Mapping it can be passed, and JSON-encoded, wherever a dict of results is.
+
+    Without a ``path`` the results go to a temporary file, which ``close``
+    (or leaving a ``with`` block) deletes along with its WAL files.
+    """
+
+    def __init__(self, path=None, commit_every=100):
+        self.temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="seo-audit-", suffix=".sqlite3")
+            os.close(fd)
+        self.path = path
+        self.commit_every = commit_every
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (seq INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE NOT NULL, payload BLOB NOT NULL)"
+        )
+        self._count = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @staticmethod
+    def _encode(result):
+        return zlib.compress(encode_json(result))
+
+    @staticmethod
+    def _decode(payload):
+        return decode_json(zlib.decompress(payload))
+
+    def __setitem__(self, url, result):
+        payload = self._encode(result)
+        with self._lock:
+            updated = self._conn.execute("UPDATE results SET payload = ? WHERE url = ?", (payload, url)).rowcount
+            if not updated:
+                self._conn.execute("INSERT INTO results (url, payload) VALUES (?, ?)", (url, payload))
+                self._count += 1
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._conn.commit()
+                self._pending = 0
+
+    def __getitem__(self, url):
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM results WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            raise KeyError(url)
+        return self._decode(row[0])
+
+    def get(self, url, default=None):
+        try:
+            return self[url]
+        except KeyError:
+            return default
+
+    def __contains__(self, url):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM results WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def _rows(self, columns):
+        # Page through by rowid so readers never hold the whole table
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT seq, {columns} FROM results WHERE seq > ? ORDER BY seq LIMIT 500", (last_seq,)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row[1:]
+            last_seq = rows[-1][0]
+
+    def __iter__(self):
+        for (url,) in self._rows("url"):
+            yield url
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        for url, payload in self._rows("url, payload"):
+            yield url, self._decode(payload)
+
+    def values(self):
+        for (payload,) in self._rows("payload"):
+            yield self._decode(payload)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def flush(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+        if self.temporary:
+            for suffix in ("", "-wal", "-shm"):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self.path + suffix)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
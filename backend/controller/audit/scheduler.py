@@ -0,0 +1,252 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+DEFAULT_RATE = 10.0
+MIN_RATE = 0.2
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 60.0
+LATENCY_ALPHA = 0.2
+# Concurrency is cut back once the smoothed latency is this many times the best seen
+LATENCY_TOLERANCE = 2.0
+# Below this a host is fast enough that latency changes are just noise
+LATENCY_FLOOR = 0.05
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt, retry_after=None, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    # Full jitter: a random delay up to base * 2^attempt, never less than Retry-After
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+class HostState:
+    def __init__(self, rate, burst, max_concurrency):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.refilled_at = time.monotonic()
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self.in_flight = 0
+        self.since_change = 0
+        self.consecutive_throttles = 0
+        self.latency = None
+        self.best_latency = None
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.errors = 0
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+
+class PolitenessScheduler:
+    """Per-host admission control shared by every request an HTTPPool makes.
+
+    Each host gets a token bucket (requests per second), an adaptive cap on
+    concurrent requests and a blocked-until time:
+
+    - 429/503 responses halve the host's rate and concurrency and block it
+      for the Retry-After time (or an exponential backoff with jitter);
+    - successful responses slowly restore the rate; every ``limit``
+      responses concurrency grows by one while latency stays near the best
+      observed, and shrinks by a quarter when it climbs.
+
+    ``acquire`` waits by sleeping (``aacquire`` with ``asyncio.sleep``), so an
+    async crawl never holds a thread while a host is cooling down.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=None, max_concurrency=6):
+        self.default_rate = rate
+        self.default_burst = burst or max(1, max_concurrency)
+        self.default_concurrency = max(1, max_concurrency)
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _host(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.default_rate, self.default_burst, self.default_concurrency)
+        return state
+
+    def set_rate(self, host, rate, burst=1):
+        # e.g. from a robots.txt Crawl-delay; becomes the ceiling adaptation recovers to
+        with self._lock:
+            state = self._host(host)
+            state.max_rate = state.rate = rate
+            state.burst = burst
+            state.tokens = min(state.tokens, burst)
+
+    def _try_acquire(self, host):
+        """Take a slot and a token for ``host``, or return how long to wait first."""
+        with self._lock:
+            state = self._host(host)
+            now = time.monotonic()
+            if now < state.blocked_until:
+                return state.blocked_until - now
+            if state.in_flight >= state.limit:
+                # Roughly when the next in-flight request should finish
+                return max(0.005, (state.latency or 0.05) / state.limit)
+            state.refill(now)
+            if state.tokens < 1:
+                return (1 - state.tokens) / state.rate
+            state.tokens -= 1
+            state.in_flight += 1
+            return 0
+
+    def acquire(self, host):
+        while (wait := self._try_acquire(host)) > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, host):
+        while (wait := self._try_acquire(host)) > 0:
+            await asyncio.sleep(wait)
+
+    def cancel(self, host):
+        # Gives back a slot that was acquired but never used for a request
+        with self._lock:
+            state = self._host(host)
+            state.in_flight = max(state.in_flight - 1, 0)
+
+    def release(self, host, latency, status_code=None, retry_after=None):
+        with self._lock:
+            state = self._host(host)
+            state.in_flight = max(state.in_flight - 1, 0)
+
+            if status_code in THROTTLE_STATUSES:
+                state.throttled += 1
+                state.consecutive_throttles += 1
+                state.rate = max(MIN_RATE, min(state.rate, state.max_rate) / 2)
+                state.limit = max(1, state.limit // 2)
+                state.tokens = min(state.tokens, 0)
+                delay = backoff_delay(state.consecutive_throttles - 1, parse_retry_after(retry_after))
+                state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+                return
+            if status_code is None:
+                state.errors += 1
+                state.limit = max(1, state.limit - 1)
+                return
+
+            state.latency = latency if state.latency is None else (
+                LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * state.latency
+            )
+            state.best_latency = latency if state.best_latency is None else min(state.best_latency, latency)
+            state.rate = min(state.max_rate, state.rate * 1.05)
+            state.consecutive_throttles = 0
+
+            # Judge latency once per `limit` responses so each change can take effect first
+            state.since_change += 1
+            if state.since_change < state.limit:
+                return
+            state.since_change = 0
+            if state.latency > max(state.best_latency * LATENCY_TOLERANCE, LATENCY_FLOOR):
+                state.limit = max(1, int(state.limit * 0.75))
+            elif state.limit < state.max_concurrency:
+                state.limit += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                host: {
+                    "rate": round(state.rate, 2),
+                    "concurrency": state.limit,
+                    "avg_latency_ms": round(state.latency * 1000, 1) if state.latency is not None else None,
+                    "throttled": state.throttled,
+                    "errors": state.errors,
+                }
+                for host, state in self._hosts.items()
+            }
+
+
+class FairShareBudget:
+    """Global cap on in-flight requests, shared fairly between crawls.
+
+    Used when several audits run at once over one HTTPPool: each registered
+    tenant (an audit's domain) may hold at most ``ceil(total / active)``
+    slots, and a free slot goes to the waiting tenant holding the fewest.
+    When a tenant finishes, its share is spread over the ones still running.
+    Requests for unregistered tenants (robots.txt, sitemaps on other hosts)
+    only count against the global cap.
+    """
+
+    def __init__(self, total):
+        self.total = max(1, total)
+        self.in_use = 0
+        self._active = set()
+        self._held = {}
+        self._waiting = {}
+        self._condition = None
+
+    def register(self, tenant):
+        self._active.add(tenant)
+
+    def share(self):
+        return -(-self.total // max(1, len(self._active)))
+
+    def _can_take(self, tenant):
+        if self.in_use >= self.total:
+            return False
+        held = self._held.get(tenant, 0)
+        if tenant in self._active and held >= self.share():
+            return False
+        # Let the most starved waiting tenant go first
+        return all(self._held.get(other, 0) >= held for other, count in self._waiting.items() if count)
+
+    async def acquire(self, tenant):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            self._waiting[tenant] = self._waiting.get(tenant, 0) + 1
+            try:
+                await self._condition.wait_for(lambda: self._can_take(tenant))
+            finally:
+                self._waiting[tenant] -= 1
+            self.in_use += 1
+            self._held[tenant] = self._held.get(tenant, 0) + 1
+            # Another tenant may be first in line now
+            self._condition.notify_all()
+
+    async def release(self, tenant):
+        # Counted back before waiting on the lock, so a cancelled release never leaks a slot
+        self.in_use -= 1
+        self._held[tenant] -= 1
+        async with self._condition:
+            self._condition.notify_all()
+
+    async def finish(self, tenant):
+        self._active.discard(tenant)
+        if self._condition is not None:
+            async with self._condition:
+                self._condition.notify_all()
+
+    def snapshot(self):
+        return {
+            "total": self.total,
+            "in_use": self.in_use,
+            "share": self.share(),
+            "active": sorted(self._active),
+        }
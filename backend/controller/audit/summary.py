@@ -0,0 +1,164 @@
+import heapq
+import threading
+from datetime import datetime
+from controller.audit.duplicates import DuplicateIndex
+
+TOP_ISSUES = 10
+
+
+class SummaryAggregator:
+    """Online version of the audit summary.
+
+    Every scored page is folded into running sums as soon as it finishes:
+    per-category score sums and counts, and a counter per distinct
+    recommendation. ``snapshot()`` only touches those counters (a few dozen
+    categories and recommendations) and the duplicate index's running
+    totals, so the summary can be read at any point during a crawl without
+    rescanning the page results. The per-page scores and the duplicate
+    clusters are only listed in the final summary.
+
+    With ``keep_pages=False`` (low-memory crawls) neither the per-page
+    scores nor the duplicate index's URLs are held; ``snapshot`` rebuilds
+    them from the stored results the final summary is given instead.
+    """
+
+    def __init__(self, base_url, depth, keep_pages=True):
+        self.base_url = base_url
+        self.depth = depth
+        self._lock = threading.Lock()
+        self.pages_audited = 0
+        self.pages_unchanged = 0
+        self.pages_failed = 0
+        self.total_score = 0
+        self.keep_pages = keep_pages
+        self.pages = {}
+        self.category_counter = {}
+        self.recommendation_counter = {}
+        self.duplicates = DuplicateIndex(keep_urls=keep_pages)
+
+    def add(self, url, result):
+        page_scorecard = result.get("scorecard", {})
+        page_score = page_scorecard.get("total_score", 0)
+        data = result.get("data", {})
+        self.duplicates.add(url, int(data["simhash"], 16) if data.get("simhash") else 0, data.get("word_count"))
+        with self._lock:
+            self.pages_audited += 1
+            if result.get("cache", {}).get("unchanged"):
+                self.pages_unchanged += 1
+            if self.keep_pages:
+                self.pages[url] = self._page_entry(result)
+            self.total_score += page_score
+
+            for section_name, section in page_scorecard.items():
+                if section_name == "total_score":
+                    continue
+
+                for category_name, category in section.items():
+                    key = f"{section_name}.{category_name}"
+                    if key not in self.category_counter:
+                        self.category_counter[key] = {
+                            "total_score": 0,
+                            "count": 0,
+                            "max_score": category.get("max_score", 0),
+                            "section": section_name,
+                            "category": category_name
+                        }
+                    self.category_counter[key]["total_score"] += category.get("score", 0)
+                    self.category_counter[key]["count"] += 1
+
+                    for rec in category.get("details", {}).get("recommendations", []):
+                        if rec not in self.recommendation_counter:
+                            score = category.get("score", 0)
+                            max_score = category.get("max_score", 0)
+                            self.recommendation_counter[rec] = {
+                                "count": 0,
+                                "category": key,
+                                "importance": (max_score - score) / max_score if max_score > 0 else 0
+                            }
+                        self.recommendation_counter[rec]["count"] += 1
+
+    @staticmethod
+    def _page_entry(result):
+        return {
+            "score": result.get("scorecard", {}).get("total_score", 0),
+            "title": result.get("data", {}).get("title", "Unknown Page")
+        }
+
+    @staticmethod
+    def _scored(results):
+        return ((url, result) for url, result in results.items() if "error" not in result)
+
+    @staticmethod
+    def _simhashes(results):
+        for url, result in results:
+            simhash = result.get("data", {}).get("simhash")
+            yield url, int(simhash, 16) if simhash else 0
+
+    def add_failure(self, url):
+        with self._lock:
+            self.pages_failed += 1
+
+    def snapshot(self, results=None, final=False):
+        """The summary so far; ``results`` is the crawl's result store when pages are not kept."""
+        summary = {
+            "audit_info": {
+                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "base_url": self.base_url,
+                "pages_audited": self.pages_audited,
+                "pages_unchanged": self.pages_unchanged,
+                "pages_failed": self.pages_failed,
+                "max_depth": self.depth
+            },
+            "overall_score": {
+                "score": 0,
+                "max_score": 100
+            },
+            "category_scores": {},
+            "top_issues": [],
+            "pages": {}
+        }
+
+        if not final:
+            summary.pop("pages")
+            summary.update(self.duplicates.stats())
+        elif self.keep_pages or results is None:
+            summary.update(self.duplicates.report())
+        else:
+            # Without kept pages the store is read instead, one (url, result) pair at a time
+            summary.update(self.duplicates.report(pages=self._simhashes(self._scored(results))))
+            summary["pages"] = {url: self._page_entry(result) for url, result in self._scored(results)}
+
+        with self._lock:
+            if not self.pages_audited:
+                return summary
+
+            if final and self.keep_pages:
+                summary["pages"] = dict(self.pages)
+            summary["overall_score"]["score"] = round(self.total_score / self.pages_audited)
+
+            for data in self.category_counter.values():
+                if data["count"] > 0:
+                    avg_score = data["total_score"] / data["count"]
+                    percentage = round((avg_score / data["max_score"]) * 100) if data["max_score"] > 0 else 0
+                    summary["category_scores"].setdefault(data["section"], {})[data["category"]] = {
+                        "score": percentage,
+                        "avg_points": round(avg_score, 1),
+                        "max_points": data["max_score"]
+                    }
+
+            top_recommendations = heapq.nlargest(
+                TOP_ISSUES,
+                self.recommendation_counter.items(),
+                key=lambda x: (x[1]["importance"], x[1]["count"])
+            )
+            summary["top_issues"] = [
+                {
+                    "issue": rec,
+                    "count": data["count"],
+                    "category": data["category"],
+                    "importance": round(data["importance"] * 10)
+                }
+                for rec, data in top_recommendations
+            ]
+
+        return summary
@@ -0,0 +1,141 @@
+import math
+import os
+import re
+import threading
+
+TEMPLATE_LEARN_PAGES = int(os.getenv("TEMPLATE_LEARN_PAGES", "10"))
+# A block is template when it is on at least this share of the pages learned from
+TEMPLATE_MIN_SHARE = 0.5
+# Smaller blocks cost more to look for than they save
+MIN_TEMPLATE_BYTES = 256
+MAX_TEMPLATE_BLOCKS = 64
+BLOCK_TAGS = ("header", "nav", "footer", "aside", "div", "section", "ul", "ol", "form", "table")
+# Tags whose text the extractor reads with get_text; a block inside one of them is never cut out
+TEXT_TAGS = ("a", "p", "h1", "h2", "h3", "h4", "h5", "h6", "title", "strong", "em", "b", "i")
+# Script, style and comment bodies are skipped whole, so markup inside them is never taken for tags
+SCANNED = re.compile(
+    r"<!--.*?-->|<(script|style|textarea|template)\b.*?</\1\s*>|<(/?)(" + "|".join(BLOCK_TAGS + TEXT_TAGS)
+    + r")\b[^>]*>",
+    re.S | re.I,
+)
+BODY = re.compile(r"<body\b", re.I)
+# Content a block has to be parsed in context for
+CONTEXT_SENSITIVE = re.compile(r"<(?:script|style|textarea|template|!--)", re.I)
+MARKER_PREFIX = "seo-template:"
+
+
+def candidate_blocks(html):
+    """Distinct raw HTML of every balanced block-level element in the body, at any depth.
+
+    Returns the blocks outside any text tag, and those inside one.
+    """
+    body = BODY.search(html)
+    if body is None:
+        return set(), set()
+    blocks = set()
+    nested = set()
+    stack = []
+    for match in SCANNED.finditer(html, body.end()):
+        name = match.group(3)
+        if name is None:
+            continue
+        name = name.lower()
+        if not match.group(2):
+            stack.append((name, match.start()))
+            continue
+        # Close the nearest matching open tag; unclosed ones inside it are dropped
+        for depth in range(len(stack) - 1, -1, -1):
+            if stack[depth][0] == name:
+                start = stack[depth][1]
+                del stack[depth:]
+                if name in TEXT_TAGS:
+                    break
+                block = html[start:match.end()]
+                if len(block) >= MIN_TEMPLATE_BYTES and not CONTEXT_SENSITIVE.search(block):
+                    # Unclosed text tags are conservatively taken to still be open
+                    if any(open_name in TEXT_TAGS for open_name, _ in stack):
+                        nested.add(block)
+                    else:
+                        blocks.add(block)
+                break
+    return blocks, nested
+
+
+def marker(block_id):
+    return f"<!--{MARKER_PREFIX}{block_id}-->"
+
+
+class TemplateCache:
+    """Learns a site's page chrome from the first pages of a crawl.
+
+    Every block-level element of the first ``learn_pages`` pages is
+    fingerprinted by its exact HTML, nested ones included. Blocks found on
+    at least ``min_share`` of those pages (header, navigation, footer,
+    sidebars, ...) become templates. From then on ``apply`` cuts each
+    template out of a page's HTML before it is parsed and leaves a marker
+    comment in its place, so PageExtractor only parses the page's own
+    content and splices in the block's extraction, made once, where the
+    marker is. Blocks that differ by a single byte on a page (an "active"
+    menu item) are parsed as usual, though the identical blocks inside
+    them still match.
+
+    A block seen inside a link, paragraph, heading or inline text tag
+    (TEXT_TAGS) on any learned page never becomes a template: that tag's
+    text would lose the block's. Should a template turn up inside one on
+    a later page, PageExtractor parses that page whole.
+    """
+
+    def __init__(self, learn_pages=TEMPLATE_LEARN_PAGES, min_share=TEMPLATE_MIN_SHARE,
+                 max_blocks=MAX_TEMPLATE_BLOCKS):
+        self.learn_pages = learn_pages
+        self.min_share = min_share
+        self.max_blocks = max_blocks
+        self.pages_learned = 0
+        self.blocks = {}
+        self._counts = {}
+        self._nested = set()
+        self._learned = learn_pages <= 0
+        self._lock = threading.Lock()
+
+    @property
+    def learned(self):
+        return self._learned
+
+    def observe(self, html):
+        blocks, nested = candidate_blocks(html)
+        with self._lock:
+            if self._learned:
+                return
+            for block in blocks:
+                self._counts[block] = self._counts.get(block, 0) + 1
+            self._nested.update(nested)
+            self.pages_learned += 1
+            if self.pages_learned >= self.learn_pages:
+                self._learn()
+
+    def _learn(self):
+        needed = max(2, math.ceil(self.min_share * self.pages_learned))
+        templates = [block for block, count in self._counts.items()
+                     if count >= needed and block not in self._nested]
+        # Longest first: an outer block is cut out before the blocks inside it are looked for
+        templates.sort(key=len, reverse=True)
+        self.blocks = dict(enumerate(templates[:self.max_blocks]))
+        self._counts = {}
+        self._nested = set()
+        self._learned = True
+
+    def apply(self, html):
+        """``html`` with every known template replaced by its marker, and the ids of the templates cut out.
+
+        While the templates are still being learned the page is learned
+        from and returned as it is.
+        """
+        if not self._learned:
+            self.observe(html)
+            return html, []
+        found = []
+        for block_id, block in self.blocks.items():
+            if block in html:
+                html = html.replace(block, marker(block_id))
+                found.append(block_id)
+        return html, found
@@ -0,0 +1,142 @@
+import hashlib
+import re
+import string
+import threading
+from array import array
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Tracking and session parameters that never change what a page renders
+DEFAULT_STRIP_PARAMS = frozenset({
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "mc_cid", "mc_eid", "_ga", "_gl",
+    "igshid", "ref_src", "sessionid", "phpsessid", "jsessionid", "sid",
+})
+DEFAULT_STRIP_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+PERCENT_ESCAPE = re.compile(r"%[0-9a-fA-F]{2}")
+UNRESERVED = frozenset(string.ascii_letters + string.digits + "-._~")
+
+
+def _normalise_escape(match):
+    # RFC 3986 6.2.2: decode escaped unreserved characters, upper-case the rest
+    char = chr(int(match.group(0)[1:], 16))
+    return char if char in UNRESERVED else match.group(0).upper()
+
+
+class URLCanonicalizer:
+    """Maps the many spellings of a URL onto one canonical form.
+
+    Lower-cases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the remaining query, normalises percent-escapes, and
+    optionally rewrites http/https to a single scheme. Trailing slashes are
+    kept as the server sent them, since most servers redirect between the two
+    spellings; ``trailing_slash=True``/``False`` adds or strips them instead.
+    """
+
+    def __init__(self, scheme=None, strip_params=None, strip_prefixes=DEFAULT_STRIP_PREFIXES,
+                 keep_params=None, trailing_slash=None, sort_query=True):
+        self.scheme = scheme
+        self.strip_params = DEFAULT_STRIP_PARAMS | {p.lower() for p in (strip_params or ())}
+        self.strip_prefixes = tuple(p.lower() for p in strip_prefixes)
+        # With keep_params set, every other parameter is dropped
+        self.keep_params = {p.lower() for p in keep_params} if keep_params is not None else None
+        self.trailing_slash = trailing_slash
+        self.sort_query = sort_query
+
+    def _keep(self, name):
+        name = name.lower()
+        if self.keep_params is not None:
+            return name in self.keep_params
+        return name not in self.strip_params and not name.startswith(self.strip_prefixes)
+
+    def _path(self, path):
+        if not path:
+            return "/"
+        path = PERCENT_ESCAPE.sub(_normalise_escape, path).replace(" ", "%20")
+        if path != "/" and self.trailing_slash is not None:
+            if self.trailing_slash and not path.endswith("/") and "." not in path.rsplit("/", 1)[-1]:
+                path += "/"
+            elif not self.trailing_slash and path.endswith("/"):
+                path = path.rstrip("/") or "/"
+        return path
+
+    def __call__(self, url):
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").rstrip(".")
+        port = parts.port
+        netloc = host if port is None or port == DEFAULT_PORTS.get(scheme) else f"{host}:{port}"
+        if self.scheme and scheme in DEFAULT_PORTS:
+            scheme = self.scheme
+        if parts.username:
+            netloc = f"{parts.username}@{netloc}"
+
+        params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if self._keep(k)]
+        if self.sort_query:
+            params.sort()
+        return urlunsplit((scheme, netloc, self._path(parts.path), urlencode(params), ""))
+
+
+def fingerprint(url):
+    return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), "little")
+
+
+class FingerprintSet:
+    """Set of URLs stored as 64-bit fingerprints in one flat array.
+
+    Open addressing with linear probing over an ``array('Q')``: 8 bytes per
+    slot and at most half the slots in use, so roughly 16 bytes per URL
+    against well over 100 for a set of strings. Two URLs colliding on a 64-bit
+    hash is negligible at crawl sizes (about 1 in 10^7 for a million URLs).
+    """
+
+    def __init__(self, capacity=1024):
+        size = 1
+        while size < capacity * 2:
+            size <<= 1
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url):
+        # Zero marks an empty slot
+        return fingerprint(url) or 1
+
+    def _probe(self, slots, mask, key):
+        index = key & mask
+        while slots[index] and slots[index] != key:
+            index = (index + 1) & mask
+        return index
+
+    def _grow(self):
+        old = self._slots
+        size = len(old) * 2
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        for key in old:
+            if key:
+                self._slots[self._probe(self._slots, self._mask, key)] = key
+
+    def add(self, url):
+        key = self._key(url)
+        with self._lock:
+            index = self._probe(self._slots, self._mask, key)
+            if self._slots[index]:
+                return False
+            self._slots[index] = key
+            self._count += 1
+            if self._count * 2 > len(self._slots):
+                self._grow()
+            return True
+
+    def __contains__(self, url):
+        key = self._key(url)
+        with self._lock:
+            return self._slots[self._probe(self._slots, self._mask, key)] == key
+
+    def __len__(self):
+        return self._count
+
+    def memory_bytes(self):
+        return self._slots.itemsize * len(self._slots)
@@ -0,0 +1,104 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, raiseload, selectinload
+from models.competitor import Competitor
+from models.keyword import Keyword
+from models.page import Page
+from models.project import Project
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Collections of a project that may be small enough to load in full. Pages are
+# deliberately missing: they are only ever read through list_project_pages.
+PROJECT_COLLECTIONS = {
+    "keywords": Project.keywords,
+    "competitors": Project.competitors,
+}
+
+
+def _page_size(limit):
+    return max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+
+def get_project(db: Session, project_id, include=()):
+    """Load a project with only the collections named in ``include``.
+
+    Each included collection is fetched with its own ``selectinload`` query
+    instead of being joined into the project row.
+    """
+    unknown = set(include) - set(PROJECT_COLLECTIONS)
+    if unknown:
+        raise ValueError(f"Cannot eager load {', '.join(sorted(unknown))}")
+
+    options = [selectinload(PROJECT_COLLECTIONS[name]).raiseload("*") for name in include]
+    options.append(raiseload("*"))
+    return db.scalars(select(Project).where(Project.id == project_id).options(*options)).first()
+
+
+def get_project_overview(db: Session, project_id):
+    """Project row plus page/keyword/competitor counts, without loading any of them."""
+    def count_of(model):
+        return (
+            select(func.count())
+            .select_from(model)
+            .where(model.project_id == Project.id)
+            .scalar_subquery()
+        )
+
+    row = db.execute(
+        select(
+            Project,
+            count_of(Page).label("pages"),
+            count_of(Keyword).label("keywords"),
+            count_of(Competitor).label("competitors"),
+        )
+        .where(Project.id == project_id)
+        .options(raiseload("*"))
+    ).first()
+    if row is None:
+        return None
+    return {
+        "project": row.Project,
+        "counts": {"pages": row.pages, "keywords": row.keywords, "competitors": row.competitors},
+    }
+
+
+def list_project_pages(db: Session, project_id, limit: int = DEFAULT_PAGE_SIZE, after_url: str = None) -> dict:
+    """One page of a project's pages, ordered by URL.
+
+    Uses keyset pagination on (project_id, url), which the unique index on
+    pages already covers, so deep pages cost the same as the first one. Pass
+    the returned ``next_cursor`` as ``after_url`` to get the next page.
+    """
+    limit = _page_size(limit)
+    query = select(Page).where(Page.project_id == project_id)
+    if after_url is not None:
+        query = query.where(Page.url > after_url)
+    pages = db.scalars(query.order_by(Page.url).limit(limit + 1).options(raiseload("*"))).all()
+
+    has_more = len(pages) > limit
+    pages = pages[:limit]
+    return {
+        "items": pages,
+        "next_cursor": pages[-1].url if has_more else None,
+    }
+
+
+def list_project_keywords(db: Session, project_id, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0) -> dict:
+    limit = _page_size(limit)
+    offset = max(offset, 0)
+    total = db.scalar(select(func.count()).select_from(Keyword).where(Keyword.project_id == project_id))
+    keywords = db.scalars(
+        select(Keyword)
+        .where(Keyword.project_id == project_id)
+        .order_by(Keyword.relevance_score.desc().nulls_last(), Keyword.id)
+        .limit(limit)
+        .offset(offset)
+        .options(raiseload("*"))
+    ).all()
+    return {
+        "items": keywords,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+    }
@@ -0,0 +1,18 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.user import User
+from schemas.user import UserLogin
+from controller.user.password import get_password_hasher
+
+async def authenticate_user(db: AsyncSession, credentials: UserLogin) -> Optional[User]:
+    user = await db.scalar(select(User).where(User.email == credentials.email))
+    hasher = get_password_hasher()
+    if user is None:
+        # Same bcrypt work as a wrong password, so response time does not reveal which emails have accounts
+        await hasher.verify_dummy(credentials.password)
+        return None
+
+    if not await hasher.verify(credentials.password, user.password_hash):
+        return None
+    return user
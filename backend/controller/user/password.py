@@ -0,0 +1,109 @@
+import asyncio
+import multiprocessing
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from passlib.hash import bcrypt
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", "64"))
+
+
+class PasswordServiceBusy(Exception):
+    pass
+
+
+def _hash_password(password, rounds):
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def _verify_password(password, password_hash):
+    return bcrypt.verify(password, password_hash)
+
+
+class PasswordHasher:
+    """Runs bcrypt in a small process pool, away from the API's event loop and threadpool.
+
+    At most ``max_pending`` hash/verify calls may be in flight; beyond that
+    callers get ``PasswordServiceBusy`` straight away instead of queueing, so
+    a signup burst cannot build an unbounded backlog.
+    """
+
+    def __init__(self, rounds=BCRYPT_ROUNDS, max_workers=PASSWORD_WORKERS, max_pending=PASSWORD_MAX_PENDING):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        # Checked in place of a real hash for unknown accounts, so a failed login costs the same bcrypt work
+        # whether or not the email exists; hashed at our own rounds so the timing matches new accounts.
+        self.dummy_hash = _hash_password(secrets.token_urlsafe(16), rounds)
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    async def _submit(self, fn, *args):
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise PasswordServiceBusy("Too many password operations in progress")
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        # Only successful jobs feed avg_ms; a crashed or cancelled job says nothing about bcrypt's cost
+        self.completed += 1
+        self.total_seconds += time.perf_counter() - start
+        return result
+
+    async def hash(self, password):
+        return await self._submit(_hash_password, password, self.rounds)
+
+    async def verify(self, password, password_hash):
+        return await self._submit(_verify_password, password, password_hash)
+
+    async def verify_dummy(self, password):
+        """Spend a verify's worth of bcrypt on a password with no account behind it; always False."""
+        await self._submit(_verify_password, password, self.dummy_hash)
+        return False
+
+    def metrics(self):
+        return {
+            "rounds": self.rounds,
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "queue_depth": max(self.in_flight - self.max_workers, 0),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_seconds / self.completed * 1000, 1) if self.completed else 0,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_password_hasher = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher()
+    return _password_hasher
+
+
+def shutdown_password_hasher():
+    global _password_hasher
+    if _password_hasher is not None:
+        _password_hasher.shutdown()
+        _password_hasher = None
@@ -1,26 +1,25 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.user import User
 from schemas.user import UserCreate
 from uuid import uuid4
 from datetime import datetime
-from passlib.hash import bcrypt
+from controller.user.password import get_password_hasher
 
-def register_user(db: Session, user_data: UserCreate) -> User:
+async def register_user(db: AsyncSession, user_data: UserCreate) -> User:
     # Hash the password before storing
-    hashed_password = bcrypt.hash(user_data.password)
-    
+    hashed_password = await get_password_hasher().hash(user_data.password)
+
     new_user = User(
         id=uuid4(),
         email=user_data.email,
         password_hash=hashed_password,
         created_at=datetime.utcnow()
     )
-    
+
     try:
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
         return new_user
     except Exception as e:
-        db.rollback()
-        raise e
\ No newline at end of file
+        await db.rollback()
+        raise e
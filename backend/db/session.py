@@ -1,15 +1,34 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 from db.base import Base
+from serialization import encode_json
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
 
-engine = create_engine(DATABASE_URL)
+ENGINE_SETTINGS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_pre_ping": True,
+    # JSON columns (e.g. Audit.issues) hold audit records; msgspec encodes them directly
+    "json_serializer": lambda obj: encode_json(obj).decode(),
+}
+
+# Sync engine for scripts, migrations and the audit workers
+engine = create_engine(DATABASE_URL, **ENGINE_SETTINGS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers, so waiting on the database does not hold a threadpool worker
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **ENGINE_SETTINGS)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def create_db_and_tables():
     Base.metadata.create_all(bind=engine)
 
@@ -18,4 +37,27 @@ def get_session():
     try:
         yield session
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+async def get_async_session():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+def _pool_stats(pool):
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": ENGINE_SETTINGS["max_overflow"],
+    }
+
+def pool_metrics():
+    return {
+        "sync": _pool_stats(engine.pool),
+        "async": _pool_stats(async_engine.pool),
+    }
+
+async def dispose_engines():
+    await async_engine.dispose()
+    engine.dispose()
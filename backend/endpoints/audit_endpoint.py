@@ -1,27 +1,124 @@
-# from fastapi import APIRouter, HTTPException, BackgroundTasks
-# from pydantic import BaseModel, Field
-# import json
-# from datetime import datetime
-# import os
-# from controller.audit.audit_site import audit as auditSite
-
-# router = APIRouter()
-
-
-# class SiteAuditRequest(BaseModel):
-#     url: str = Field(...)
-#     max_urls_per_domain: int = 3
-#     max_pages: int = 2
-
-
-# @router.post("/audit")
-# async def audit_site(request: SiteAuditRequest):
-#     try:
-#         audit = auditSite(
-#             url=request.url,
-#             depth=request.max_urls_per_domain,
-#             max_pages=request.max_pages,
-#         )
-#         return {"message": audit}
-#     except Exception as e:
-#         raise HTTPException(status_code=500, detail=f"Site audit failed: {e}")
\ No newline at end of file
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import List
+from controller.audit.archive import ExtractionArchive, get_archive
+from controller.audit.audit_site import SEOAudit
+from controller.audit.backlinks import BacklinkService, get_backlink_service
+from serialization import encode_json
+from controller.audit.jobs import AuditJobQueue, get_job_queue, COMPLETED, FAILED
+from controller.audit.scoring import ScoringEngine
+from controller.project.queries import get_project
+from db.session import get_session
+from schemas.audit import (
+    SiteAuditRequest, AuditJobCreated, AuditJobStatus, ArchivedRun, RescoreRequest, CompetitorBenchmarkRequest,
+    BacklinksRequest
+)
+from sqlalchemy.orm import Session
+
+router = APIRouter(prefix="/audit", tags=["audit"])
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {encode_json(data).decode()}\n\n"
+
+
+def _get_job_or_404(queue: AuditJobQueue, job_id: str) -> dict:
+    job = queue.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audit job not found")
+    return job
+
+
+@router.post("/jobs", response_model=AuditJobCreated, status_code=status.HTTP_202_ACCEPTED)
+def submit_audit_job(request: SiteAuditRequest, queue: AuditJobQueue = Depends(get_job_queue)):
+    job_id = queue.submit(request.url, depth=request.depth, max_pages=request.max_pages)
+    return AuditJobCreated(job_id=job_id, status="queued")
+
+
+@router.get("/jobs/{job_id}", response_model=AuditJobStatus)
+def get_audit_job(job_id: str, queue: AuditJobQueue = Depends(get_job_queue)):
+    job = _get_job_or_404(queue, job_id)
+    return AuditJobStatus(
+        job_id=job["id"],
+        status=job["status"],
+        url=job["params"]["url"],
+        pages_done=job["pages_done"],
+        max_pages=job["max_pages"],
+        progress=job["progress"],
+        error=job["error"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+    )
+
+
+@router.get("/jobs/{job_id}/result")
+def get_audit_job_result(job_id: str, queue: AuditJobQueue = Depends(get_job_queue)):
+    job = _get_job_or_404(queue, job_id)
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Site audit failed: {job['error']}")
+    if job["status"] != COMPLETED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Audit job is {job['status']}")
+    return queue.result(job_id)
+
+
+# A plain def, as it reads the project with the sync session: FastAPI runs it in its threadpool
+@router.post("/competitors", response_model=AuditJobCreated, status_code=status.HTTP_202_ACCEPTED)
+def submit_competitor_benchmark(request: CompetitorBenchmarkRequest, queue: AuditJobQueue = Depends(get_job_queue),
+                                db: Session = Depends(get_session)):
+    """Audit the project's site and its competitors side by side; scores are saved on the competitors."""
+    project = get_project(db, request.project_id, include=("competitors",))
+    if project is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    competitor_urls = request.competitor_urls or [competitor.competitor_url for competitor in project.competitors]
+    if not competitor_urls:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Project has no competitors")
+    job_id = queue.submit_benchmark(project.domain, competitor_urls, depth=request.depth,
+                                    max_pages=request.max_pages, project_id=project.id)
+    return AuditJobCreated(job_id=job_id, status="queued")
+
+
+@router.post("/backlinks")
+async def lookup_backlinks(request: BacklinksRequest, service: BacklinkService = Depends(get_backlink_service)):
+    """Backlinks for each domain, served from the shared cache while it is fresh."""
+    return await service.afetch_many(request.domains, max_age=0 if request.refresh else None)
+
+
+@router.get("/runs", response_model=List[ArchivedRun])
+def list_archived_runs(limit: int = 50, archive: ExtractionArchive = Depends(get_archive)):
+    return archive.runs(limit=min(max(limit, 1), 500))
+
+
+@router.post("/runs/{run_id}/rescore", response_model=AuditJobCreated, status_code=status.HTTP_202_ACCEPTED)
+def rescore_archived_run(run_id: str, request: RescoreRequest, queue: AuditJobQueue = Depends(get_job_queue),
+                         archive: ExtractionArchive = Depends(get_archive)):
+    """Re-score an archived run with the current rules; the report is fetched like any audit job's."""
+    run = archive.run(run_id)
+    if run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archived run not found")
+    try:
+        ScoringEngine(weights=request.weights, thresholds=request.thresholds)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    job_id = queue.submit_rescore(run, weights=request.weights, thresholds=request.thresholds)
+    return AuditJobCreated(job_id=job_id, status="queued")
+
+
+@router.get("/stream")
+async def stream_audit(request: SiteAuditRequest = Depends()):
+    """Server-Sent Events: one `page` event per scored page, then a `summary` event."""
+    audit = SEOAudit(request.url, depth=request.depth, max_pages=request.max_pages)
+
+    async def events():
+        try:
+            async for event in audit.stream_async():
+                yield _sse("page", event)
+            yield _sse("summary", audit.generate_summary(final=True))
+        except Exception as e:
+            yield _sse("error", {"detail": f"Site audit failed: {e}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
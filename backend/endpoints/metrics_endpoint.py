@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from db.session import pool_metrics
+from controller.user.password import get_password_hasher
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/db-pool")
+async def db_pool_metrics():
+    return pool_metrics()
+
+@router.get("/password-hasher")
+async def password_hasher_metrics():
+    return get_password_hasher().metrics()
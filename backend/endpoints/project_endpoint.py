@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from uuid import UUID
+from controller.audit.keyword_index import (
+    DEFAULT_RESULTS, MAX_RESULTS, keyword_cannibalization, pages_for_keyword, search_keywords
+)
+from controller.project.queries import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, get_project, get_project_overview, list_project_keywords, list_project_pages
+)
+from db.session import get_session
+from schemas.project import KeywordList, KeywordResponse, PageList, ProjectOverview
+from sqlalchemy.orm import Session
+
+router = APIRouter(prefix="/projects", tags=["projects"])
+
+# The project and keyword index queries use the sync session, so every handler here is a plain
+# def: FastAPI runs it in its threadpool instead of blocking the event loop on the database
+
+
+def _get_project_or_404(db: Session, project_id: UUID):
+    project = get_project(db, project_id)
+    if project is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    return project
+
+
+@router.get("/{project_id}", response_model=ProjectOverview)
+def get_project_dashboard(project_id: UUID, db: Session = Depends(get_session)):
+    """The project with its page, keyword and competitor counts; none of the rows themselves are loaded."""
+    overview = get_project_overview(db, project_id)
+    if overview is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    return overview
+
+
+@router.get("/{project_id}/pages", response_model=PageList)
+def get_project_pages(project_id: UUID, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                      after: Optional[str] = None, db: Session = Depends(get_session)):
+    """The project's pages by URL; pass the returned next_cursor as ``after`` for the next page."""
+    _get_project_or_404(db, project_id)
+    return list_project_pages(db, project_id, limit=limit, after_url=after)
+
+
+@router.get("/{project_id}/keywords", response_model=KeywordList)
+def get_project_keywords(project_id: UUID, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                         offset: int = Query(0, ge=0), db: Session = Depends(get_session)):
+    """The project's tracked keywords, most relevant first."""
+    _get_project_or_404(db, project_id)
+    return list_project_keywords(db, project_id, limit=limit, offset=offset)
+
+
+@router.get("/{project_id}/keywords/search", response_model=List[KeywordResponse])
+def search_project_keywords(project_id: UUID, q: str = Query(..., min_length=1),
+                            limit: int = Query(DEFAULT_RESULTS, ge=1, le=MAX_RESULTS),
+                            db: Session = Depends(get_session)):
+    _get_project_or_404(db, project_id)
+    return search_keywords(db, project_id, q, limit=limit)
+
+
+@router.get("/{project_id}/keywords/pages")
+def get_keyword_pages(project_id: UUID, keyword: str = Query(..., min_length=1), targeting_only: bool = False,
+                      limit: int = Query(DEFAULT_RESULTS, ge=1, le=MAX_RESULTS), db: Session = Depends(get_session)):
+    """Which of the project's audited pages use (or, with targeting_only, target) a keyword."""
+    _get_project_or_404(db, project_id)
+    return pages_for_keyword(db, project_id, keyword, targeting_only=targeting_only, limit=limit)
+
+
+@router.get("/{project_id}/keywords/cannibalization")
+def get_keyword_cannibalization(project_id: UUID, keyword: Optional[List[str]] = Query(None),
+                                min_pages: int = Query(2, ge=2),
+                                limit: int = Query(DEFAULT_RESULTS, ge=1, le=MAX_RESULTS),
+                                db: Session = Depends(get_session)):
+    """Keywords several pages target at once; the project's tracked keywords unless some are given."""
+    _get_project_or_404(db, project_id)
+    return keyword_cannibalization(db, project_id, keywords=keyword, min_pages=min_pages, limit=limit)
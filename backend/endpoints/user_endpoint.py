@@ -1,16 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from controller.user.register import register_user
-from schemas.user import UserCreate, UserResponse
-from db.session import get_session
+from controller.user.login import authenticate_user
+from controller.user.password import PasswordServiceBusy
+from schemas.user import UserCreate, UserResponse, UserLogin
+from db.session import get_async_session
 from sqlalchemy.exc import IntegrityError
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user_route(request: UserCreate, db: Session = Depends(get_session)):
+async def register_user_route(request: UserCreate, db: AsyncSession = Depends(get_async_session)):
     try:
-        user = register_user(db, request)
+        user = await register_user(db, request)
         return UserResponse(
             id=user.id,
             email=user.email,
@@ -21,8 +23,35 @@ def register_user_route(request: UserCreate, db: Session = Depends(get_session))
             status_code=status.HTTP_409_CONFLICT,
             detail="User with this email already exists"
         )
+    except PasswordServiceBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+
+@router.post("/login", response_model=UserResponse)
+async def login_user_route(request: UserLogin, db: AsyncSession = Depends(get_async_session)):
+    try:
+        user = await authenticate_user(db, request)
+    except PasswordServiceBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
+    return UserResponse(
+        id=user.id,
+        email=user.email,
+        created_at=user.created_at
+    )
@@ -1,9 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-# from endpoints.audit_endpoint import router as audit_router  # Import from the new location
-from db.session import create_db_and_tables
+from endpoints.audit_endpoint import router as audit_router
+from controller.audit.jobs import get_job_queue, shutdown_job_queue
+from controller.audit.archive import shutdown_archive
+from controller.audit.backlinks import shutdown_backlink_service
+from controller.user.password import get_password_hasher, shutdown_password_hasher
+from db.session import create_db_and_tables, dispose_engines
 from contextlib import asynccontextmanager # Important for lifespan
 from endpoints.user_endpoint import router as register_user_router
+from endpoints.metrics_endpoint import router as metrics_router
+from endpoints.project_endpoint import router as project_router
 
 # Define your lifespan handler using @asynccontextmanager
 @asynccontextmanager
@@ -11,8 +17,14 @@ async def lifespan_handler(app: FastAPI): # No 'app' argument needed for the lif
     print("Application startup: Creating database tables...")
     create_db_and_tables() # Call the function to create tables
     print("Database tables created.")
+    get_job_queue() # Start audit workers and resume queued jobs
+    get_password_hasher() # Start the bcrypt worker processes
     yield
-    # Application shutdown (if needed)
+    shutdown_job_queue()
+    shutdown_archive()
+    shutdown_backlink_service()
+    shutdown_password_hasher()
+    await dispose_engines()
     print("Application shutdown complete.")
 
 
@@ -29,8 +41,10 @@ app.add_middleware(
 )
 
 # Include your audit endpoint router
-# app.include_router(audit_router)
+app.include_router(audit_router)
 app.include_router(register_user_router)
+app.include_router(metrics_router)
+app.include_router(project_router)
 
 # Optional: Add a root endpoint to confirm the app is running
 @app.get("/")
@@ -5,5 +5,7 @@ from .audit import Audit
 from.competitor import Competitor
 from .content_suggestion import ContentSuggestion
 from .keyword import Keyword
+from .page_term import PageTerm
+from .project_term import ProjectTerm
 
-__all__ = ["User", "Project", "Page", "Audit", "Competitor", "ContentSuggestion", "Keyword"]
+__all__ = ["User", "Project", "Page", "Audit", "Competitor", "ContentSuggestion", "Keyword", "PageTerm", "ProjectTerm"]
@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, String, ForeignKey, DateTime, Integer, JSON
+    Column, String, ForeignKey, DateTime, Integer, JSON, Index
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -7,6 +7,9 @@ from db.base import Base, default_uuid, now
 
 class Audit(Base):
     __tablename__ = "audits"
+    __table_args__ = (
+        Index("idx_audit_page_created", "page_id", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=default_uuid)
     page_id = Column(UUID(as_uuid=True), ForeignKey("pages.id", ondelete="CASCADE"))
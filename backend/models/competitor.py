@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, Integer, ForeignKey, DateTime, Text, JSON
+    Column, Integer, ForeignKey, DateTime, Text, JSON, Index
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -7,6 +7,9 @@ from db.base import Base, default_uuid, now
 
 class Competitor(Base):
     __tablename__ = "competitors"
+    __table_args__ = (
+        Index("idx_competitor_project", "project_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=default_uuid)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"))
@@ -14,6 +17,9 @@ class Competitor(Base):
     keywords = Column(JSON)
     backlinks = Column(Integer)
     domain_authority = Column(Integer)
+    overall_score = Column(Integer)
+    category_scores = Column(JSON)
+    benchmarked_at = Column(DateTime)
     created_at = Column(DateTime, default=now)
 
     project = relationship("Project", back_populates="competitors")
\ No newline at end of file
@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, String, Integer, ForeignKey, DateTime, Text, JSON, Float,
-    ARRAY, Enum
+    ARRAY, Enum, Index
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -8,6 +8,9 @@ from db.base import Base, default_uuid, now
 
 class ContentSuggestion(Base):
     __tablename__ = "content_suggestions"
+    __table_args__ = (
+        Index("idx_content_suggestion_page", "page_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=default_uuid)
     page_id = Column(UUID(as_uuid=True), ForeignKey("pages.id", ondelete="CASCADE"))
@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, String, Integer, ForeignKey, DateTime, Text, Float
+    Column, String, Integer, ForeignKey, DateTime, Text, Float, Index, text
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -7,6 +7,10 @@ from db.base import Base, default_uuid, now
 
 class Keyword(Base):
     __tablename__ = "keywords"
+    __table_args__ = (
+        Index("idx_keyword_project", "project_id"),
+        Index("idx_keyword_search", text("to_tsvector('simple', keyword)"), postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=default_uuid)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"))
@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, String, ForeignKey, DateTime, Text
+    Column, String, ForeignKey, DateTime, Text, JSON, Index, Integer
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -7,6 +7,9 @@ from db.base import Base, default_uuid, now
 
 class Page(Base):
     __tablename__ = "pages"
+    __table_args__ = (
+        Index("uq_pages_project_url", "project_id", "url", unique=True),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=default_uuid)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"))
@@ -14,8 +17,15 @@ class Page(Base):
     title = Column(Text)
     status = Column(String, default="active")
     last_audited = Column(DateTime)
+    etag = Column(String)
+    last_modified = Column(String)
+    content_hash = Column(String(32))
+    simhash = Column(String(16))
+    word_count = Column(Integer)
+    links = Column(JSON)
     created_at = Column(DateTime, default=now)
 
     project = relationship("Project", back_populates="pages")
     audits = relationship("Audit", back_populates="page", cascade="all, delete")
-    suggestions = relationship("ContentSuggestion", back_populates="page", cascade="all, delete")
\ No newline at end of file
+    suggestions = relationship("ContentSuggestion", back_populates="page", cascade="all, delete")
+    terms = relationship("PageTerm", back_populates="page", passive_deletes=True)
\ No newline at end of file
@@ -0,0 +1,24 @@
+from sqlalchemy import (
+    Column, Integer, SmallInteger, ForeignKey, Text, Float, Index, text
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from db.base import Base
+
+class PageTerm(Base):
+    __tablename__ = "page_terms"
+    __table_args__ = (
+        # In ranking order, so the best pages for a term are read straight off the index
+        Index("idx_page_term_rank", "project_id", "term", text("fields DESC"), text("tf DESC"),
+              postgresql_include=["page_id"]),
+    )
+
+    page_id = Column(UUID(as_uuid=True), ForeignKey("pages.id", ondelete="CASCADE"), primary_key=True)
+    term = Column(Text, primary_key=True)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    count = Column(Integer, nullable=False)
+    tf = Column(Float, nullable=False)
+    # Bitmask of where the term appears: 4 title, 2 H1, 1 body (see keyword_index)
+    fields = Column(SmallInteger, nullable=False)
+
+    page = relationship("Page", back_populates="terms")
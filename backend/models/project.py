@@ -13,6 +13,6 @@ class Project(Base):
     created_at = Column(DateTime, default=now)
 
     user = relationship("User", back_populates="projects")
-    pages = relationship("Page", back_populates="project", cascade="all, delete-orphan", lazy="joined")
-    keywords = relationship("Keyword", back_populates="project", cascade="all, delete-orphan", lazy="joined")
-    competitors = relationship("Competitor", back_populates="project", cascade="all, delete-orphan", lazy="joined")
\ No newline at end of file
+    pages = relationship("Page", back_populates="project", cascade="all, delete-orphan")
+    keywords = relationship("Keyword", back_populates="project", cascade="all, delete-orphan")
+    competitors = relationship("Competitor", back_populates="project", cascade="all, delete-orphan")
\ No newline at end of file
@@ -0,0 +1,13 @@
+from sqlalchemy import (
+    Column, Integer, ForeignKey, Text
+)
+from sqlalchemy.dialects.postgresql import UUID
+from db.base import Base
+
+class ProjectTerm(Base):
+    __tablename__ = "project_terms"
+
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    term = Column(Text, primary_key=True)
+    # Indexed pages of the project that use the term; the "" term counts the indexed pages themselves
+    df = Column(Integer, nullable=False)
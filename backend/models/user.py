@@ -11,4 +11,4 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     created_at = Column(DateTime, default=now)
 
-    projects = relationship("Project", back_populates="user", cascade="all, delete-orphan", lazy="joined")
\ No newline at end of file
+    projects = relationship("Project", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
@@ -0,0 +1,49 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+class SiteAuditRequest(BaseModel):
+    url: str = Field(...)
+    depth: int = Field(1, ge=0, le=5)
+    max_pages: int = Field(10, ge=1, le=10000)
+
+class AuditJobCreated(BaseModel):
+    job_id: str
+    status: str
+
+class AuditJobStatus(BaseModel):
+    job_id: str
+    status: str
+    url: str
+    pages_done: int
+    max_pages: int
+    progress: float
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class ArchivedRun(BaseModel):
+    run_id: str
+    base_url: str
+    depth: int
+    created_at: datetime
+    pages: int
+
+class RescoreRequest(BaseModel):
+    # Keyed by "section.category", e.g. {"content.keyword_optimization": 20}
+    weights: Optional[Dict[str, float]] = None
+    thresholds: Optional[Dict[str, Dict[str, Any]]] = None
+
+class CompetitorBenchmarkRequest(BaseModel):
+    project_id: UUID
+    # Defaults to the competitors already listed on the project
+    competitor_urls: Optional[List[str]] = Field(None, max_length=20)
+    depth: int = Field(1, ge=0, le=5)
+    max_pages: int = Field(20, ge=1, le=1000)
+
+class BacklinksRequest(BaseModel):
+    domains: List[str] = Field(..., min_length=1, max_length=100)
+    # Skip the cache and fetch every domain again
+    refresh: bool = False
@@ -0,0 +1,63 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+class KeywordResponse(BaseModel):
+    id: UUID
+    keyword: str
+    search_intent: Optional[str] = None
+    volume: Optional[int] = None
+    difficulty: Optional[int] = None
+    relevance_score: Optional[float] = None
+    source: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectResponse(BaseModel):
+    id: UUID
+    name: str
+    domain: str
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectCounts(BaseModel):
+    pages: int
+    keywords: int
+    competitors: int
+
+
+class ProjectOverview(BaseModel):
+    project: ProjectResponse
+    counts: ProjectCounts
+
+
+class PageResponse(BaseModel):
+    id: UUID
+    url: str
+    title: Optional[str] = None
+    status: Optional[str] = None
+    word_count: Optional[int] = None
+    last_audited: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PageList(BaseModel):
+    items: List[PageResponse]
+    next_cursor: Optional[str] = None
+
+
+class KeywordList(BaseModel):
+    items: List[KeywordResponse]
+    total: int
+    limit: int
+    offset: int
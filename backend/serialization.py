@@ -0,0 +1,30 @@
+from collections.abc import Mapping
+from typing import Any, Optional
+
+import msgspec
+
+
+def _encode_mapping(obj):
+    # Mappings that are not dicts, such as a low-memory crawl's DiskResultStore, are encoded as dicts
+    if isinstance(obj, Mapping):
+        return dict(obj.items())
+    raise NotImplementedError(f"Objects of type {type(obj).__name__} are not supported")
+
+
+_encoder = msgspec.json.Encoder(enc_hook=_encode_mapping)
+_decoder = msgspec.json.Decoder()
+
+
+def encode_json(obj: Any, indent: Optional[int] = None) -> bytes:
+    """JSON-encode audit results, records included, in one pass."""
+    payload = _encoder.encode(obj)
+    return msgspec.json.format(payload, indent=indent) if indent else payload
+
+
+def decode_json(payload) -> Any:
+    return _decoder.decode(payload)
+
+
+def to_builtins(obj: Any) -> Any:
+    """Plain dicts/lists view of a result, for code that needs real dicts."""
+    return msgspec.to_builtins(obj)
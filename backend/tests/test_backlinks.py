@@ -0,0 +1,177 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from controller.audit.backlinks import BacklinkCache, BacklinkService
+
+PAGES = 3
+LINKS_PER_PAGE = 5
+
+
+class Upstream:
+    """What the stub serves: result pages per domain, and scripted failures."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = {}
+        # Path -> statuses answered, in order, before the page itself
+        self.script = {}
+        self.down = set()
+
+    def next_status(self, path):
+        with self.lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+            statuses = self.script.get(path)
+            return statuses.pop(0) if statuses else 200
+
+    def page(self, domain, page):
+        rows = "".join(
+            f"<tr><td>{i}</td><td><a href='https://src{page}-{i}.example.net/post'>source</a></td>"
+            f"<td>anchor {page}-{i}</td><td>dofollow</td><td>2024-01-0{page}</td></tr>"
+            for i in range(LINKS_PER_PAGE)
+        )
+        # A source already listed on the previous page, as the upstream repeats them across pages
+        if page > 1:
+            rows += (f"<tr><td>x</td><td><a href='https://src{page - 1}-0.example.net/post'>source</a></td>"
+                     f"<td>again</td><td>dofollow</td><td>2024-01-01</td></tr>")
+        next_link = f"<a rel='next' href='/r/{domain}?page={page + 1}'>Next</a>" if page < PAGES else ""
+        return f"<html><body><table id='linklist'><tbody>{rows}</tbody></table>{next_link}</body></html>"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        upstream = self.server.upstream
+        url = urlparse(self.path)
+        domain = url.path.rsplit("/", 1)[-1]
+        page = int(parse_qs(url.query).get("page", ["1"])[0])
+        status = 500 if domain in upstream.down else upstream.next_status(self.path)
+        if status != 200:
+            self.send_response(status)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = upstream.page(domain, page).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def upstream(server):
+    server.upstream = Upstream()
+    return server.upstream
+
+
+@pytest.fixture
+def service(server, upstream, tmp_path):
+    cache = BacklinkCache(str(tmp_path / "backlinks.sqlite3"))
+    service = BacklinkService(base_url=f"http://127.0.0.1:{server.server_port}", cache=cache, rate=100, retries=2)
+    yield service
+    service.close()
+
+
+def test_follows_result_pages(service, upstream):
+    result = service.fetch("https://www.Example.com/about")
+
+    assert result["domain"] == "example.com"
+    assert result["pages"] == PAGES
+    assert result["complete"] is True
+    assert result["total"] == PAGES * LINKS_PER_PAGE
+    assert len({link["source_url"] for link in result["backlinks"]}) == result["total"]
+    assert result["cached"] is False and result["error"] is None
+
+
+def test_stops_at_max_pages(service, upstream):
+    service.max_pages = 2
+
+    result = service.fetch("example.com")
+
+    assert result["pages"] == 2
+    assert result["complete"] is False
+    assert result["total"] == 2 * LINKS_PER_PAGE
+
+
+def test_retries_throttled_and_failed_pages(service, upstream):
+    upstream.script["/r/example.com"] = [503, 429]
+    upstream.script["/r/example.com?page=2"] = [502]
+
+    result = service.fetch("example.com")
+
+    assert result["error"] is None
+    assert result["total"] == PAGES * LINKS_PER_PAGE
+    assert upstream.hits["/r/example.com"] == 3
+    assert upstream.hits["/r/example.com?page=2"] == 2
+
+
+def test_gives_up_after_retries(service, upstream):
+    upstream.script["/r/example.com"] = [503, 503, 503]
+
+    result = service.fetch("example.com")
+
+    assert result["total"] is None
+    assert result["backlinks"] == []
+    assert "503" in result["error"]
+    assert upstream.hits["/r/example.com"] == service.retries + 1
+
+
+def test_serves_cached_entries_within_ttl(service, upstream):
+    first = service.fetch_many(["example.com", "other.org"])
+    requests = sum(upstream.hits.values())
+
+    second = service.fetch_many(["www.example.com", "other.org"])
+
+    assert sum(upstream.hits.values()) == requests
+    assert all(result["cached"] for result in second.values())
+    assert second["example.com"]["backlinks"] == first["example.com"]["backlinks"]
+
+
+def test_refetches_expired_entries(service, upstream):
+    service.fetch("example.com")
+    requests = sum(upstream.hits.values())
+
+    assert service.fetch("example.com", max_age=0)["cached"] is False
+    service.cache.ttl = 0
+    assert service.fetch("example.com")["cached"] is False
+    assert sum(upstream.hits.values()) == requests + 2 * PAGES
+
+
+def test_falls_back_to_stale_entry_when_upstream_fails(service, upstream):
+    fresh = service.fetch("example.com")
+    upstream.down.add("example.com")
+
+    stale = service.fetch("example.com", max_age=0)
+
+    assert stale["cached"] is True
+    assert "500" in stale["error"]
+    assert stale["backlinks"] == fresh["backlinks"]
+    assert stale["fetched_at"] == fresh["fetched_at"]
+
+
+def test_reports_failure_without_cached_entry(service, upstream):
+    upstream.down.add("example.com")
+
+    results = service.fetch_many(["example.com", "other.org"])
+
+    assert results["example.com"]["cached"] is False
+    assert results["example.com"]["total"] is None
+    assert "500" in results["example.com"]["error"]
+    assert results["other.org"]["error"] is None
+    assert service.cache.get("example.com") is None